@@ -13,7 +13,6 @@ from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from contextlib import asynccontextmanager
 from email.message import EmailMessage
 from dotenv import load_dotenv
-import sqlite3
 from collections import Counter
 import os
 import re
@@ -30,8 +29,9 @@ except ImportError:
 
 # ✅ Import RAG module with chat_history
 from rag_with_sambanova import (
-    init_rag, query_rag
+    init_rag, query_rag, reload_vector_index, start_index_watcher
 )
+from article_store import get_store
 
 # ----------------------------
 # CONFIG
@@ -40,6 +40,7 @@ API_DIR = os.path.dirname(os.path.abspath(__file__))
 PROJECT_ROOT = os.path.abspath(os.path.join(API_DIR, ".."))
 load_dotenv(os.path.join(PROJECT_ROOT, ".env"))
 load_dotenv(os.path.join(API_DIR, ".env"))
+ARTICLES_DB_PATH = os.path.join(PROJECT_ROOT, "global_news.db")
 
 
 def normalize_smtp_password(value: str | None) -> str | None:
@@ -300,19 +301,18 @@ def get_article_statistics(date_from: str = None, date_to: str = None, category:
     Supports filtering by date range, predicted_category, and source
     """
     try:
-        db_path = os.path.join(os.path.dirname(__file__), '..', 'global_news.db')
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
+        cursor = get_store(ARTICLES_DB_PATH).connection().cursor()
         
-        # Build query with optional filters - using scraped_at timestamp and predicted_category
+        # Build query with optional filters - using scraped_at timestamp and predicted_category.
+        # Dates are compared as timestamp ranges so the scraped_at index is used.
         query = "SELECT scraped_at, predicted_category, source FROM articles WHERE 1=1"
         params = []
         
         if date_from:
-            query += " AND DATE(scraped_at) >= ?"
+            query += " AND scraped_at >= ?"
             params.append(date_from)
         if date_to:
-            query += " AND DATE(scraped_at) <= ?"
+            query += " AND scraped_at < DATE(?, '+1 day')"
             params.append(date_to)
         if category:
             query += " AND predicted_category = ?"
@@ -372,7 +372,6 @@ def get_article_statistics(date_from: str = None, date_to: str = None, category:
         print(f"[DEBUG] Categories found: {all_categories}")  # Debug log
         print(f"[DEBUG] Category distribution: {dict(category_counter)}")  # Debug log
         
-        conn.close()
         
         return {
             "total_articles": total_articles,
@@ -488,6 +487,9 @@ def execute_pipeline_run(started_by: str, mode: str):
             process.stdout.close()
 
         exit_code = process.wait()
+        if exit_code == 0 and not E2E_FAKE_CHAT:
+            # Serve the new articles now rather than at the watcher's next check
+            reload_vector_index()
 
         update_pipeline_run_state(
             status="succeeded" if exit_code == 0 else "failed",
@@ -555,9 +557,13 @@ async def lifespan(app: FastAPI):
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     print("Initializing RAG system...")
+    index_watcher = None
     if not E2E_FAKE_CHAT:
         init_rag()
+        index_watcher = start_index_watcher()
     yield
+    if index_watcher:
+        index_watcher.set()
     print("Shutting down app...")
 
 app = FastAPI(title="Unified Auth + RAG API with Per-User Chat", lifespan=lifespan)
@@ -0,0 +1,288 @@
+"""
+Shared access to the article database (global_news.db).
+
+The scraper, classifier, embedder, the RAG fallback search and the analytics
+API all open the database through this module, so the schema, its indexes and
+the connection settings live in one place.
+
+Connections use WAL journaling: readers keep seeing the last committed state
+while the pipeline writes, instead of stalling on "database is locked", and
+``busy_timeout`` absorbs the short overlaps between writers.
+
+``ArticleStore.connection()`` keeps one connection per thread, so API request
+threads reuse their connection instead of reconnecting on every call; batch
+jobs take a dedicated one with ``ArticleStore.connect()``.
+
+The schema is versioned: ``migrate`` applies the numbered ``MIGRATIONS`` a
+database has not seen yet and records them in ``schema_version``, once per
+process and path, so the pipeline steps never issue DDL themselves.
+
+The scraper's ``link_index`` and ``article_fingerprints`` tables are
+created, and filled from the articles already saved, by migrations as well.
+
+``articles_fts`` is an FTS5 index over title, teaser and full_text, kept in
+sync by triggers; ``search_articles`` ranks matches with BM25.
+"""
+
+import os
+import sqlite3
+import threading
+
+from dedupe import create_fingerprints
+from link_index import create_link_index, index_canonical_links
+
+DB_FILE = "global_news.db"
+BUSY_TIMEOUT = 30  # seconds a connection waits for a lock
+CACHE_SIZE_KB = 20000  # page cache per connection
+MMAP_SIZE = 256 * 1024 * 1024
+
+ARTICLES_TABLE = """
+    CREATE TABLE IF NOT EXISTS articles (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        source TEXT,
+        category TEXT,
+        title TEXT,
+        link TEXT UNIQUE,
+        teaser TEXT,
+        image_url TEXT,
+        full_text TEXT,
+        scraped_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+FTS_TABLE = """
+    CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+        title, teaser, full_text,
+        content='articles', content_rowid='id',
+        tokenize='porter unicode61'
+    )
+"""
+
+# External-content FTS index kept in step with articles. Updates of other
+# columns (predicted_category, loaded) do not touch it.
+FTS_TRIGGERS = [
+    """
+    CREATE TRIGGER IF NOT EXISTS articles_fts_insert AFTER INSERT ON articles BEGIN
+        INSERT INTO articles_fts (rowid, title, teaser, full_text)
+        VALUES (new.id, new.title, new.teaser, new.full_text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS articles_fts_delete AFTER DELETE ON articles BEGIN
+        INSERT INTO articles_fts (articles_fts, rowid, title, teaser, full_text)
+        VALUES ('delete', old.id, old.title, old.teaser, old.full_text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS articles_fts_update AFTER UPDATE OF title, teaser, full_text ON articles BEGIN
+        INSERT INTO articles_fts (articles_fts, rowid, title, teaser, full_text)
+        VALUES ('delete', old.id, old.title, old.teaser, old.full_text);
+        INSERT INTO articles_fts (rowid, title, teaser, full_text)
+        VALUES (new.id, new.title, new.teaser, new.full_text);
+    END
+    """,
+]
+
+# bm25 column weights for title, teaser and full_text
+TITLE_WEIGHT = 4.0
+TEASER_WEIGHT = 2.0
+BODY_WEIGHT = 1.0
+
+INDEXES = {
+    "idx_articles_scraped_at": "scraped_at",
+    "idx_articles_predicted_category": "predicted_category",
+    "idx_articles_source": "source",
+    "idx_articles_loaded": "loaded",
+}
+
+
+def connect(path=DB_FILE):
+    """Open a connection to ``path`` with the store's pragmas applied."""
+    conn = sqlite3.connect(path, timeout=BUSY_TIMEOUT, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")  # durable at checkpoints, safe in WAL
+    conn.execute("PRAGMA temp_store=MEMORY")
+    conn.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KB}")
+    conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+    return conn
+
+
+# ---------------- MIGRATIONS ----------------
+def _sql(*statements):
+    def apply(conn):
+        for statement in statements:
+            conn.execute(statement)
+    return apply
+
+
+def _add_column(column, definition):
+    def apply(conn):
+        # Databases from before versioning may have the column already
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(articles)")}
+        if column not in columns:
+            conn.execute(f"ALTER TABLE articles ADD COLUMN {column} {definition}")
+    return apply
+
+
+# (version, description, apply) in order; applied versions must never change
+MIGRATIONS = [
+    (1, "create articles table", _sql(ARTICLES_TABLE)),
+    (2, "add predicted_category", _add_column("predicted_category", "TEXT")),
+    (3, "add loaded flag", _add_column("loaded", "INTEGER DEFAULT 0")),
+    (4, "backfill loaded flags", _sql("UPDATE articles SET loaded = 0 WHERE loaded IS NULL")),
+    (5, "index filter columns", _sql(*(
+        f"CREATE INDEX IF NOT EXISTS {name} ON articles ({column})"
+        for name, column in INDEXES.items()
+    ))),
+    (6, "full-text index", _sql(
+        FTS_TABLE,
+        *FTS_TRIGGERS,
+        "INSERT INTO articles_fts (articles_fts) VALUES ('rebuild')",
+    )),
+    (7, "link index", create_link_index),
+    (8, "near-duplicate fingerprints", create_fingerprints),
+    (9, "index canonical links", index_canonical_links),
+]
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+
+def schema_version(conn):
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+
+def migrate(conn):
+    """Apply pending migrations, each in its own transaction; returns the version."""
+    conn.execute("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)")
+    conn.commit()
+    current = schema_version(conn)
+    for version, description, apply in MIGRATIONS:
+        if version <= current:
+            continue
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            # Another process may have migrated while this one waited for the lock
+            if schema_version(conn) >= version:
+                conn.rollback()
+                continue
+            apply(conn)
+            conn.execute("INSERT INTO schema_version (version) VALUES (?)", (version,))
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        print(f"Migrated article store to version {version}: {description}")
+    if current < SCHEMA_VERSION:
+        conn.execute("PRAGMA optimize")
+    return schema_version(conn)
+
+
+# ---------------- SEARCH ----------------
+def fts_query(terms):
+    """FTS5 query matching any of ``terms`` as a word prefix."""
+    return " OR ".join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+
+
+def search_articles(conn, terms=None, category=None, since=None, limit=10):
+    """
+    Return up to ``limit`` article rows (id, title, teaser, full_text,
+    scraped_at, predicted_category, image_url, score) matching any of
+    ``terms``, best BM25 score first; the score is BM25 with higher meaning
+    more relevant. Without terms the most recent articles are returned with
+    a NULL score. ``since`` is a "YYYY-MM-DD HH:MM:SS" lower bound on
+    scraped_at.
+    """
+    columns = "a.id, a.title, a.teaser, a.full_text, a.scraped_at, a.predicted_category, a.image_url"
+    filters = ["a.full_text IS NOT NULL"]
+    params = []
+    if category:
+        filters.append("a.predicted_category = ?")
+        params.append(category)
+    if since:
+        filters.append("a.scraped_at > ?")
+        params.append(since)
+
+    if terms:
+        sql = f"""
+            SELECT {columns}, -bm25(articles_fts, ?, ?, ?) AS score
+            FROM articles_fts
+            JOIN articles a ON a.id = articles_fts.rowid
+            WHERE articles_fts MATCH ? AND {" AND ".join(filters)}
+            ORDER BY score DESC, a.scraped_at DESC
+            LIMIT ?
+        """
+        params = [TITLE_WEIGHT, TEASER_WEIGHT, BODY_WEIGHT, fts_query(terms), *params, limit]
+    else:
+        sql = f"""
+            SELECT {columns}, NULL AS score
+            FROM articles a
+            WHERE {" AND ".join(filters)}
+            ORDER BY a.scraped_at DESC
+            LIMIT ?
+        """
+        params.append(limit)
+    return conn.execute(sql, params).fetchall()
+
+
+def filter_article_ids(conn, category=None, since=None):
+    """Ids of articles with ``category`` scraped after ``since``, via the column indexes."""
+    filters = ["full_text IS NOT NULL"]
+    params = []
+    if category:
+        filters.append("predicted_category = ?")
+        params.append(category)
+    if since:
+        filters.append("scraped_at > ?")
+        params.append(since)
+    rows = conn.execute(f"SELECT id FROM articles WHERE {' AND '.join(filters)}", params)
+    return [row[0] for row in rows]
+
+
+class ArticleStore:
+    def __init__(self, path=DB_FILE):
+        self.path = path
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []
+        self._schema_ready = False
+
+    def connect(self):
+        """A new connection owned by the caller, who must close it."""
+        conn = connect(self.path)
+        with self._lock:
+            if not self._schema_ready:
+                migrate(conn)
+                self._schema_ready = True
+        return conn
+
+    def connection(self):
+        """The calling thread's shared connection; callers must not close it."""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self.connect()
+            with self._lock:
+                self._connections.append(conn)
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        """Close every thread's shared connection."""
+        with self._lock:
+            connections, self._connections = self._connections, []
+        for conn in connections:
+            conn.close()
+        self._local = threading.local()
+
+
+_stores = {}
+_stores_lock = threading.Lock()
+
+
+def get_store(path=DB_FILE):
+    """The process-wide ArticleStore for ``path``."""
+    key = os.path.abspath(path)
+    with _stores_lock:
+        store = _stores.get(key)
+        if store is None:
+            store = _stores[key] = ArticleStore(path)
+        return store
@@ -1,19 +1,80 @@
+"""
+Zero-shot topic classification of scraped articles.
+
+Two backends are available, chosen with CLASSIFIER_MODE:
+
+"nli" (default) runs an NLI model once per article and label. The model is
+loaded on first use, on CUDA when a GPU is available and on the CPU
+otherwise. On the CPU its Linear layers are dynamically quantized to int8
+by default, which is several times faster than fp32 for BART-large with
+nearly the same labels (see scripts/benchmark_classifier.py). The device,
+precision and CPU thread count can be overridden with the
+CLASSIFIER_DEVICE, CLASSIFIER_PRECISION and CLASSIFIER_THREADS variables.
+Articles are sorted by token length and batched up to a padded-token
+budget, so a batch of headlines is not padded to the length of a full
+article; the log reports throughput and padding efficiency.
+
+"embedding" scores each article's bge vector (the embedder's model) by
+cosine similarity against an embedded description of each label, so an
+article costs one pass through a small encoder instead of eight through
+BART-large. Articles are embedded from their classification text, not read
+from the FAISS index: stored chunks carry the article's "Category:" line,
+so reusing them would tie a new label to the old one. When a
+logistic-regression head trained on NLI labels exists at
+CLASSIFIER_HEAD_PATH (``python classifier.py --train-head``), it replaces
+the cosine scoring.
+
+Labels are cached in classification_cache.db under a hash of the
+classification text, the backend's version and the label set, so
+syndicated or re-published copies of an article are looked up instead of
+classified again. Bump LABEL_SET_VERSION to invalidate the cache by hand.
+
+``main`` streams the unlabelled articles in chunks of CLASSIFY_CHUNK_SIZE
+and commits each chunk's labels, so a crash loses one chunk at most and
+the next run resumes with whatever is still unlabelled.
+"""
+
+import argparse
+import hashlib
+import os
 import sqlite3
-from transformers import pipeline
+import time
+from functools import lru_cache
+
+import joblib
+import numpy as np
+import torch
+from sklearn.linear_model import LogisticRegression
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
 from tqdm import tqdm
-from datasets import Dataset
-from transformers.pipelines.pt_utils import KeyDataset
 
-DB_PATH = "global_news.db"
+from article_store import DB_FILE, get_store
+from embedder import load_embeddings
+from translation import content_hash
+
+DB_PATH = DB_FILE
 
 # -------------------------------
-# Load model (GPU)
+# Model settings
 # -------------------------------
-classifier = pipeline(
-    "zero-shot-classification",
-    model="facebook/bart-large-mnli",
-    device=0  # GPU
-)
+CLASSIFIER_MODE = os.getenv("CLASSIFIER_MODE", "nli")  # "nli" or "embedding"
+MODEL_NAME = "facebook/bart-large-mnli"
+CLASSIFIER_DEVICE = os.getenv("CLASSIFIER_DEVICE", "auto")  # "auto", "cuda" or "cpu"
+CLASSIFIER_PRECISION = os.getenv("CLASSIFIER_PRECISION", "auto")  # "auto", "fp32", "fp16" or "int8"
+CLASSIFIER_THREADS = int(os.getenv("CLASSIFIER_THREADS", "0"))  # CPU threads; 0 keeps torch's default
+PRECISIONS = ("fp32", "fp16", "int8")
+HYPOTHESIS_TEMPLATE = "This example is {}."
+# Padded tokens per forward pass; every article is one premise/hypothesis
+# pair per label, padded to the longest pair in its batch. The CPU budget
+# matches the old fixed batches of 8 articles (64 pairs of ~130 tokens), so
+# a typical article batch is as large as before, just without the padding.
+GPU_TOKEN_BUDGET = 16384
+CPU_TOKEN_BUDGET = 8192
+CLASSIFIER_HEAD_PATH = os.getenv("CLASSIFIER_HEAD_PATH", "./classifier_head.joblib")
+CLASSIFICATION_CACHE_FILE = "classification_cache.db"
+CLASSIFY_CHUNK_SIZE = 1000  # articles read, classified and committed together
+EMBEDDING_SOURCE = "build_text"  # what the embedding backend embeds, part of its cache version
+LABEL_SET_VERSION = 1  # bump when CATEGORIES keep their names but change meaning
 
 # -------------------------------
 # Categories
@@ -29,6 +90,18 @@ CATEGORIES = [
     "Science"
 ]
 
+# What the embedding backend compares articles against
+LABEL_DESCRIPTIONS = {
+    "Politics": "Politics: government, elections, parliament, political parties, laws and policy.",
+    "Technology": "Technology: computers, software, the internet, gadgets, cybersecurity and tech companies.",
+    "Sports": "Sports: football, tennis, athletes, matches, tournaments, teams and results.",
+    "Business": "Business: companies, markets, the economy, finance, trade, jobs and earnings.",
+    "Health": "Health: medicine, disease, hospitals, doctors, vaccines and public health.",
+    "Entertainment": "Entertainment: films, music, television, celebrities, games and the arts.",
+    "World": "World: international affairs, conflicts, disasters, diplomacy and events abroad.",
+    "Science": "Science: research, space, physics, biology, climate science and discoveries.",
+}
+
 # -------------------------------
 # Build text (FULL TEXT)
 # -------------------------------
@@ -42,80 +115,448 @@ def build_text(title, teaser, full_text):
     return text[:512] if text else "General"
 
 
+# -------------------------------
+# Backend
+# -------------------------------
+def resolve_device(device="auto"):
+    if device == "auto":
+        return "cuda" if torch.cuda.is_available() else "cpu"
+    if device not in ("cuda", "cpu"):
+        raise ValueError(f"unknown classifier device {device!r}")
+    if device == "cuda" and not torch.cuda.is_available():
+        raise ValueError("CLASSIFIER_DEVICE is cuda but no GPU is available")
+    return device
+
+
+def resolve_precision(precision, device):
+    """fp32 on CUDA and int8 on the CPU unless ``precision`` says otherwise."""
+    if precision == "auto":
+        return "fp32" if device == "cuda" else "int8"
+    if precision not in PRECISIONS:
+        raise ValueError(f"unknown classifier precision {precision!r}")
+    if precision == "int8" and device != "cpu":
+        raise ValueError("int8 dynamic quantization only runs on the CPU")
+    if precision == "fp16" and device != "cuda":
+        raise ValueError("fp16 inference needs CUDA")
+    return precision
+
+
+def length_batches(lengths, pairs_per_text, token_budget):
+    """
+    Positions of ``lengths`` grouped into batches of similar length: longest
+    first, each batch holding as many texts as fit ``token_budget`` once all
+    their ``pairs_per_text`` pairs are padded to the batch's longest. Leading
+    with the longest makes a budget too big for the device fail at once.
+    """
+    order = sorted(range(len(lengths)), key=lambda position: -lengths[position])
+    batches, batch = [], []
+    for position in order:
+        if batch and (len(batch) + 1) * pairs_per_text * lengths[batch[0]] > token_budget:
+            batches.append(batch)
+            batch = []
+        batch.append(position)
+    if batch:
+        batches.append(batch)
+    return batches
+
+
+class ClassificationStats:
+    """Throughput and padding totals over one or more classify calls."""
+
+    def __init__(self):
+        self.articles = 0
+        self.cached = 0  # articles labelled from the cache or an identical text
+        self.batches = 0
+        self.seconds = 0.0
+        self.tokens = 0  # real tokens fed to the model
+        self.padded_tokens = 0  # tokens including padding
+
+    def add(self, articles, seconds, tokens=0, padded_tokens=0, batches=1):
+        self.articles += articles
+        self.batches += batches
+        self.seconds += seconds
+        self.tokens += tokens
+        self.padded_tokens += padded_tokens
+
+    @property
+    def throughput(self):
+        return self.articles / self.seconds if self.seconds else 0.0
+
+    @property
+    def padding_efficiency(self):
+        return self.tokens / self.padded_tokens if self.padded_tokens else None
+
+    def __str__(self):
+        summary = f"{self.articles} articles in {self.batches} batches, {self.throughput:.1f} articles/s"
+        if self.cached:
+            summary += f", {self.cached} labels reused"
+        if self.padding_efficiency is not None:
+            summary += f", padding efficiency {self.padding_efficiency:.0%}"
+        return summary
+
+
+class ZeroShotClassifier:
+    """
+    Zero-shot NLI classifier on a resolved device and precision. Each
+    candidate label becomes the hypothesis "This example is <label>.", and
+    an article gets the label whose pair has the highest entailment logit,
+    as in the transformers zero-shot pipeline.
+    """
+
+    def __init__(
+        self,
+        model_name=MODEL_NAME,
+        device=CLASSIFIER_DEVICE,
+        precision=CLASSIFIER_PRECISION,
+        threads=CLASSIFIER_THREADS,
+    ):
+        self.model_name = model_name
+        self.device = resolve_device(device)
+        self.precision = resolve_precision(precision, self.device)
+        self.token_budget = GPU_TOKEN_BUDGET if self.device == "cuda" else CPU_TOKEN_BUDGET
+        if self.device == "cpu" and threads:
+            torch.set_num_threads(threads)
+
+        self.tokenizer = AutoTokenizer.from_pretrained(model_name)
+        model = AutoModelForSequenceClassification.from_pretrained(
+            model_name,
+            torch_dtype=torch.float16 if self.precision == "fp16" else torch.float32,
+        )
+        model.eval()
+        if self.precision == "int8":
+            # The Linear layers hold nearly all of BART's weights and FLOPs
+            model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+        self.model = model.to(self.device)
+        self.entailment_id = next(
+            (index for label, index in model.config.label2id.items() if label.lower().startswith("entail")),
+            -1,
+        )
+
+    def __str__(self):
+        threads = f", {torch.get_num_threads()} threads" if self.device == "cpu" else ""
+        return f"{self.model_name} on {self.device} ({self.precision}{threads})"
+
+    @property
+    def cache_version(self):
+        """What the labels depend on besides the text and the label set."""
+        return f"nli|{self.model_name}|{self.precision}|{HYPOTHESIS_TEMPLATE}"
+
+    def classify(self, texts, labels=CATEGORIES, token_budget=None, progress=None, stats=None):
+        """
+        The best of ``labels`` for each of ``texts``, in order. Texts are
+        batched by token length (see ``length_batches``); ``progress`` is
+        called with the number of texts done after each batch, and ``stats``
+        (a ClassificationStats) collects throughput and padding.
+        """
+        texts = list(texts)
+        labels = list(labels)
+        if not texts:
+            return []
+        start = time.perf_counter()
+        hypotheses = [HYPOTHESIS_TEMPLATE.format(label) for label in labels]
+        encoded = self.tokenizer(
+            [text for text in texts for _hypothesis in hypotheses],
+            hypotheses * len(texts),
+            truncation="only_first",
+        )["input_ids"]
+        pairs = [encoded[first:first + len(labels)] for first in range(0, len(encoded), len(labels))]
+        lengths = [max(len(ids) for ids in text_pairs) for text_pairs in pairs]
+
+        results = [None] * len(texts)
+        batches = length_batches(lengths, len(labels), token_budget or self.token_budget)
+        tokens = padded_tokens = 0
+        for batch in batches:
+            inputs = self.tokenizer.pad(
+                {"input_ids": [ids for position in batch for ids in pairs[position]]},
+                return_tensors="pt",
+            ).to(self.device)
+            with torch.inference_mode():
+                logits = self.model(**inputs).logits
+            entailment = logits[:, self.entailment_id].view(len(batch), len(labels))
+            for position, best in zip(batch, entailment.argmax(dim=1).tolist()):
+                results[position] = labels[best]
+            tokens += int(inputs["attention_mask"].sum())
+            padded_tokens += inputs["attention_mask"].numel()
+            if progress is not None:
+                progress(len(batch))
+        if stats is not None:
+            stats.add(len(texts), time.perf_counter() - start, tokens, padded_tokens, len(batches))
+        return results
+
+
+class EmbeddingClassifier:
+    """
+    Classifier over normalized article embeddings. The label descriptions
+    are embedded once, when it is created.
+    """
+
+    def __init__(self, embeddings, labels=CATEGORIES, head=None):
+        self.embeddings = embeddings
+        self.labels = list(labels)
+        self.head = head
+        self.label_vectors = np.asarray(
+            embeddings.embed_documents([LABEL_DESCRIPTIONS[label] for label in self.labels]),
+            dtype="float32",
+        )
+
+    def __str__(self):
+        scoring = "logistic-regression head" if self.head is not None else "label cosine similarity"
+        return f"article embeddings with {scoring}"
+
+    @property
+    def cache_version(self):
+        """What the labels depend on besides the text and the label set."""
+        model = getattr(self.embeddings, "model_name", type(self.embeddings).__name__)
+        if self.head is not None:
+            weights = self.head.coef_.tobytes() + self.head.intercept_.tobytes()
+            scoring = "head:" + hashlib.sha256(weights).hexdigest()[:16]
+        else:
+            scoring = "|".join(LABEL_DESCRIPTIONS[label] for label in self.labels)
+        return f"embedding|{model}|{EMBEDDING_SOURCE}|{scoring}"
+
+    def article_vectors(self, texts):
+        """Vectors of ``texts``, one row each."""
+        return np.asarray(self.embeddings.embed_documents(list(texts)), dtype="float32")
+
+    def predict(self, vectors):
+        """Labels of an (n, dim) array of article vectors."""
+        if self.head is not None:
+            return self.head.predict(vectors).tolist()
+        scores = vectors @ self.label_vectors.T
+        return [self.labels[column] for column in scores.argmax(axis=1)]
+
+    def classify(self, texts, progress=None, stats=None):
+        """Labels of ``texts``, in order; ``progress`` and ``stats`` as for ZeroShotClassifier."""
+        texts = list(texts)
+        if not texts:
+            return []
+        start = time.perf_counter()
+        labels = self.predict(self.article_vectors(texts))
+        if stats is not None:
+            stats.add(len(texts), time.perf_counter() - start)
+        if progress is not None:
+            progress(len(texts))
+        return labels
+
+
+# -------------------------------
+# Label cache
+# -------------------------------
+class LabelCache:
+    """Labels keyed by ``content_hash`` of the classification text."""
+
+    def __init__(self, path=CLASSIFICATION_CACHE_FILE):
+        self.path = path
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS labels (
+                content_hash TEXT PRIMARY KEY,
+                label TEXT NOT NULL
+            )
+        """)
+        return conn
+
+    def get_many(self, hashes):
+        found = {}
+        hashes = list(hashes)
+        conn = self._connect()
+        try:
+            for start in range(0, len(hashes), 500):
+                batch = hashes[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = conn.execute(
+                    f"SELECT content_hash, label FROM labels WHERE content_hash IN ({placeholders})",
+                    batch,
+                ).fetchall()
+                found.update(rows)
+        finally:
+            conn.close()
+        return found
+
+    def put_many(self, items):
+        items = list(items)
+        if not items:
+            return
+        conn = self._connect()
+        try:
+            conn.executemany("INSERT OR REPLACE INTO labels (content_hash, label) VALUES (?, ?)", items)
+            conn.commit()
+        finally:
+            conn.close()
+
+
+def cache_namespace(classifier, labels=CATEGORIES):
+    return f"{LABEL_SET_VERSION}|{'|'.join(labels)}|{classifier.cache_version}"
+
+
+def classify_cached(classifier, texts, cache=None, progress=None, stats=None):
+    """
+    ``classifier.classify`` for texts whose label is not in ``cache`` yet;
+    identical texts are classified once. Returns labels in order and stores
+    the new ones.
+    """
+    texts = list(texts)
+    namespace = cache_namespace(classifier)
+    keys = [content_hash(text, namespace) for text in texts]
+    labels = cache.get_many(set(keys)) if cache else {}
+
+    # First occurrence of each uncached text
+    pending = {}
+    for position, key in enumerate(keys):
+        if key not in labels and key not in pending:
+            pending[key] = position
+    cached = len(texts) - len(pending)
+    if stats is not None:
+        stats.cached += cached
+    if progress is not None and cached:
+        progress(cached)
+
+    if pending:
+        positions = list(pending.values())
+        new = classifier.classify(
+            [texts[position] for position in positions],
+            progress=progress,
+            stats=stats,
+        )
+        new_labels = dict(zip(pending, new))
+        if cache:
+            cache.put_many(new_labels.items())
+        labels.update(new_labels)
+    return [labels[key] for key in keys]
+
+
+def load_head(path=CLASSIFIER_HEAD_PATH, labels=CATEGORIES):
+    """The trained head at ``path``, or None if there is none for ``labels``."""
+    if not os.path.exists(path):
+        return None
+    head = joblib.load(path)
+    if not set(head.classes_) <= set(labels):
+        print(f"⚠️ Ignoring {path}: it was trained on other labels")
+        return None
+    return head
+
+
+def train_head(vectors, labels):
+    return LogisticRegression(max_iter=1000).fit(vectors, labels)
+
+
+@lru_cache(maxsize=None)
+def get_classifier(mode=CLASSIFIER_MODE):
+    """The process-wide classifier for ``mode``, loaded on first use."""
+    if mode == "nli":
+        return ZeroShotClassifier()
+    if mode == "embedding":
+        return EmbeddingClassifier(load_embeddings(), head=load_head())
+    raise ValueError(f"unknown classifier mode {mode!r}")
+
+
 # -------------------------------
 # Main
 # -------------------------------
-def main():
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+def unclassified_chunks(conn, chunk_size=CLASSIFY_CHUNK_SIZE, after_id=0):
+    """
+    Yield unclassified (id, title, teaser, full_text) rows in id order,
+    ``chunk_size`` at a time. Each chunk is a keyset seek past the last id
+    of the previous one on the predicted_category index, so it costs the
+    same however far into the backlog it is.
+    """
+    while True:
+        rows = conn.execute("""
+            SELECT id, title, teaser, full_text
+            FROM articles
+            WHERE predicted_category IS NULL AND id > ?
+            ORDER BY id
+            LIMIT ?
+        """, (after_id, chunk_size)).fetchall()
+        if not rows:
+            return
+        yield rows
+        after_id = rows[-1][0]
+
 
-    # Add column if not exists
+def main(chunk_size=CLASSIFY_CHUNK_SIZE):
+    """
+    Classify unlabelled articles chunk by chunk, committing each chunk's
+    labels in one transaction. Only one chunk is held in memory, and an
+    interrupted run loses at most a chunk: the next run starts with the
+    articles that are still unlabelled.
+    """
+    conn = get_store(DB_PATH).connect()
     try:
-        cursor.execute("ALTER TABLE articles ADD COLUMN predicted_category TEXT")
-        print("Added predicted_category column")
-    except Exception:
-        print("Column already exists")
-
-    # Fetch data
-    cursor.execute("""
-        SELECT id, title, teaser, full_text
-        FROM articles
-        WHERE predicted_category IS NULL
-    """)
-
-    rows = cursor.fetchall()
-    print(f"Found {len(rows)} articles to classify")
-
-    if not rows:
-        return
-
-    # -------------------------------
-    # Prepare dataset
-    # -------------------------------
-    data = []
-    for article_id, title, teaser, full_text in rows:
-        text = build_text(title, teaser, full_text)
-        data.append({"id": article_id, "text": text})
-
-    dataset = Dataset.from_list(data)
-
-    # -------------------------------
-    # Run classification (NO WARNING 🚀)
-    # -------------------------------
-    results = []
-
-    for output in tqdm(
-        classifier(
-            KeyDataset(dataset, "text"),
-            candidate_labels=CATEGORIES,
-            batch_size=64,
-            truncation=True
-        ),
-        total=len(dataset),
-        desc="Classifying"
-    ):
-        results.append(output)
+        total = conn.execute("SELECT COUNT(*) FROM articles WHERE predicted_category IS NULL").fetchone()[0]
+        print(f"Found {total} articles to classify")
+        if not total:
+            return
 
-    # -------------------------------
-    # Save results
-    # -------------------------------
-    for item, result in zip(data, results):
-        category = result["labels"][0]
+        classifier = get_classifier()
+        print(f"Classifying with {classifier}")
+        cache = LabelCache(CLASSIFICATION_CACHE_FILE)
+        stats = ClassificationStats()
+        with tqdm(total=total, desc="Classifying") as progress:
+            for rows in unclassified_chunks(conn, chunk_size):
+                ids = [row[0] for row in rows]
+                categories = classify_cached(
+                    classifier,
+                    [build_text(title, teaser, full_text) for _id, title, teaser, full_text in rows],
+                    cache=cache,
+                    progress=progress.update,
+                    stats=stats,
+                )
+                conn.executemany(
+                    "UPDATE articles SET predicted_category = ? WHERE id = ?",
+                    zip(categories, ids),
+                )
+                conn.commit()
+        print(f"📊 {stats}")
+    finally:
+        conn.close()
+
+    print("✅ Classification saved to database")
 
-        cursor.execute("""
-            UPDATE articles
-            SET predicted_category = ?
-            WHERE id = ?
-        """, (category, item["id"]))
 
-    conn.commit()
+# -------------------------------
+# Train the embedding head
+# -------------------------------
+def train_head_from_store(path=CLASSIFIER_HEAD_PATH, limit=None):
+    """
+    Fit the embedding backend's head on articles the NLI backend labelled
+    and save it to ``path``.
+    """
+    conn = get_store(DB_PATH).connect()
+    sql = f"""
+        SELECT id, title, teaser, full_text, predicted_category
+        FROM articles
+        WHERE predicted_category IN ({", ".join("?" for _ in CATEGORIES)})
+        ORDER BY id DESC
+    """
+    params = list(CATEGORIES)
+    if limit:
+        sql += " LIMIT ?"
+        params.append(limit)
+    rows = conn.execute(sql, params).fetchall()
     conn.close()
+    print(f"Training on {len(rows)} labelled articles")
 
-    print("✅ Classification saved to database")
+    backend = EmbeddingClassifier(load_embeddings())
+    vectors = backend.article_vectors(
+        [build_text(title, teaser, full_text) for _id, title, teaser, full_text, _category in rows]
+    )
+    head = train_head(vectors, [row[4] for row in rows])
+    joblib.dump(head, path)
+    print(f"✅ Saved classifier head to {path}")
 
 
 # -------------------------------
 # Run
 # -------------------------------
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Classify unlabelled articles")
+    parser.add_argument("--train-head", action="store_true", help="train the embedding backend's head on NLI labels")
+    parser.add_argument("--limit", type=int, help="newest labelled articles to train on")
+    args = parser.parse_args()
+    if args.train_head:
+        train_head_from_store(limit=args.limit)
+    else:
+        main()
@@ -0,0 +1,185 @@
+"""
+URL canonicalization and near-duplicate detection for scraped articles.
+
+``canonicalize_url`` strips tracking parameters, fragments and AMP variants so
+the same story linked from different places maps to one ``articles.link``.
+
+``NearDuplicateIndex`` stores a 64-bit SimHash of each article's text. Two
+copies of a story (syndicated wire copy, lightly edited republications) end up
+within a few bits of each other. The fingerprint is split into four 16-bit
+bands that are indexed separately: any two fingerprints within
+``MAX_HAMMING_DISTANCE`` (<= 3) bits must agree on at least one band, so a
+lookup only compares against the handful of rows sharing a band instead of the
+whole archive. The fingerprint table is created, and recent articles
+fingerprinted, by the article store's migrations (``create_fingerprints``).
+"""
+
+import hashlib
+import re
+from datetime import datetime, timedelta
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+SIMHASH_BITS = 64
+BAND_BITS = 16
+BANDS = SIMHASH_BITS // BAND_BITS
+MAX_HAMMING_DISTANCE = 3
+SHINGLE_SIZE = 3
+MIN_WORDS = 30  # shorter texts are too generic to fingerprint
+BACKFILL_DAYS = 30  # syndicated copies appear close together in time
+
+TRACKING_PARAMS = {
+    "fbclid", "gclid", "dclid", "msclkid", "mc_cid", "mc_eid", "ocid", "cmpid",
+    "ref", "ref_src", "rss", "ito", "xtor", "amp", "outputtype",
+    "__twitter_impression",
+}
+TRACKING_PREFIXES = ("utm_", "at_")  # at_* are BBC RSS campaign tags
+
+WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+# ---------------- URLS ----------------
+def canonicalize_url(url):
+    """Return a stable form of ``url`` for duplicate checks and storage."""
+    url = (url or "").strip()
+    parts = urlsplit(url)
+    if not parts.netloc:
+        return url
+
+    host = parts.netloc.lower()
+    if host.startswith("amp."):
+        host = "www." + host[len("amp."):]
+
+    path = parts.path or "/"
+    path = re.sub(r"/amp(?=/|$)", "", path)
+    path = re.sub(r"\.amp$", "", path)
+    path = path.replace("/amp_articleshow/", "/articleshow/")
+    if len(path) > 1:
+        path = path.rstrip("/")
+
+    query = [
+        (key, value)
+        for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if key.lower() not in TRACKING_PARAMS
+        and not key.lower().startswith(TRACKING_PREFIXES)
+    ]
+    query.sort()
+
+    return urlunsplit((parts.scheme.lower(), host, path or "/", urlencode(query), ""))
+
+
+# ---------------- SIMHASH ----------------
+def _token_hash(token):
+    digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
+
+
+def simhash(text):
+    """64-bit SimHash over word shingles, or None when the text is too short."""
+    words = WORD_RE.findall((text or "").lower())
+    if len(words) < MIN_WORDS:
+        return None
+
+    weights = [0] * SIMHASH_BITS
+    for start in range(len(words) - SHINGLE_SIZE + 1):
+        value = _token_hash(" ".join(words[start:start + SHINGLE_SIZE]))
+        for bit in range(SIMHASH_BITS):
+            weights[bit] += 1 if value >> bit & 1 else -1
+
+    fingerprint = 0
+    for bit, weight in enumerate(weights):
+        if weight > 0:
+            fingerprint |= 1 << bit
+    return fingerprint
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count("1")
+
+
+def bands(fingerprint):
+    mask = (1 << BAND_BITS) - 1
+    return [fingerprint >> (band * BAND_BITS) & mask for band in range(BANDS)]
+
+
+def _to_signed(value):
+    # SQLite integers are signed 64-bit
+    return value - (1 << SIMHASH_BITS) if value >= 1 << (SIMHASH_BITS - 1) else value
+
+
+def _to_unsigned(value):
+    return value + (1 << SIMHASH_BITS) if value < 0 else value
+
+
+# ---------------- INDEX ----------------
+FINGERPRINTS_TABLE = """
+    CREATE TABLE IF NOT EXISTS article_fingerprints (
+        article_id INTEGER PRIMARY KEY,
+        simhash INTEGER NOT NULL,
+        band0 INTEGER NOT NULL,
+        band1 INTEGER NOT NULL,
+        band2 INTEGER NOT NULL,
+        band3 INTEGER NOT NULL
+    )
+"""
+
+
+def create_fingerprints(conn):
+    """Migration: create the fingerprint table and its band indexes, then
+    fingerprint recent articles."""
+    conn.execute(FINGERPRINTS_TABLE)
+    for band in range(BANDS):
+        conn.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_fingerprints_band{band} "
+            f"ON article_fingerprints (band{band})"
+        )
+    # Databases created outside the scraper may have no texts to fingerprint
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(articles)")}
+    if {"full_text", "scraped_at"} <= columns:
+        NearDuplicateIndex(conn).backfill()
+
+
+class NearDuplicateIndex:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def backfill(self, days=BACKFILL_DAYS):
+        """Fingerprint recent articles saved before the index existed."""
+        cutoff = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d %H:%M:%S")
+        cursor = self.conn.execute(
+            "SELECT id, full_text FROM articles WHERE scraped_at >= ?", (cutoff,)
+        )
+        while True:
+            rows = cursor.fetchmany(500)
+            if not rows:
+                break
+            for article_id, full_text in rows:
+                fingerprint = simhash(full_text)
+                if fingerprint is not None:
+                    self.add(article_id, fingerprint)
+
+    def find_duplicate(self, fingerprint):
+        """Return the id of a stored article within the distance threshold."""
+        if fingerprint is None:
+            return None
+
+        clauses = " OR ".join(f"band{band} = ?" for band in range(BANDS))
+        rows = self.conn.execute(
+            f"SELECT article_id, simhash FROM article_fingerprints WHERE {clauses}",
+            bands(fingerprint),
+        ).fetchall()
+        for article_id, stored in rows:
+            if hamming_distance(fingerprint, _to_unsigned(stored)) <= MAX_HAMMING_DISTANCE:
+                return article_id
+        return None
+
+    def add(self, article_id, fingerprint):
+        if fingerprint is None:
+            return
+        self.conn.execute(
+            """
+            INSERT OR REPLACE INTO article_fingerprints
+            (article_id, simhash, band0, band1, band2, band3)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+            (article_id, _to_signed(fingerprint), *bands(fingerprint)),
+        )
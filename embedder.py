@@ -2,40 +2,48 @@
 Incremental Text + Image Metadata Embedding for FAISS
 """
 
-import os
-import sqlite3
-from langchain_core.documents import Document
+import torch
 from langchain_huggingface.embeddings import HuggingFaceEmbeddings
-from langchain_community.vectorstores import FAISS
 
-DB_PATH = "global_news.db"
+from article_store import DB_FILE, get_store
+from vector_index import ARTICLE_COLUMNS, ArticleIndex, article_document
+
+DB_PATH = DB_FILE
 FAISS_PATH = "./faiss_npr_test"
+EMBEDDING_MODEL = "BAAI/bge-small-en-v1.5"
+EMBED_BATCH_SIZE = 64  # chunks per forward pass; similar lengths are batched together
+INDEX_TYPE = "flat"  # index built on compaction: "flat" (exact), "hnsw" or "ivfpq"
+
+
+# -------------------------------
+# EMBEDDING MODEL
+# -------------------------------
+def load_embeddings():
+    """The article embedding model, on CUDA when a GPU is available."""
+    return HuggingFaceEmbeddings(
+        model_name=EMBEDDING_MODEL,
+        model_kwargs={"device": "cuda" if torch.cuda.is_available() else "cpu"},
+        encode_kwargs={"normalize_embeddings": True, "batch_size": EMBED_BATCH_SIZE}
+    )
 
 
 # -------------------------------
 # LOAD ARTICLES FROM DATABASE
 # -------------------------------
 def load_articles(limit=None, category=None, ignore_loaded=True):
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_store(DB_PATH).connection()
     cursor = conn.cursor()
 
-    # Ensure 'loaded' column exists for tracking
-    try:
-        cursor.execute("ALTER TABLE articles ADD COLUMN loaded INTEGER DEFAULT 0")
-        conn.commit()
-    except Exception:
-        pass
-
     # Fetch articles
-    sql = """
-        SELECT id, title, teaser, full_text, scraped_at, predicted_category, image_url
+    sql = f"""
+        SELECT {ARTICLE_COLUMNS}
         FROM articles
         WHERE full_text IS NOT NULL
     """
     params = []
 
     if ignore_loaded:
-        sql += " AND (loaded IS NULL OR loaded = 0)"
+        sql += " AND loaded = 0"
 
     if category:
         sql += " AND predicted_category = ?"
@@ -50,28 +58,7 @@ def load_articles(limit=None, category=None, ignore_loaded=True):
     cursor.execute(sql, params)
     rows = cursor.fetchall()
 
-    docs = []
-    for article_id, title, teaser, full_text, scraped_at, predicted_category, image_url in rows:
-        content = (
-            f"Title: {title or ''}\n"
-            f"Category: {predicted_category or 'General'}\n"
-            f"Date: {scraped_at or '—'}\n\n"
-            f"{full_text or ''}"
-        )
-
-        metadata = {
-            "id": article_id,
-            "title": title or "",
-            "teaser": teaser[:180] if teaser else "",
-            "category": predicted_category or "General",
-            "date": scraped_at or "unknown",
-            "image_url": image_url or ""  # ✅ include image URL in metadata
-        }
-
-        docs.append(Document(page_content=content, metadata=metadata))
-
-    conn.close()
-    return docs
+    return [article_document(row) for row in rows]
 
 
 # -------------------------------
@@ -80,14 +67,13 @@ def load_articles(limit=None, category=None, ignore_loaded=True):
 def mark_as_loaded(ids):
     if not ids:
         return
-    conn = sqlite3.connect(DB_PATH)
+    conn = get_store(DB_PATH).connection()
     cursor = conn.cursor()
     cursor.executemany(
         "UPDATE articles SET loaded = 1 WHERE id = ?",
         [(i,) for i in ids]
     )
     conn.commit()
-    conn.close()
 
 
 # -------------------------------
@@ -97,39 +83,32 @@ def main():
     print("🚀 Starting embedding pipeline...")
 
     # 1️⃣ Initialize text embeddings
-    embeddings = HuggingFaceEmbeddings(
-        model_name="BAAI/bge-small-en-v1.5",
-        model_kwargs={"device": "cuda"},
-        encode_kwargs={"normalize_embeddings": True}
-    )
+    embeddings = load_embeddings()
     print("✅ Embedding model ready")
 
-    # 2️⃣ Load new articles
-    documents = load_articles(ignore_loaded=True)
+    # 2️⃣ Open the segmented FAISS index. Without a manifest (first run, or an
+    # index in an older format) every article is embedded again.
+    index = ArticleIndex(FAISS_PATH, embeddings, db_path=DB_PATH)
+    rebuild = not index.exists()
+    if rebuild:
+        print("🆕 Creating new FAISS index...")
+    else:
+        print(f"📦 FAISS index version {index.version}: {index.ntotal} chunks in {index.segment_count} segments")
+
+    # 3️⃣ Load new articles
+    documents = load_articles(ignore_loaded=not rebuild)
     if not documents:
         print("⚠️ No new articles to embed")
         return
 
     print(f"📄 {len(documents)} new articles loaded")
 
-    # 3️⃣ Load or create FAISS index
-    if os.path.exists(FAISS_PATH):
-        print("📦 Loading existing FAISS index...")
-        vectorstore = FAISS.load_local(
-            FAISS_PATH,
-            embeddings,
-            allow_dangerous_deserialization=True
-        )
-        vectorstore.add_documents(documents)
-        print(f"➕ Added {len(documents)} new articles to FAISS")
-    else:
-        print("🆕 Creating new FAISS index...")
-        vectorstore = FAISS.from_documents(documents, embeddings)
-        print(f"✅ Created new FAISS index with {len(documents)} articles")
-
-    # 4️⃣ Save FAISS index
-    vectorstore.save_local(FAISS_PATH)
-    print("💾 FAISS index saved")
+    # 4️⃣ Write them as a new segment; readers pick it up from the manifest
+    index.add_documents(documents)
+    print(f"💾 Added a segment with {len(documents)} articles (index version {index.version}, {index.ntotal} chunks)")
+    if index.needs_compaction(INDEX_TYPE):
+        index.compact(INDEX_TYPE)
+        print(f"🗜️ Compacted FAISS index into one {INDEX_TYPE} segment (index version {index.version})")
 
     # 5️⃣ Mark articles as embedded
     ids = [doc.metadata["id"] for doc in documents]
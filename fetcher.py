@@ -0,0 +1,244 @@
+"""
+Concurrent page fetching for the scrapers.
+
+Every scraper hands its URLs to a FetchEngine, which downloads them on an
+asyncio event loop with a global concurrency cap, a per-host cap and a
+per-host politeness delay. The actual HTTP call is the blocking ``fetch``
+callable passed in (``scrapper.safe_request``), so caching and retry logic
+stay in one place while the total scrape time follows the slowest host
+instead of the sum of all pages.
+
+``RetryPolicy`` and ``CircuitBreaker`` hold the retry rules used by that
+callable: exponential backoff with jitter that honours Retry-After on 429 and
+503, and a per-host breaker that stops requesting a host for the rest of the
+run once it keeps failing. ``RequestStats`` counts the outcomes for the run
+summary.
+"""
+
+import asyncio
+import queue
+import random
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlsplit
+
+DEFAULT_MAX_CONCURRENCY = 20
+DEFAULT_PER_HOST = 4
+DEFAULT_HOST_DELAY = 0.25
+DEFAULT_BUFFER_SIZE = 64
+
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+DEFAULT_ATTEMPTS = 3
+DEFAULT_BASE_DELAY = 0.5
+DEFAULT_MAX_DELAY = 30.0
+DEFAULT_FAILURE_THRESHOLD = 5
+STAT_NAMES = ("ok", "not_modified", "retried", "failed", "circuit_open")
+
+_DONE = object()
+
+
+def host_of(url):
+    return urlsplit(url).netloc.lower()
+
+
+# ---------------- RETRIES ----------------
+def parse_retry_after(value):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+class RetryPolicy:
+    """
+    Exponential backoff with jitter: attempt ``n`` (from 0) waits a random
+    time between half and all of ``base_delay * 2**n``, capped at
+    ``max_delay``. A Retry-After value replaces the backoff; one longer than
+    ``max_delay`` means the request is not retried.
+    """
+
+    def __init__(
+        self,
+        attempts=DEFAULT_ATTEMPTS,
+        base_delay=DEFAULT_BASE_DELAY,
+        max_delay=DEFAULT_MAX_DELAY,
+        retry_statuses=RETRY_STATUSES,
+        sleep=time.sleep,
+    ):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_statuses = retry_statuses
+        self.sleep = sleep
+
+    def should_retry(self, status):
+        return status in self.retry_statuses
+
+    def delay(self, attempt, retry_after=None):
+        """Seconds to wait before the next attempt, or None to give up."""
+        if retry_after is not None:
+            return retry_after if retry_after <= self.max_delay else None
+        backoff = min(self.max_delay, self.base_delay * 2 ** attempt)
+        return backoff * random.uniform(0.5, 1.0)
+
+
+class CircuitBreaker:
+    """
+    Per-host breaker. After ``threshold`` consecutive failed requests the
+    host is open and every later request to it is refused for the rest of
+    the run; any success resets the count.
+    """
+
+    def __init__(self, threshold=DEFAULT_FAILURE_THRESHOLD):
+        self.threshold = threshold
+        self._failures = Counter()
+        self._open = set()
+        self._lock = threading.Lock()
+
+    def allow(self, host):
+        with self._lock:
+            return host not in self._open
+
+    def record_success(self, host):
+        with self._lock:
+            self._failures.pop(host, None)
+
+    def record_failure(self, host):
+        """Count a failed request; True if this opened the circuit."""
+        with self._lock:
+            self._failures[host] += 1
+            if host not in self._open and self._failures[host] >= self.threshold:
+                self._open.add(host)
+                return True
+            return False
+
+    @property
+    def open_hosts(self):
+        with self._lock:
+            return sorted(self._open)
+
+
+class RequestStats:
+    """Thread-safe request outcome counters."""
+
+    def __init__(self):
+        self._counts = Counter()
+        self._lock = threading.Lock()
+
+    def add(self, name, count=1):
+        with self._lock:
+            self._counts[name] += count
+
+    def snapshot(self):
+        with self._lock:
+            return dict(self._counts)
+
+    def summary(self):
+        counts = self.snapshot()
+        return ", ".join(f"{counts.get(name, 0)} {name}" for name in STAT_NAMES)
+
+
+class FetchEngine:
+    def __init__(
+        self,
+        fetch,
+        max_concurrency=DEFAULT_MAX_CONCURRENCY,
+        per_host=DEFAULT_PER_HOST,
+        host_delay=DEFAULT_HOST_DELAY,
+    ):
+        self.fetch = fetch
+        self.max_concurrency = max_concurrency
+        self.per_host = per_host
+        self.host_delay = host_delay
+
+    def iter_fetch(self, urls, buffer_size=DEFAULT_BUFFER_SIZE, fetch=None):
+        """
+        Yield (url, response) pairs as each download finishes.
+
+        Responses are handed over through a bounded queue, so a slow consumer
+        pauses the downloads instead of piling pages up in memory. Failed
+        downloads are yielded with a ``None`` response. ``fetch`` overrides
+        the engine's fetch callable for this batch only.
+        """
+        fetch = fetch or self.fetch
+        urls = list(dict.fromkeys(urls))
+        if not urls:
+            return
+
+        results = queue.Queue(maxsize=buffer_size)
+        stop = threading.Event()
+        worker = threading.Thread(
+            target=asyncio.run,
+            args=(self._run(urls, fetch, results, stop),),
+            daemon=True,
+        )
+        worker.start()
+
+        try:
+            while True:
+                item = results.get()
+                if item is _DONE:
+                    break
+                yield item
+        finally:
+            stop.set()
+            while worker.is_alive():
+                try:
+                    results.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+
+    def fetch_all(self, urls, fetch=None):
+        return dict(self.iter_fetch(urls, fetch=fetch))
+
+    async def _run(self, urls, fetch, results, stop):
+        loop = asyncio.get_running_loop()
+        global_slots = asyncio.Semaphore(self.max_concurrency)
+        host_slots = {}
+        host_locks = {}
+        host_last_start = {}
+
+        async def put(item):
+            await loop.run_in_executor(None, results.put, item)
+
+        async def polite_wait(host):
+            async with host_locks[host]:
+                wait = host_last_start.get(host, 0.0) + self.host_delay - time.monotonic()
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                host_last_start[host] = time.monotonic()
+
+        async def fetch_one(url, executor):
+            host = host_of(url)
+            async with host_slots[host], global_slots:
+                if stop.is_set():
+                    return
+                await polite_wait(host)
+                try:
+                    response = await loop.run_in_executor(executor, fetch, url)
+                except Exception:
+                    response = None
+            if not stop.is_set():
+                await put((url, response))
+
+        for url in urls:
+            host = host_of(url)
+            if host not in host_slots:
+                host_slots[host] = asyncio.Semaphore(self.per_host)
+                host_locks[host] = asyncio.Lock()
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+                await asyncio.gather(*(fetch_one(url, executor) for url in urls))
+        finally:
+            await put(_DONE)
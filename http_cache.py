@@ -0,0 +1,100 @@
+"""
+Conditional GET validators for feeds and section pages.
+
+The cache keeps the ETag / Last-Modified headers returned for each URL in a
+small SQLite file. Requests for cached URLs send If-None-Match /
+If-Modified-Since, and a 304 reply means the page has not changed since the
+last successful run, so the scraper can skip it entirely without needing the
+body.
+
+Validators are staged while a run is in progress and only written by
+``flush()`` once the scraped articles are safely in the database; otherwise a
+crash mid-run would make the next run skip feeds whose items were never saved.
+The scraper also ``discard()``s the staged validators of a feed whose items
+were not all fetched, so the feed is read in full again next run.
+"""
+
+import sqlite3
+import threading
+from datetime import datetime
+
+HTTP_CACHE_FILE = "http_cache.db"
+
+
+class HttpCache:
+    def __init__(self, path=HTTP_CACHE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._validators = None
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS http_cache (
+                url TEXT PRIMARY KEY,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at TEXT
+            )
+        """)
+        return conn
+
+    def _load(self):
+        if self._validators is None:
+            conn = self._connect()
+            try:
+                rows = conn.execute("SELECT url, etag, last_modified FROM http_cache").fetchall()
+            finally:
+                conn.close()
+            self._validators = {url: (etag, last_modified) for url, etag, last_modified in rows}
+        return self._validators
+
+    def conditional_headers(self, url):
+        with self._lock:
+            etag, last_modified = self._load().get(url, (None, None))
+
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+
+    def stage(self, url, response):
+        """Remember the validators of a 200 response until the next flush()."""
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        if not etag and not last_modified:
+            return
+        with self._lock:
+            self._pending[url] = (etag, last_modified)
+
+    def discard(self, urls):
+        """Forget staged validators of ``urls`` so flush() does not save them."""
+        with self._lock:
+            for url in urls:
+                self._pending.pop(url, None)
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+
+            fetched_at = datetime.now().isoformat()
+            conn = self._connect()
+            try:
+                conn.executemany(
+                    """
+                    INSERT OR REPLACE INTO http_cache (url, etag, last_modified, fetched_at)
+                    VALUES (?, ?, ?, ?)
+                    """,
+                    [(url, etag, modified, fetched_at) for url, (etag, modified) in pending.items()],
+                )
+                conn.commit()
+            finally:
+                conn.close()
+
+            self._load().update(pending)
+            return len(pending)
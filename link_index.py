@@ -0,0 +1,99 @@
+"""
+Persistent index of article links that were already scraped.
+
+Links are recorded when their article is saved or dropped as a near
+duplicate. Instead of loading every link in ``articles`` into a Python set on
+each run, the scrapers ask this index which of the links they just discovered
+are new. Links are stored as 64-bit BLAKE2b hashes in an INTEGER PRIMARY KEY
+table, so each entry costs one rowid in the table's B-tree and a lookup is a
+single index seek no matter how large the archive grows. With 64-bit hashes a
+false "already seen" answer needs a collision, which is negligible at archive
+sizes far beyond millions of rows.
+
+The table is created, and filled from existing articles, by the article
+store's migrations (``create_link_index``); ``LinkIndex`` only reads and
+writes it.
+"""
+
+import hashlib
+
+from dedupe import canonicalize_url
+
+LINK_INDEX_BATCH = 500
+
+LINK_INDEX_TABLE = """
+    CREATE TABLE IF NOT EXISTS link_index (
+        url_hash INTEGER PRIMARY KEY
+    )
+"""
+
+
+def link_hash(link):
+    digest = hashlib.blake2b(link.encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def _batches(items, size=LINK_INDEX_BATCH):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _has_links(conn):
+    # Databases created outside the scraper may have no links to index
+    return "link" in {row[1] for row in conn.execute("PRAGMA table_info(articles)")}
+
+
+def create_link_index(conn):
+    """Migration: create the link index and fill it from saved articles."""
+    conn.execute(LINK_INDEX_TABLE)
+    if _has_links(conn):
+        LinkIndex(conn).backfill()
+
+
+def index_canonical_links(conn):
+    """
+    Migration: index the canonical form of saved links in databases whose
+    link index was filled before the backfill canonicalized them.
+    """
+    if _has_links(conn):
+        LinkIndex(conn).backfill()
+
+
+class LinkIndex:
+    def __init__(self, conn):
+        self.conn = conn
+
+    def backfill(self):
+        """
+        Index links of articles saved before the link index existed, in the
+        canonical form the scrapers look up (older rows may still carry
+        tracking parameters or AMP paths).
+        """
+        cursor = self.conn.execute("SELECT link FROM articles WHERE link IS NOT NULL")
+        while True:
+            rows = cursor.fetchmany(LINK_INDEX_BATCH)
+            if not rows:
+                break
+            self.add(canonicalize_url(row[0]) for row in rows)
+
+    def filter_new(self, links):
+        """Return the links that are not in the index, keeping their order."""
+        links = list(dict.fromkeys(links))
+        hashes = {link: link_hash(link) for link in links}
+
+        seen = set()
+        for batch in _batches(list(hashes.values())):
+            placeholders = ",".join("?" * len(batch))
+            rows = self.conn.execute(
+                f"SELECT url_hash FROM link_index WHERE url_hash IN ({placeholders})",
+                batch,
+            ).fetchall()
+            seen.update(row[0] for row in rows)
+
+        return [link for link in links if hashes[link] not in seen]
+
+    def add(self, links):
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO link_index (url_hash) VALUES (?)",
+            [(link_hash(link),) for link in links],
+        )
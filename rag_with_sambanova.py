@@ -3,27 +3,41 @@
 
 import os
 import re
-import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 
 import torch
-from langchain_community.vectorstores import FAISS
 from langchain_core.documents import Document
 from langchain_huggingface.embeddings import HuggingFaceEmbeddings
 from nltk.tokenize import sent_tokenize
 from sambanova import SambaNova
 
+from article_store import DB_FILE, filter_article_ids, get_store, search_articles
+from vector_index import ArticleIndex, read_manifest
+
 # -----------------------------
 # GLOBALS
 # -----------------------------
 vectorstore = None
+embeddings = None
+index_path = None
 client = None
 chat_history = []
 llm_model = "Meta-Llama-3.3-70B-Instruct"
-db_path = "global_news.db"
+db_path = DB_FILE
 retrieval_mode = "uninitialized"
 generation_mode = "uninitialized"
 
+RRF_K = 60  # rank offset in reciprocal rank fusion
+HYBRID_DEPTH = 3  # candidates each retriever contributes, as a multiple of top_k
+
+INDEX_RELOAD_INTERVAL = 10  # seconds between checks for a new index version
+
+# Long-lived threads, so each keeps its article store connection
+retrieval_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="retrieval")
+index_reload_lock = threading.Lock()
+
 CATEGORIES = [
     "Politics", "Technology", "Sports",
     "Business", "Health", "Entertainment",
@@ -54,10 +68,12 @@ def init_rag(
     llm_model_param="Meta-Llama-3.3-70B-Instruct",
     sambanova_api_key=os.getenv("SAMBANOVA_API_KEY")
 ):
-    global vectorstore, client, llm_model, retrieval_mode, generation_mode
+    global vectorstore, embeddings, index_path, client, llm_model, retrieval_mode, generation_mode
 
     llm_model = llm_model_param
     vectorstore = None
+    embeddings = None
+    index_path = faiss_path
     client = None
     retrieval_mode = "database"
     generation_mode = "local-summary"
@@ -84,16 +100,8 @@ def init_rag(
             encode_kwargs={"normalize_embeddings": True}
         )
 
-        if os.path.exists(faiss_path):
-            vectorstore = FAISS.load_local(
-                faiss_path,
-                embeddings,
-                allow_dangerous_deserialization=True
-            )
-            retrieval_mode = "faiss"
-            print("Loaded existing FAISS index")
-        else:
-            print("FAISS index not found. Falling back to database retrieval")
+        if not reload_vector_index():
+            print("FAISS index not found. Using database retrieval until the embedder publishes one")
     except Exception as exc:
         print(f"FAISS initialization unavailable, using database retrieval instead: {exc}")
 
@@ -121,6 +129,51 @@ def init_rag(
     }
 
 
+def reload_vector_index():
+    """
+    Load the FAISS index version the embedder last published, if it is newer
+    than the one in use. New segments are mapped before the swap, so searches
+    already running finish on the previous version and never wait for a
+    reload. Returns True when a new version was loaded.
+    """
+    global vectorstore, retrieval_mode
+
+    if embeddings is None or not index_path:
+        return False
+    with index_reload_lock:
+        try:
+            if vectorstore is None:
+                if read_manifest(index_path) is None:
+                    return False
+                vectorstore = ArticleIndex(index_path, embeddings, db_path=db_path)
+                retrieval_mode = "faiss"
+            elif not vectorstore.refresh():
+                return False
+        except Exception as exc:
+            print(f"FAISS index reload failed, keeping the current version: {exc}")
+            return False
+    print(
+        f"Memory-mapped FAISS index version {vectorstore.version} with "
+        f"{vectorstore.ntotal} chunks in {vectorstore.segment_count} segments"
+    )
+    return True
+
+
+def start_index_watcher(interval=INDEX_RELOAD_INTERVAL):
+    """
+    Check for a new index version every ``interval`` seconds on a daemon
+    thread. Set the returned event to stop it.
+    """
+    stop = threading.Event()
+
+    def watch():
+        while not stop.wait(interval):
+            reload_vector_index()
+
+    threading.Thread(target=watch, name="index-watcher", daemon=True).start()
+    return stop
+
+
 def format_timestamp(iso_string):
     """Convert ISO timestamp to readable format."""
     try:
@@ -209,59 +262,30 @@ def extract_query_terms(query: str):
 
 def search_local_documents(category=None, days_filter=None, top_k=10, query=""):
     """
-    Offline-safe fallback retrieval from the local SQLite article store.
+    Offline-safe fallback retrieval from the local SQLite article store,
+    ranked by the full-text index.
     """
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-
-        sql = """
-            SELECT id, title, teaser, full_text, scraped_at, predicted_category, image_url
-            FROM articles
-            WHERE full_text IS NOT NULL
-        """
-        params = []
-
-        if category:
-            sql += " AND predicted_category = ?"
-            params.append(category)
-
+        since = None
         if days_filter:
-            cutoff_date = (datetime.now() - timedelta(days=days_filter)).isoformat()
-            sql += " AND scraped_at > ?"
-            params.append(cutoff_date)
+            since = (datetime.now() - timedelta(days=days_filter)).strftime("%Y-%m-%d %H:%M:%S")
 
-        sql += " ORDER BY scraped_at DESC LIMIT 500"
-        cursor.execute(sql, params)
-        rows = cursor.fetchall()
-        conn.close()
-
-        query_terms = extract_query_terms(query)
-        scored_documents = []
+        rows = search_articles(
+            get_store(db_path).connection(),
+            terms=extract_query_terms(query),
+            category=category,
+            since=since,
+            limit=top_k,
+        )
 
+        documents = []
         for row in rows:
-            article_id, title, teaser, full_text, scraped_at, predicted_category, image_url = row
+            article_id, title, teaser, full_text, scraped_at, predicted_category, image_url, score = row
             title = title or ""
             teaser = teaser or ""
             full_text = full_text or ""
-            haystack = f"{title} {teaser} {full_text}".lower()
-
-            if query_terms:
-                score = 0
-                for term in query_terms:
-                    term_hits = haystack.count(term)
-                    if term_hits:
-                        score += term_hits
-                        if term in title.lower():
-                            score += 4
-                        if term in teaser.lower():
-                            score += 2
-                if score <= 0:
-                    continue
-            else:
-                score = 1
 
-            doc = Document(
+            documents.append(Document(
                 page_content=full_text or teaser or title,
                 metadata={
                     "id": article_id,
@@ -270,18 +294,10 @@ def search_local_documents(category=None, days_filter=None, top_k=10, query=""):
                     "category": predicted_category or "General",
                     "date": scraped_at or "unknown",
                     "image_url": image_url or "",
+                    "scores": {} if score is None else {"bm25": score},
                 }
-            )
-            scored_documents.append((score, doc))
-
-        scored_documents.sort(
-            key=lambda item: (
-                item[0],
-                item[1].metadata.get("date", "")
-            ),
-            reverse=True
-        )
-        return [doc for _, doc in scored_documents[:top_k]]
+            ))
+        return documents
     except Exception as e:
         print(f"Error during local document search: {e}")
         return []
@@ -400,39 +416,73 @@ def build_messages(query, context, conversation_history=None, include_summary=Fa
     return messages
 
 
-def retrieve_documents(query, category=None, days_filter=None, top_k=10):
-    docs = []
+def dense_search(query, category=None, days_filter=None, top_k=10):
+    """
+    Vector similarity search over the FAISS index, if one is loaded. Category
+    and date filters restrict which vectors FAISS scores, so up to top_k
+    matching articles come back whenever they exist.
+    """
+    if not vectorstore:
+        return []
 
-    if vectorstore:
-        try:
-            docs = vectorstore.similarity_search(query, k=top_k)
-        except Exception as exc:
-            print(f"Vector retrieval failed, using database fallback instead: {exc}")
+    try:
+        if not category and not days_filter:
+            hits = vectorstore.similarity_search_with_score(query, k=top_k)
+        else:
+            since = None
+            if days_filter:
+                since = (datetime.now() - timedelta(days=days_filter)).strftime("%Y-%m-%d %H:%M:%S")
+            article_ids = filter_article_ids(get_store(db_path).connection(), category=category, since=since)
+            hits = vectorstore.similarity_search_with_score(query, k=top_k, article_ids=article_ids)
+        for doc, score in hits:
+            doc.metadata["scores"] = {"cosine": float(score)}
+        return [doc for doc, _score in hits]
+    except Exception as exc:
+        print(f"Vector retrieval failed, using keyword results only: {exc}")
+        return []
 
-    if category:
-        docs = [doc for doc in docs if doc.metadata.get("category", "").lower() == category.lower()]
 
-    if days_filter:
-        cutoff_date = datetime.now() - timedelta(days=days_filter)
-        filtered_docs = []
-        for doc in docs:
-            try:
-                doc_date = datetime.fromisoformat(doc.metadata.get("date", ""))
-                if doc_date > cutoff_date:
-                    filtered_docs.append(doc)
-            except Exception:
-                continue
-        docs = filtered_docs
+def reciprocal_rank_fusion(rankings, top_k=10, k=RRF_K):
+    """
+    Merge ranked document lists with reciprocal rank fusion: a document
+    scores 1 / (k + rank) in every list it appears in, and the sums decide
+    the final order. ``rankings`` maps a retriever name to its ranked docs;
+    each returned doc carries, in ``metadata["scores"]``, the fused score
+    under "rrf" and, per retriever that found it, the retriever's own scores
+    (e.g. "cosine" or "bm25") next to its RRF term.
+    """
+    fused = {}
+    for source, docs in rankings.items():
+        for rank, doc in enumerate(docs, 1):
+            key = doc.metadata.get("id") or doc.page_content
+            entry = fused.setdefault(key, {"doc": doc, "scores": {}})
+            entry["scores"][source] = {**doc.metadata.get("scores", {}), "rrf": 1.0 / (k + rank)}
+
+    def total(entry):
+        return sum(scores["rrf"] for scores in entry["scores"].values())
+
+    ranked = sorted(fused.values(), key=total, reverse=True)
+    results = []
+    for entry in ranked[:top_k]:
+        scores = dict(entry["scores"])
+        scores["rrf"] = total(entry)
+        doc = entry["doc"]
+        results.append(Document(page_content=doc.page_content, metadata={**doc.metadata, "scores": scores}))
+    return results
 
-    if not docs:
-        docs = search_local_documents(
-            category=category,
-            days_filter=days_filter,
-            top_k=top_k,
-            query=query
-        )
 
-    return docs
+def retrieve_documents(query, category=None, days_filter=None, top_k=10):
+    """
+    Hybrid retrieval: the FAISS and full-text searches run concurrently and
+    their rankings are fused, so exact names the vectors miss still surface.
+    """
+    depth = top_k * HYBRID_DEPTH
+    dense = retrieval_pool.submit(dense_search, query, category, days_filter, depth)
+    lexical = retrieval_pool.submit(search_local_documents, category, days_filter, depth, query)
+    return reciprocal_rank_fusion(
+        {"dense": dense.result(), "lexical": lexical.result()},
+        top_k=top_k,
+    )
 
 
 # ========================================
@@ -509,7 +559,8 @@ def query_rag(query: str, conversation_history=None, max_chars=700, top_k=10, us
                 "category": doc.metadata.get("category", ""),
                 "date": format_timestamp(doc.metadata.get("date", "")),
                 "image_url": doc.metadata.get("image_url", ""),
-                "teaser": doc.metadata.get("teaser", "")
+                "teaser": doc.metadata.get("teaser", ""),
+                "scores": doc.metadata.get("scores", {}),
             })
 
         metadata = {
@@ -1,23 +1,68 @@
 import requests
-from bs4 import BeautifulSoup
-import sqlite3
-import time
+import os
+import queue
+import threading
 import re
-from urllib.parse import urljoin
 from tqdm import tqdm
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from langdetect import detect
 from deep_translator import GoogleTranslator
+from requests.adapters import HTTPAdapter
+
+from article_store import DB_FILE, get_store
+from fetcher import (
+    CircuitBreaker,
+    FetchEngine,
+    RequestStats,
+    RetryPolicy,
+    host_of,
+    parse_retry_after,
+)
+from frontier import CrawlFrontier, section_of
+from http_cache import HttpCache
+from link_index import LinkIndex
+from dedupe import NearDuplicateIndex, canonicalize_url, simhash
+from extractors import (
+    OG_IMAGE,
+    OG_TITLE,
+    ParsePool,
+    extract_links,
+    has_class,
+    html_to_text,
+    parse_feed,
+)
+from translation import BatchTranslator, GoogleBackend, TranslationCache
 # ---------------- SETTINGS ----------------
-DB_FILE = "global_news.db"
 translator = GoogleTranslator(source='auto', target='en')
+batch_translator = BatchTranslator(GoogleBackend(translator), TranslationCache())
+
+MAX_WORKERS = 20
+WRITE_BATCH_SIZE = 50  # articles per database commit
+WRITE_QUEUE_SIZE = 200  # scraped articles waiting for the writer
+TRANS_WORKERS = 5  # threads for parallel translation
+TRANSLATE_BATCH_ARTICLES = 10  # eKantipur articles per translation batch
+PER_HOST_WORKERS = 4  # concurrent downloads per host
+HOST_DELAY = 0.25  # seconds between request starts on the same host
+FETCH_QUEUE_SIZE = 64  # downloaded pages waiting to be parsed
+PARSE_WORKERS = os.cpu_count() or 1  # processes for HTML parsing
+PARSE_QUEUE_SIZE = 64  # pages queued in or being parsed by the parse pool
+CRAWL_MAX_DEPTH = 2  # links followed from a section page when crawling
+CRAWL_SECTION_BUDGET = 25  # pages crawled per site section
+CRAWL_WAVE_SIZE = 20  # crawl pages fetched concurrently
+RETRY_ATTEMPTS = 3  # tries per request
+RETRY_BASE_DELAY = 0.5  # seconds before the first retry, doubled per retry
+RETRY_MAX_DELAY = 30  # longest backoff or Retry-After wait
+HOST_FAILURE_THRESHOLD = 5  # failed requests in a row before a host is skipped
 
 session = requests.Session()
 session.headers.update({"User-Agent": "Mozilla/5.0"})
+session.mount("http://", HTTPAdapter(pool_maxsize=MAX_WORKERS))
+session.mount("https://", HTTPAdapter(pool_maxsize=MAX_WORKERS))
 
-
-MAX_WORKERS = 20
-TRANS_WORKERS = 5  # threads for parallel translation
+http_cache = HttpCache()
+retry_policy = RetryPolicy(RETRY_ATTEMPTS, RETRY_BASE_DELAY, RETRY_MAX_DELAY)
+circuit_breaker = CircuitBreaker(HOST_FAILURE_THRESHOLD)
+request_stats = RequestStats()
 
 # ---------------- SOURCES ----------------
 BBC_RSS = [
@@ -38,360 +83,473 @@ INDIA_RSS = [
 
 # ---------------- DATABASE ----------------
 def init_db():
-    conn = sqlite3.connect(DB_FILE)
+    conn = get_store(DB_FILE).connect()
     cursor = conn.cursor()
-    cursor.execute("""
-        CREATE TABLE IF NOT EXISTS articles (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            source TEXT,
-            category TEXT,
-            title TEXT,
-            link TEXT UNIQUE,
-            teaser TEXT,
-            image_url TEXT,
-            full_text TEXT,
-            scraped_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-        )
-    """)
-    conn.commit()
     return conn, cursor
 
-def get_existing_links(cursor):
-    cursor.execute("SELECT link FROM articles")
-    return set(x[0] for x in cursor.fetchall())
-
 # ---------------- UTILITIES ----------------
-def safe_request(url, retries=3):
-    for _ in range(retries):
+def safe_request(url, retries=None, cache=None):
+    # With a cache, send the stored validators and hand back 304 replies too
+    host = host_of(url)
+    headers = cache.conditional_headers(url) if cache else None
+    attempts = retries or retry_policy.attempts
+    for attempt in range(attempts):
+        if not circuit_breaker.allow(host):
+            request_stats.add("circuit_open")
+            return None
+        retry_after = None
         try:
-            r = session.get(url, timeout=10)
+            r = session.get(url, timeout=10, headers=headers)
+        except requests.RequestException:
+            pass
+        else:
             if r.status_code == 200:
+                circuit_breaker.record_success(host)
+                request_stats.add("ok")
+                if cache:
+                    cache.stage(url, r)
                 return r
-        except:
-            time.sleep(1)
+            if r.status_code == 304 and cache:
+                circuit_breaker.record_success(host)
+                request_stats.add("not_modified")
+                return r
+            if not retry_policy.should_retry(r.status_code):
+                # The host answered; the page is just not there
+                circuit_breaker.record_success(host)
+                request_stats.add("failed")
+                return None
+            retry_after = parse_retry_after(r.headers.get("Retry-After"))
+
+        delay = retry_policy.delay(attempt, retry_after)
+        if attempt + 1 == attempts or delay is None:
+            break
+        request_stats.add("retried")
+        retry_policy.sleep(delay)
+
+    request_stats.add("failed")
+    if circuit_breaker.record_failure(host):
+        print(f"Circuit open for {host}: skipping it for the rest of the run")
     return None
 
-def clean_text(text):
-    return re.sub(r"\s+", " ", text).strip()
-
-
-# ---------------- BBC ----------------
-def scrape_bbc(existing_links, max_articles=100):
-    articles = []
-    all_items = []
-    for rss in BBC_RSS:
-        r = safe_request(rss)
-        if not r:
+fetch_engine = FetchEngine(
+    safe_request,
+    max_concurrency=MAX_WORKERS,
+    per_host=PER_HOST_WORKERS,
+    host_delay=HOST_DELAY,
+)
+parse_pool = ParsePool(PARSE_WORKERS, max_pending=PARSE_QUEUE_SIZE)
+
+def fetch_feeds(urls):
+    """
+    Fetch feeds or section pages with conditional GET.
+    Returns (url, response) for the pages that changed, in ``urls`` order;
+    pages answering 304 Not Modified are left out.
+    """
+    responses = fetch_engine.fetch_all(
+        urls, fetch=lambda url: safe_request(url, cache=http_cache)
+    )
+    changed = []
+    unchanged = 0
+    for url in urls:
+        r = responses.get(url)
+        if r is None:
             continue
-        soup = BeautifulSoup(r.content, "xml")
-        all_items.extend(soup.find_all("item"))
-    all_items = all_items[:max_articles]
-    with tqdm(total=len(all_items), desc="BBC") as pbar:
-        for item in all_items:
-            link = item.link.text
-            if link in existing_links:
-                pbar.update(1)
-                continue
-            title = item.title.text
-            teaser = item.description.text if item.description else ""
-            r = safe_request(link)
-            if not r:
-                pbar.update(1)
-                continue
-            soup = BeautifulSoup(r.text, "html.parser")
-            paragraphs = soup.select("article p")
-            full_text = clean_text(" ".join(p.get_text() for p in paragraphs))
-            img_tag = soup.find("meta", property="og:image")
-            image_url = img_tag["content"] if img_tag else None
-            articles.append(
-                ("BBC", "General", title, link, teaser, image_url, full_text[:4000])
+        if r.status_code == 304:
+            unchanged += 1
+        else:
+            changed.append((url, r))
+    if unchanged:
+        print(f"{unchanged}/{len(urls)} feeds not modified since last run")
+    return changed
+
+
+# ---------------- SITES ----------------
+# One entry per source. Links come from "feeds" (RSS items) or "sections"
+# (anchors matching "link_pattern" on section pages); Al Jazeera and eKantipur
+# discover links in their own scrapers. The title/body/image rules are XPath
+# applied by extractors.extract_article; without a "title" rule the feed or
+# anchor title is kept.
+SITES = {
+    "bbc": {
+        "source": "BBC",
+        "category": "General",
+        "label": "BBC",
+        "feeds": BBC_RSS,
+        "body": ["//article//p"],
+        "image": OG_IMAGE,
+        "max_chars": 4000,
+    },
+    "npr": {
+        "source": "NPR",
+        "category": "General",
+        "label": "NPR",
+        "sections": NPR_SECTIONS,
+        "link_pattern": r"/2026/",
+        "link_base": "https://www.npr.org",
+        "min_link_text": 21,
+        "body": [
+            "//article//p",
+            f"//div[{has_class('storytext')}]//p",
+            f"//div[{has_class('body-text')}]//p",
+            "//div[@id='storytext']//p",
+        ],
+        "image": None,
+        "max_chars": 4000,
+    },
+    "india": {
+        "source": "Indian News",
+        "category": "India",
+        "label": "India",
+        "feeds": INDIA_RSS,
+        "body": ["//p"],
+        "image": OG_IMAGE,
+        "max_chars": 2000,
+    },
+    "aljazeera": {
+        "source": "Al Jazeera",
+        "category": "International",
+        "label": "Al Jazeera Articles",
+        "home": "https://www.aljazeera.com",
+        "crawl_sections": ["news", "economy", "sports", "politics", "middle-east"],
+        "link_pattern": r"/20",
+        "title": ["//h1"],
+        "body": [f"//div[{has_class('wysiwyg')}]//p"],
+        "image": OG_IMAGE,
+        "max_chars": 4000,
+    },
+    "ekantipur": {
+        "source": "eKantipur",
+        "category": "Nepal",
+        "label": "eKantipur",
+        "home": "https://ekantipur.com/",
+        "link_pattern": r"/20",
+        "title": [OG_TITLE, "//h1"],
+        "body": [
+            f"//div[{has_class('description')}]//p | //div[{has_class('story')}]//p | //article//p",
+            "//p",
+        ],
+        "require_body": True,
+        "image": OG_IMAGE,
+        "max_chars": 4000,
+    },
+}
+
+def discover_links(site):
+    """
+    Return (candidates, feed_links) from a site's feeds or section pages, or
+    None when none of them changed since the last run. Candidates are
+    (link, title, teaser); a teaser of None means the page's first paragraph
+    is used. ``feed_links`` maps each changed page's URL to its links.
+    """
+    pages = fetch_feeds(site["feeds"] if "feeds" in site else site["sections"])
+    if not pages:
+        return None
+    candidates = []
+    feed_links = {}
+    for url, r in pages:
+        links = feed_links.setdefault(url, set())
+        if "feeds" in site:
+            for link, title, description in parse_feed(r.content):
+                candidates.append((canonicalize_url(link), title, html_to_text(description)))
+                links.add(candidates[-1][0])
+        else:
+            anchors = extract_links(
+                r.text, site["link_pattern"], site["link_base"], site.get("min_link_text", 0)
             )
+            for link, text in anchors:
+                candidates.append((canonicalize_url(link), text, None))
+                links.add(candidates[-1][0])
+    return candidates, feed_links
+
+def extract_pages(site, candidates, link_index, failed=None):
+    """
+    Fetch the candidates whose links are not indexed yet and yield an article
+    tuple for every page the site's rules accept. Links whose download
+    failed are added to ``failed``.
+    """
+    known = {}
+    for link, title, teaser in candidates:
+        known.setdefault(link, (title, teaser))
+    new_links = link_index.filter_new(known)
+
+    with tqdm(total=len(candidates), desc=site["label"]) as pbar:
+        pbar.update(len(candidates) - len(new_links))
+
+        # Fetch threads download while the parse pool extracts on other cores
+        def downloaded():
+            for link, r in fetch_engine.iter_fetch(new_links, buffer_size=FETCH_QUEUE_SIZE):
+                if r:
+                    yield link, r.text
+                else:
+                    if failed is not None:
+                        failed.add(link)
+                    pbar.update(1)
+
+        for link, page in parse_pool.extract_many(site, downloaded()):
+            if page:
+                title, teaser = known[link]
+                yield (
+                    site["source"],
+                    site["category"],
+                    page["title"] or title,
+                    link,
+                    page["teaser"] if teaser is None else teaser,
+                    page["image_url"],
+                    page["full_text"],
+                )
             pbar.update(1)
-    return articles
 
-# ---------------- NPR ----------------
-def scrape_npr(existing_links, max_articles=100):
-    articles = []
-    links = []
-
-    # Collect links and titles from NPR sections
-    for section in NPR_SECTIONS:
-        r = safe_request(section)
-        if not r:
-            continue
-
-        soup = BeautifulSoup(r.text, "html.parser")
-
-        for a in soup.find_all("a", href=True):
-            href = a["href"]
-
-            if "/2026/" in href and len(a.get_text(strip=True)) > 20:
-                full_link = urljoin("https://www.npr.org", href)
-                links.append((full_link, a.get_text(strip=True)))
-
-    links = links[:max_articles]
-
-    with tqdm(total=len(links), desc="NPR") as pbar:
-        for link, title in links:
-
-            if link in existing_links:
-                pbar.update(1)
-                continue
-
-            r = safe_request(link)
-            if not r:
-                pbar.update(1)
-                continue
-
-            soup = BeautifulSoup(r.text, "html.parser")
-
-            # Extract article text
-            paragraphs = (
-                soup.select("article p") or
-                soup.select("div.storytext p") or
-                soup.select("div.body-text p") or
-                soup.select("div#storytext p")
-            )
-
-            full_text = clean_text(
-                " ".join(p.get_text() for p in paragraphs)
-            ) if paragraphs else ""
-
-            teaser = paragraphs[0].get_text(strip=True) if paragraphs else ""
-
-            # ❌ Image removed completely
-            image_url = None
-
-            articles.append(
-                ("NPR", "General", title, link, teaser, image_url, full_text[:4000])
-            )
+def scrape_site(site, link_index, max_articles=100):
+    found = discover_links(site)
+    if not found:
+        return
+    candidates, feed_links = found
+    kept = candidates[:max_articles]
+    failed = set()
+    yield from extract_pages(site, kept, link_index, failed)
+
+    # A feed with links that failed, or were cut and are not indexed yet,
+    # must be fetched in full next run, so its validators are not saved
+    kept_links = {link for link, _title, _teaser in kept}
+    cut = [link for link, _title, _teaser in candidates[max_articles:] if link not in kept_links]
+    unfetched = failed | set(link_index.filter_new(cut))
+    done = {link for link, _title, _teaser in candidates} - unfetched
+    incomplete = [url for url, links in feed_links.items() if not links <= done]
+    http_cache.discard(incomplete)
 
-            pbar.update(1)
 
-    return articles
+# ---------------- BBC ----------------
+def scrape_bbc(link_index, max_articles=100):
+    yield from scrape_site(SITES["bbc"], link_index, max_articles)
 
+# ---------------- NPR ----------------
+def scrape_npr(link_index, max_articles=100):
+    yield from scrape_site(SITES["npr"], link_index, max_articles)
 
 # ---------------- INDIA ----------------
-def scrape_india(existing_links, max_articles=100):
-    articles = []
-    all_items = []
-
-    # Collect RSS items
-    for rss in INDIA_RSS:
-        r = safe_request(rss)
-        if not r:
-            continue
-        soup = BeautifulSoup(r.content, "xml")
-        all_items.extend(soup.find_all("item"))
-
-    all_items = all_items[:max_articles]
-
-    with tqdm(total=len(all_items), desc="India") as pbar:
-        for item in all_items:
-            link = item.link.text
-            if link in existing_links:
-                pbar.update(1)
-                continue
-
-            # Title
-            title = item.title.text if item.title else ""
-
-            # Clean teaser from HTML tags, remove images etc.
-            if item.description:
-                teaser_soup = BeautifulSoup(item.description.text, "html.parser")
-                teaser = clean_text(teaser_soup.get_text())
-            else:
-                teaser = ""
-
-            # Full article
-            r = safe_request(link)
-            if not r:
-                pbar.update(1)
-                continue
-
-            soup = BeautifulSoup(r.text, "html.parser")
-            paragraphs = soup.select("p")
-            full_text = clean_text(" ".join(p.get_text() for p in paragraphs))
-
-            # Image
-            img_tag = soup.find("meta", property="og:image")
-            image_url = img_tag["content"] if img_tag else None
-
-            articles.append(
-                ("Indian News", "India", title, link, teaser, image_url, full_text[:2000])
-            )
-
-            pbar.update(1)
-
-    return articles
+def scrape_india(link_index, max_articles=100):
+    yield from scrape_site(SITES["india"], link_index, max_articles)
 
 # ---------------- AL JAZEERA ----------------
-def scrape_aljazeera(existing_links, max_articles=120):
-    BASE = "https://www.aljazeera.com"
+def scrape_aljazeera(link_index, max_articles=120):
+    site = SITES["aljazeera"]
+    BASE = site["home"]
+    article_pattern = re.compile(site["link_pattern"])
+
     def collect_links(limit=120):
-        visited = set()
-        article_links = set()
-        queue = [
-            f"{BASE}/news/",
-            f"{BASE}/economy/",
-            f"{BASE}/sports/",
-            f"{BASE}/politics/",
-            f"{BASE}/middle-east/"
-        ]
+        # Section and article pages are crawled in concurrent waves until
+        # enough article links are found; the fetch engine handles politeness
+        frontier = CrawlFrontier(
+            max_depth=CRAWL_MAX_DEPTH,
+            section_budget=CRAWL_SECTION_BUDGET,
+            is_priority=article_pattern.search,
+        )
+        for section in site["crawl_sections"]:
+            frontier.add(canonicalize_url(f"{BASE}/{section}/"))
+        article_links = {}
         with tqdm(total=limit, desc="Al Jazeera Links") as pbar:
-            while queue and len(article_links) < limit:
-                url = queue.pop(0)
-                if url in visited:
-                    continue
-                visited.add(url)
-                r = safe_request(url)
-                if not r:
-                    continue
-                soup = BeautifulSoup(r.text, "html.parser")
-                for a in soup.find_all("a", href=True):
-                    link = a["href"]
-                    if link.startswith("/"):
-                        link = BASE + link
-                    if "/20" in link and "aljazeera.com" in link:
-                        if link not in article_links:
-                            article_links.add(link)
+            while frontier and len(article_links) < limit:
+                depths = dict(frontier.pop_batch(CRAWL_WAVE_SIZE))
+                for url, r in fetch_engine.iter_fetch(depths):
+                    if not r:
+                        continue
+                    for link, _text in extract_links(r.text, "", BASE):
+                        if not link.startswith(BASE):
+                            continue
+                        link = canonicalize_url(link)
+                        if article_pattern.search(link) and link not in article_links:
+                            article_links[link] = None
                             pbar.update(1)
-                    if BASE in link and link not in visited:
-                        if any(x in link for x in ["news","economy","sports","politics","middle-east"]):
-                            queue.append(link)
+                        if section_of(link) in site["crawl_sections"]:
+                            frontier.add(link, depths[url] + 1)
+                        if len(article_links) >= limit:
+                            break
                     if len(article_links) >= limit:
                         break
-                time.sleep(0.5)
         return list(article_links)
 
     links = collect_links(max_articles)
-    articles = []
-    with tqdm(total=len(links), desc="Al Jazeera Articles") as pbar:
-        for link in links:
-            if link in existing_links:
-                pbar.update(1)
-                continue
-            r = safe_request(link)
-            if not r:
-                pbar.update(1)
-                continue
-            soup = BeautifulSoup(r.text, "html.parser")
-            title_tag = soup.find("h1")
-            if not title_tag:
-                pbar.update(1)
-                continue
-            title = title_tag.get_text(strip=True)
-            paragraphs = soup.select("div.wysiwyg p")
-            full_text = clean_text(" ".join(p.get_text() for p in paragraphs))
-            teaser = paragraphs[0].get_text(strip=True) if paragraphs else ""
-            img_tag = soup.find("meta", property="og:image")
-            image_url = img_tag["content"] if img_tag else None
-            articles.append(
-                ("Al Jazeera", "International", title, link, teaser, image_url, full_text[:4000])
-            )
-            pbar.update(1)
-    return articles
+    yield from extract_pages(site, [(link, None, None) for link in links], link_index)
 
 # eKantipur (all-in-one)
 # ---------------- eKantipur (Chunk 2000 → Full 4000) ----------------
-def scrape_ekantipur(existing_links, max_articles=150):
-    r = safe_request("https://ekantipur.com/")
-    if not r: return []
-    
-    soup = BeautifulSoup(r.text, "lxml")
-    links = set()
-    for a in soup.select('a[href*="/20"]'):
-        href = a.get("href")
-        if href:
-            if not href.startswith("http"):
-                href = urljoin("https://ekantipur.com/", href)
-            links.add(href)
-    links = list(links)[:max_articles]
-
-    articles = []
-    def process_link(link):
-        if link in existing_links: return None
-        r = safe_request(link)
-        if not r: return None
-        
-        s = BeautifulSoup(r.text, "lxml")
-        
-        # title
-        og = s.find("meta", property="og:title")
-        title = (og["content"].strip() if og and og.get("content") 
-                else s.find("h1").get_text(strip=True) if s.find("h1") else None)
-        if not title: return None
-        
-        # text
-        ps = s.select("div.description p, div.story p, article p") or s.select("p")
-        if not ps: return None
-        full = clean_text(" ".join(p.get_text() for p in ps))
-        teaser = ps[0].get_text(strip=True) if ps else ""
-        
-        # image
-        img = s.find("meta", property="og:image")
-        img_url = img["content"] if img else None
-
-        # Chunk into 2000 but keep up to 4000 final
-        try:
-            t_title = translator.translate(title) if title else ""
-            t_teaser = translator.translate(teaser) if teaser else ""
-            
-            # Split into 2000 char chunks
+def scrape_ekantipur(link_index, max_articles=150):
+    site = SITES["ekantipur"]
+    r = safe_request(site["home"])
+    if not r: return
+
+    links = dict.fromkeys(
+        canonicalize_url(link)
+        for link, _text in extract_links(r.text, site["link_pattern"], site["home"])
+    )
+    candidates = [(link, None, None) for link in list(links)[:max_articles]]
+
+    def translate_pages(pages):
+        # Title, teaser and 2000-char chunks (up to 4000) of every page go
+        # out together, so one request covers many short strings
+        texts = []
+        for _source, _category, title, link, teaser, img_url, full in pages:
             chunks = [full[i:i+2000] for i in range(0, min(len(full), 4000), 2000)]
-            t_chunks = []
-            for chunk in chunks:
-                if chunk.strip():
-                    t_chunks.append(translator.translate(chunk))
-                    time.sleep(0.8)          # safe delay
-            t_full = " ".join(t_chunks)
-            
-            return ("eKantipur", "Nepal", t_title, link, t_teaser, img_url, t_full)
+            texts.append([title, teaser] + chunks)
+        try:
+            translated = batch_translator.translate_many(t for group in texts for t in group)
         except:
-            return ("eKantipur", "Nepal", title, link, teaser, img_url, full[:4000])
+            return pages
 
-    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as ex:
-        futures = [ex.submit(process_link, lnk) for lnk in links]
-        for f in tqdm(as_completed(futures), total=len(futures), desc="eKantipur"):
-            res = f.result()
-            if res: articles.append(res)
-    return articles
+        articles = []
+        offset = 0
+        for (source, category, title, link, teaser, img_url, full), group in zip(pages, texts):
+            t_title, t_teaser, *t_chunks = translated[offset:offset + len(group)]
+            offset += len(group)
+            articles.append(
+                (source, category, t_title, link, t_teaser, img_url, " ".join(t_chunks))
+            )
+        return articles
+
+    # Translation batches start as soon as enough pages have been parsed
+    with ThreadPoolExecutor(max_workers=TRANS_WORKERS) as ex:
+        futures = []
+        pages = []
+        for page in extract_pages(site, candidates, link_index):
+            pages.append(page)
+            if len(pages) >= TRANSLATE_BATCH_ARTICLES:
+                futures.append(ex.submit(translate_pages, pages))
+                pages = []
+        if pages:
+            futures.append(ex.submit(translate_pages, pages))
+
+        for f in as_completed(futures):
+            for article in f.result():
+                yield article
+
+    stats = batch_translator.stats
+    print(
+        f"Translations: {stats['cached']} cached, {stats['translated']} new "
+        f"in {stats['requests']} requests"
+    )
 
 # ---------------- SAVE ----------------
-def save_articles(cursor, articles):
-    cursor.executemany("""
-        INSERT OR IGNORE INTO articles
-        (source, category, title, link, teaser, image_url, full_text)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-    """, articles)
+def save_articles(cursor, articles, link_index, duplicate_index):
+    """
+    Insert articles, dropping near-duplicates of stored ones so they never
+    reach classification or embedding. Returns the number of rows inserted.
+    """
+    saved = 0
+    duplicates = 0
+    for article in articles:
+        fingerprint = simhash(article[6])
+        if duplicate_index.find_duplicate(fingerprint) is not None:
+            duplicates += 1
+            continue
+        cursor.execute("""
+            INSERT OR IGNORE INTO articles
+            (source, category, title, link, teaser, image_url, full_text)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, article)
+        if cursor.rowcount:
+            saved += 1
+            duplicate_index.add(cursor.lastrowid, fingerprint)
+
+    # Dropped duplicates are indexed too, so they are not fetched again
+    link_index.add(article[3] for article in articles)
+    if duplicates:
+        print(f"Skipped {duplicates} near-duplicate articles")
+    return saved
+
+# ---------------- WRITER ----------------
+class ArticleWriter(threading.Thread):
+    """
+    Single database writer fed by the scrapers through a bounded queue.
+    Articles are saved and committed in batches of ``batch_size``, so memory
+    stays flat during a run and a crash only loses the current batch.
+    """
+
+    def __init__(self, db_file=DB_FILE, batch_size=WRITE_BATCH_SIZE, queue_size=WRITE_QUEUE_SIZE):
+        super().__init__(daemon=True)
+        self.db_file = db_file
+        self.batch_size = batch_size
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.received = 0
+        self.saved = 0
+        self.error = None
+
+    def put(self, article):
+        if self.error:
+            raise self.error
+        self.queue.put(article)
+
+    def close(self):
+        """Save whatever is still queued, stop the thread and return the saved count."""
+        self.queue.put(None)
+        self.join()
+        if self.error:
+            raise self.error
+        return self.saved
+
+    def run(self):
+        conn = get_store(self.db_file).connect()
+        done = False
+        try:
+            link_index = LinkIndex(conn)
+            duplicate_index = NearDuplicateIndex(conn)
+            batch = []
+            while not done:
+                article = self.queue.get()
+                done = article is None
+                if not done:
+                    batch.append(article)
+                    self.received += 1
+                if batch and (done or len(batch) >= self.batch_size):
+                    self.saved += save_articles(conn.cursor(), batch, link_index, duplicate_index)
+                    conn.commit()
+                    batch = []
+        except Exception as exc:
+            self.error = exc
+            # Keep draining so scrapers blocked on a full queue can finish
+            while not done:
+                done = self.queue.get() is None
+        finally:
+            conn.close()
+
 
 # ---------------- MAIN ----------------
 def main():
     conn, cursor = init_db()
-    existing_links = get_existing_links(cursor)
-
-    all_articles = []
-
-    print("Scraping BBC...")
-    all_articles += scrape_bbc(existing_links)
-
-    print("Scraping NPR...")
-    all_articles += scrape_npr(existing_links)
-
-    print("Scraping Al Jazeera...")
-    all_articles += scrape_aljazeera(existing_links)
-
-    print("Scraping India News...")
-    all_articles += scrape_india(existing_links)
-
-    print("Scraping eKantipur...")     
-    all_articles += scrape_ekantipur(existing_links)
-
-    print(f"\nSaving {len(all_articles)} articles to database...")
-    save_articles(cursor, all_articles)
-
-    conn.commit()
-    conn.close()
+    link_index = LinkIndex(conn)
+    writer = ArticleWriter(DB_FILE)
+    writer.start()
+
+    try:
+        print("Scraping BBC...")
+        for article in scrape_bbc(link_index):
+            writer.put(article)
+
+        print("Scraping NPR...")
+        for article in scrape_npr(link_index):
+            writer.put(article)
+
+        print("Scraping Al Jazeera...")
+        for article in scrape_aljazeera(link_index):
+            writer.put(article)
+
+        print("Scraping India News...")
+        for article in scrape_india(link_index):
+            writer.put(article)
+
+        print("Scraping eKantipur...")
+        for article in scrape_ekantipur(link_index):
+            writer.put(article)
+    finally:
+        parse_pool.close()
+        saved = writer.close()
+        conn.close()
+        print(f"\nSaved {saved} of {writer.received} scraped articles to database")
+        print(f"Requests: {request_stats.summary()}")
+        if circuit_breaker.open_hosts:
+            print(f"Hosts skipped after repeated failures: {', '.join(circuit_breaker.open_hosts)}")
+
+    # Only remember feed validators once their articles are committed
+    http_cache.flush()
     print("✅ Done. Global news database updated.")
 
 if __name__ == "__main__":
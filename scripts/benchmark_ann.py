@@ -0,0 +1,120 @@
+"""
+Compare the FAISS index types the embedder can build (flat, HNSW, IVF-PQ)
+on synthetic normalized vectors.
+
+For every corpus size and data set it builds each index type through
+vector_index.build_index, then runs single-vector queries (as the API does)
+for each efSearch / nprobe setting. It reports recall@k against exact
+search, p50/p99 latency, and the serialized index size per vector.
+"random" vectors are uniform on the sphere, the worst case for ANN
+indexes. "clustered" vectors sit around a few hundred topic centres,
+closer to real article embeddings.
+
+    python scripts/benchmark_ann.py [--sizes 10000 100000 1000000] [--dim 384]
+    python scripts/benchmark_ann.py --sizes 20000 --types hnsw --ef-search 16 64 256
+"""
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+import faiss
+import numpy as np
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from vector_index import INDEX_TYPES, build_index, search  # noqa: E402
+
+CLUSTERS = 256
+CLUSTER_SPREAD = 0.6  # norm of the offset from a topic centre, which has norm 1
+
+
+def make_vectors(kind, count, dim, rng, centres=None):
+    if kind == "random":
+        vectors = rng.standard_normal((count, dim), dtype="float32")
+    else:
+        labels = rng.integers(len(centres), size=count)
+        noise = rng.standard_normal((count, dim), dtype="float32") * float(CLUSTER_SPREAD / np.sqrt(dim))
+        vectors = centres[labels] + noise
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+def make_data(kind, count, queries, dim, seed):
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((CLUSTERS, dim), dtype="float32")
+    faiss.normalize_L2(centres)
+    return make_vectors(kind, count, dim, rng, centres), make_vectors(kind, queries, dim, rng, centres)
+
+
+def ground_truth(vectors, queries, k):
+    exact = faiss.IndexFlatIP(vectors.shape[1])
+    exact.add(vectors)
+    _scores, ids = exact.search(queries, k)
+    return ids
+
+
+def evaluate(index, queries, truth, k, **knobs):
+    latencies = []
+    hits = 0
+    for query, expected in zip(queries, truth):
+        start = time.perf_counter()
+        _scores, ids = search(index, query, k, **knobs)
+        latencies.append((time.perf_counter() - start) * 1000)
+        hits += len(set(ids) & set(expected.tolist()))
+    latencies.sort()
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return hits / truth.size, statistics.median(latencies), p99
+
+
+def settings(index_type, args):
+    if index_type == "hnsw":
+        return [("efSearch", value, {"ef_search": value}) for value in args.ef_search]
+    if index_type == "ivfpq":
+        return [("nprobe", value, {"nprobe": value}) for value in args.nprobe]
+    return [("exact", "-", {})]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=500)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--data", nargs="+", choices=["random", "clustered"], default=["random", "clustered"])
+    parser.add_argument("--types", nargs="+", choices=INDEX_TYPES, default=list(INDEX_TYPES))
+    parser.add_argument("--ef-search", type=int, nargs="+", default=[32, 128, 512])
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[4, 16, 64])
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"dim={args.dim}, {args.queries} queries, k={args.k}, {faiss.omp_get_max_threads()} threads")
+    print(
+        f"{'data':<10}{'vectors':>9}{'index':>7}{'build s':>9}{'knob':>10}{'value':>6}"
+        f"{'recall':>8}{'p50 ms':>9}{'p99 ms':>9}{'B/vec':>8}"
+    )
+    for kind in args.data:
+        for size in args.sizes:
+            vectors, queries = make_data(kind, size, args.queries, args.dim, args.seed)
+            truth = ground_truth(vectors, queries, args.k)
+            ids = np.arange(size, dtype="int64")
+            for index_type in args.types:
+                start = time.perf_counter()
+                index = build_index(ids, vectors, index_type)
+                build = time.perf_counter() - start
+                bytes_per_vector = faiss.serialize_index(index).nbytes / size
+                for knob, value, knobs in settings(index_type, args):
+                    recall, p50, p99 = evaluate(index, queries, truth, args.k, **knobs)
+                    print(
+                        f"{kind:<10}{size:>9}{index_type:>7}{build:>9.1f}{knob:>10}{value:>6}"
+                        f"{recall:>8.3f}{p50:>9.3f}{p99:>9.3f}{bytes_per_vector:>8.0f}"
+                    )
+                del index
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,109 @@
+"""
+Compare the zero-shot classifier's device / precision variants, and the
+embedding backend, on the labelled fixture articles in
+tests/fixtures/articles.jsonl.
+
+Every variant classifies the same texts (the fixture set repeated up to
+--articles). It reports load time, throughput in articles per second,
+padding efficiency (real / padded tokens, NLI only), agreement with the cpu:fp32 labels (how much quantization changes the
+output) and accuracy against the fixture labels. cuda:fp32 and cuda:fp16
+are added when a GPU is available.
+
+    python scripts/benchmark_classifier.py [--articles 200] [--threads 4]
+    python scripts/benchmark_classifier.py --variants cpu:fp32 cpu:int8 --token-budget 4096 8192 16384
+    python scripts/benchmark_classifier.py --variants embedding
+"""
+
+import argparse
+import itertools
+import json
+import sys
+import time
+from pathlib import Path
+
+import torch
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from classifier import (  # noqa: E402
+    MODEL_NAME,
+    ClassificationStats,
+    EmbeddingClassifier,
+    ZeroShotClassifier,
+    build_text,
+    load_head,
+)
+from embedder import load_embeddings  # noqa: E402
+
+FIXTURES = PROJECT_ROOT / "tests" / "fixtures" / "articles.jsonl"
+REFERENCE = "cpu:fp32"
+
+
+def load_fixtures(count):
+    with open(FIXTURES, encoding="utf-8") as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    rows = list(itertools.islice(itertools.cycle(rows), max(count, len(rows))))
+    texts = [build_text(row["title"], row["teaser"], row.get("full_text")) for row in rows]
+    return texts, [row["category"] for row in rows]
+
+
+def default_variants():
+    variants = [REFERENCE, "cpu:int8"]
+    if torch.cuda.is_available():
+        variants += ["cuda:fp32", "cuda:fp16"]
+    return variants + ["embedding"]
+
+
+def load_variant(variant, args):
+    if variant == "embedding":
+        return EmbeddingClassifier(load_embeddings(), head=load_head())
+    device, precision = variant.split(":")
+    return ZeroShotClassifier(args.model, device=device, precision=precision, threads=args.threads)
+
+
+def share(labels, expected):
+    return sum(a == b for a, b in zip(labels, expected)) / len(expected)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--articles", type=int, default=200)
+    parser.add_argument("--variants", nargs="+", default=default_variants(), help="device:precision pairs or embedding")
+    parser.add_argument("--token-budget", type=int, nargs="+", default=[None], help="padded tokens per batch; defaults to the device's")
+    parser.add_argument("--threads", type=int, default=0, help="CPU threads; 0 keeps torch's default")
+    parser.add_argument("--model", default=MODEL_NAME)
+    args = parser.parse_args()
+
+    texts, categories = load_fixtures(args.articles)
+    variants = [REFERENCE] + [variant for variant in args.variants if variant != REFERENCE]
+    reference = None
+
+    print(f"{args.model}, {len(texts)} articles")
+    print(f"{'variant':<12}{'budget':>8}{'load s':>8}{'art/s':>8}{'padding':>9}{'agree':>8}{'accuracy':>10}")
+    for variant in variants:
+        start = time.perf_counter()
+        classifier = load_variant(variant, args)
+        load = time.perf_counter() - start
+        # The embedding backend batches with the embedder's settings
+        budgets = args.token_budget if isinstance(classifier, ZeroShotClassifier) else [None]
+        for budget in budgets:
+            stats = ClassificationStats()
+            if budget is None:
+                labels = classifier.classify(texts, stats=stats)
+            else:
+                labels = classifier.classify(texts, token_budget=budget, stats=stats)
+            if reference is None:
+                reference = labels
+            budget = budget or getattr(classifier, "token_budget", "-")
+            padding = "-" if stats.padding_efficiency is None else f"{stats.padding_efficiency:.0%}"
+            print(
+                f"{variant:<12}{budget:>8}{load:>8.1f}{stats.throughput:>8.1f}{padding:>9}"
+                f"{share(labels, reference):>8.3f}{share(labels, categories):>10.3f}"
+            )
+        del classifier
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
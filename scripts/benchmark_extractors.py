@@ -0,0 +1,83 @@
+"""
+Compare the old BeautifulSoup/html.parser extraction with the lxml site rules
+on the saved fixture pages.
+
+    python scripts/benchmark_extractors.py [--rounds 200]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+from bs4 import BeautifulSoup
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+from extractors import clean_text, extract_article  # noqa: E402
+from scrapper import SITES  # noqa: E402
+
+FIXTURES = PROJECT_ROOT / "tests" / "fixtures" / "html"
+
+# site key, fixture, CSS selectors the scrapers used before the registry
+CASES = [
+    ("bbc", "bbc_article.html", ["article p"]),
+    ("npr", "npr_article.html", ["article p", "div.storytext p", "div.body-text p", "div#storytext p"]),
+    ("india", "india_article.html", ["p"]),
+    ("aljazeera", "aljazeera_article.html", ["div.wysiwyg p"]),
+    ("ekantipur", "ekantipur_article.html", ["div.description p, div.story p, article p", "p"]),
+]
+
+
+def legacy_extract(html, selectors, max_chars):
+    soup = BeautifulSoup(html, "html.parser")
+    title_tag = soup.find("h1")
+    title = title_tag.get_text(strip=True) if title_tag else None
+    paragraphs = []
+    for selector in selectors:
+        paragraphs = soup.select(selector)
+        if paragraphs:
+            break
+    img_tag = soup.find("meta", property="og:image")
+    return {
+        "title": title,
+        "teaser": paragraphs[0].get_text(strip=True) if paragraphs else "",
+        "full_text": clean_text(" ".join(p.get_text() for p in paragraphs))[:max_chars],
+        "image_url": img_tag["content"] if img_tag else None,
+    }
+
+
+def timed(func, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func()
+    return (time.perf_counter() - start) / rounds * 1000
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'site':<12}{'bs4 ms':>10}{'lxml ms':>10}{'speedup':>10}  same text")
+    total_old = total_new = 0.0
+    for key, fixture, selectors in CASES:
+        site = SITES[key]
+        html = (FIXTURES / fixture).read_text(encoding="utf-8")
+        old = legacy_extract(html, selectors, site["max_chars"])
+        new = extract_article(site, html)
+        same = new is not None and old["full_text"] == new["full_text"]
+
+        old_ms = timed(lambda: legacy_extract(html, selectors, site["max_chars"]), args.rounds)
+        new_ms = timed(lambda: extract_article(site, html), args.rounds)
+        total_old += old_ms
+        total_new += new_ms
+        print(f"{key:<12}{old_ms:>10.2f}{new_ms:>10.2f}{old_ms / new_ms:>9.1f}x  {'yes' if same else 'NO'}")
+
+    print(f"{'total':<12}{total_old:>10.2f}{total_new:>10.2f}{total_old / total_new:>9.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+"""
+Compare dense-only and hybrid (dense + BM25 with reciprocal rank fusion)
+retrieval on a synthetic labelled article set.
+
+Every synthetic article has a made-up name (e.g. "Velmorix") and a topic in a
+city. Name queries ask for the name only, the case vector models handle
+worst; paraphrase queries describe the topic and city in other words. Each
+query has exactly one relevant article, so recall@k is the share of queries
+whose article is in the top k.
+
+    python scripts/benchmark_retrieval.py [--articles 400] [--k 5]
+    python scripts/benchmark_retrieval.py --hash-embeddings   # no model download
+"""
+
+import argparse
+import hashlib
+import itertools
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+PROJECT_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(PROJECT_ROOT))
+
+import rag_with_sambanova as rag  # noqa: E402
+from article_store import get_store  # noqa: E402
+from vector_index import ArticleIndex  # noqa: E402
+
+# article wording -> paraphrase used in queries
+TOPICS = {
+    "raises interest rates": "lifts borrowing costs",
+    "opens a new hospital": "launches a medical centre",
+    "wins the football final": "takes the soccer championship",
+    "reports record profits": "posts its highest earnings ever",
+    "faces severe flooding": "is hit by heavy floods",
+    "launches an electric car": "unveils a battery powered vehicle",
+    "bans plastic bags": "prohibits single use plastics",
+    "hosts a film festival": "holds a cinema showcase",
+    "cuts school budgets": "reduces education spending",
+    "discovers a new species": "identifies a previously unknown animal",
+}
+CITIES = [
+    "Lisbon", "Nairobi", "Osaka", "Denver", "Kraków", "Lima", "Hanoi", "Accra",
+    "Perth", "Tbilisi", "Quito", "Bergen", "Izmir", "Cebu", "Tunis", "Leeds",
+    "Porto", "Dakar", "Medan", "Cusco", "Brno", "Galway", "Goa", "Kazan",
+    "Malmö", "Recife", "Sapporo", "Split", "Tartu", "Zadar", "Ghent", "Baku",
+    "Bilbao", "Cork", "Graz", "Kochi", "Lyon", "Mosul", "Nice", "Oran",
+    "Pune", "Riga",
+]
+SYLLABLES = ["vel", "mor", "ix", "tal", "quen", "dra", "sor", "bek", "lun", "zar", "ost", "ril"]
+
+
+class HashEmbeddings(Embeddings):
+    """Bag-of-words hashing vectors: a model-free stand-in for offline runs."""
+
+    def __init__(self, dim=384):
+        self.dim = dim
+
+    def _embed(self, text):
+        vector = np.zeros(self.dim, dtype="float32")
+        for token in re.findall(r"\w+", text.lower()):
+            digest = hashlib.blake2b(token.encode("utf-8"), digest_size=4).digest()
+            vector[int.from_bytes(digest, "big") % self.dim] += 1.0
+        norm = np.linalg.norm(vector)
+        return (vector / norm if norm else vector).tolist()
+
+    def embed_documents(self, texts):
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text):
+        return self._embed(text)
+
+
+def make_corpus(count, seed):
+    rng = random.Random(seed)
+    pairs = list(itertools.product(TOPICS, CITIES))
+    rng.shuffle(pairs)
+    names = set()
+    articles = []
+    for article_id, (topic, city) in enumerate(pairs[:count], 1):
+        name = ""
+        while not name or name in names:
+            name = "".join(rng.sample(SYLLABLES, 3)).capitalize()
+        names.add(name)
+        text = (
+            f"{name} in {city} {topic}. Officials in {city} said {name} "
+            f"{topic} after months of planning, and residents reacted to the news."
+        )
+        articles.append({
+            "id": article_id,
+            "title": f"{name} {topic}",
+            "teaser": f"{city}: {name} {topic}.",
+            "full_text": text,
+            "queries": [
+                ("name", f"What is the latest on {name}?"),
+                ("paraphrase", f"Which organisation in {city} {TOPICS[topic]}?"),
+            ],
+        })
+    return articles
+
+
+def load_corpus(db_path, articles):
+    conn = get_store(db_path).connect()
+    conn.executemany(
+        """
+        INSERT INTO articles (id, title, teaser, full_text, scraped_at, predicted_category)
+        VALUES (?, ?, ?, ?, '2026-05-01 08:00:00', 'World')
+        """,
+        [(a["id"], a["title"], a["teaser"], a["full_text"]) for a in articles],
+    )
+    conn.commit()
+    conn.close()
+
+
+def evaluate(search, articles, k):
+    hits = {}
+    latencies = []
+    for article in articles:
+        for kind, query in article["queries"]:
+            start = time.perf_counter()
+            docs = search(query, k)
+            latencies.append((time.perf_counter() - start) * 1000)
+            found = article["id"] in [doc.metadata.get("id") for doc in docs]
+            hits.setdefault(kind, []).append(found)
+    recall = {kind: sum(found) / len(found) for kind, found in hits.items()}
+    recall["all"] = sum(sum(found) for found in hits.values()) / sum(len(found) for found in hits.values())
+    latencies.sort()
+    return recall, statistics.median(latencies), latencies[int(len(latencies) * 0.95) - 1]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--articles", type=int, default=400)
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=13)
+    parser.add_argument("--embedding-model", default="BAAI/bge-small-en-v1.5")
+    parser.add_argument("--hash-embeddings", action="store_true", help="use model-free hashing vectors")
+    args = parser.parse_args()
+
+    articles = make_corpus(min(args.articles, len(TOPICS) * len(CITIES)), args.seed)
+    if args.hash_embeddings:
+        embeddings = HashEmbeddings()
+    else:
+        from langchain_huggingface.embeddings import HuggingFaceEmbeddings
+        embeddings = HuggingFaceEmbeddings(
+            model_name=args.embedding_model,
+            encode_kwargs={"normalize_embeddings": True},
+        )
+
+    with tempfile.TemporaryDirectory() as tempdir:
+        rag.db_path = str(Path(tempdir) / "benchmark.db")
+        load_corpus(rag.db_path, articles)
+        rag.vectorstore = ArticleIndex(str(Path(tempdir) / "faiss"), embeddings, db_path=rag.db_path)
+        rag.vectorstore.add_documents([
+            Document(page_content=a["full_text"], metadata={"id": a["id"]})
+            for a in articles
+        ])
+
+        systems = {
+            "dense": lambda query, k: rag.dense_search(query, top_k=k),
+            "hybrid": lambda query, k: rag.retrieve_documents(query, top_k=k),
+        }
+        print(f"{len(articles)} articles, {2 * len(articles)} queries, k={args.k}")
+        print(f"{'system':<8}{'recall@k':>10}{'name':>8}{'para':>8}{'p50 ms':>9}{'p95 ms':>9}")
+        for name, search in systems.items():
+            recall, p50, p95 = evaluate(search, articles, args.k)
+            print(
+                f"{name:<8}{recall['all']:>10.3f}{recall['name']:>8.3f}"
+                f"{recall['paraphrase']:>8.3f}{p50:>9.2f}{p95:>9.2f}"
+            )
+        get_store(rag.db_path).close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
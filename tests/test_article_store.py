@@ -0,0 +1,183 @@
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import unittest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from article_store import (
+    INDEXES,
+    SCHEMA_VERSION,
+    ArticleStore,
+    connect,
+    filter_article_ids,
+    get_store,
+    migrate,
+    schema_version,
+    search_articles,
+)
+
+
+class ArticleStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.db_file = os.path.join(self.tempdir.name, "news.db")
+        self.store = ArticleStore(self.db_file)
+
+    def tearDown(self):
+        self.store.close()
+        self.tempdir.cleanup()
+
+    def test_new_database_uses_wal_and_has_indexes(self):
+        conn = self.store.connection()
+        self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+        names = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+        self.assertTrue(set(INDEXES) <= names)
+
+    def test_old_database_gets_missing_columns(self):
+        conn = sqlite3.connect(self.db_file)
+        conn.execute(
+            "CREATE TABLE articles (id INTEGER PRIMARY KEY, title TEXT, teaser TEXT, "
+            "full_text TEXT, scraped_at TEXT, source TEXT)"
+        )
+        conn.commit()
+        conn.close()
+
+        columns = {row[1] for row in self.store.connection().execute("PRAGMA table_info(articles)")}
+        self.assertTrue({"predicted_category", "loaded"} <= columns)
+
+    def test_unversioned_database_with_probed_columns_is_migrated(self):
+        # Layout left behind by the old ALTER TABLE probes in classifier/embedder
+        conn = sqlite3.connect(self.db_file)
+        conn.execute("""
+            CREATE TABLE articles (
+                id INTEGER PRIMARY KEY, title TEXT, teaser TEXT, source TEXT, full_text TEXT,
+                scraped_at TEXT, predicted_category TEXT, loaded INTEGER
+            )
+        """)
+        conn.executemany("INSERT INTO articles (title, loaded) VALUES (?, ?)", [("a", None), ("b", 1)])
+        conn.commit()
+        conn.close()
+
+        conn = self.store.connection()
+        self.assertEqual(schema_version(conn), SCHEMA_VERSION)
+        loaded = dict(conn.execute("SELECT title, loaded FROM articles"))
+        self.assertEqual(loaded, {"a": 0, "b": 1})
+
+    def test_migrations_run_once(self):
+        self.store.connection()
+        statements = []
+        conn = connect(self.db_file)
+        self.addCleanup(conn.close)
+        conn.set_trace_callback(statements.append)
+
+        self.assertEqual(migrate(conn), SCHEMA_VERSION)
+        self.assertFalse([sql for sql in statements if "ALTER" in sql or "CREATE INDEX" in sql])
+
+    def test_filtered_scans_use_indexes(self):
+        conn = self.store.connection()
+        plan = " ".join(
+            row[3] for row in conn.execute(
+                "EXPLAIN QUERY PLAN SELECT id FROM articles WHERE predicted_category = ?", ("Sports",)
+            )
+        )
+        self.assertIn("idx_articles_predicted_category", plan)
+
+    def test_each_thread_reuses_its_own_connection(self):
+        main_conn = self.store.connection()
+        self.assertIs(self.store.connection(), main_conn)
+
+        other = []
+        thread = threading.Thread(target=lambda: other.append(self.store.connection()))
+        thread.start()
+        thread.join()
+        self.assertIsNot(other[0], main_conn)
+
+    def test_readers_are_not_blocked_by_an_open_write(self):
+        writer = self.store.connect()
+        self.addCleanup(writer.close)
+        writer.execute("INSERT INTO articles (title) VALUES ('committed')")
+        writer.commit()
+        writer.execute("BEGIN IMMEDIATE")
+        writer.execute("INSERT INTO articles (title) VALUES ('pending')")
+
+        titles = [row[0] for row in self.store.connection().execute("SELECT title FROM articles")]
+        writer.rollback()
+
+        self.assertEqual(titles, ["committed"])
+
+    def test_get_store_returns_one_store_per_path(self):
+        self.assertIs(get_store(self.db_file), get_store(os.path.join(self.tempdir.name, ".", "news.db")))
+
+
+class SearchArticlesTests(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.store = ArticleStore(os.path.join(self.tempdir.name, "news.db"))
+        self.conn = self.store.connection()
+        self.conn.executemany(
+            """
+            INSERT INTO articles (title, teaser, full_text, scraped_at, predicted_category)
+            VALUES (?, ?, ?, ?, ?)
+            """,
+            [
+                ("Markets rally", "Stocks rise", "Analysts mention elections once.", "2026-05-01 08:00:00", "Business"),
+                ("Elections called", "Vote in June", "The government called elections.", "2026-04-01 08:00:00", "Politics"),
+                ("Weather update", "Rain ahead", "Storms are expected.", "2026-05-02 08:00:00", "World"),
+            ],
+        )
+        self.conn.commit()
+
+    def tearDown(self):
+        self.store.close()
+        self.tempdir.cleanup()
+
+    def titles(self, **kwargs):
+        return [row[1] for row in search_articles(self.conn, **kwargs)]
+
+    def test_title_matches_rank_above_body_matches(self):
+        self.assertEqual(self.titles(terms=["elections"]), ["Elections called", "Markets rally"])
+
+    def test_terms_match_word_prefixes_and_stems(self):
+        self.assertEqual(self.titles(terms=["elect"]), ["Elections called", "Markets rally"])
+        self.assertEqual(self.titles(terms=["storm"]), ["Weather update"])
+
+    def test_filters_are_applied_in_sql(self):
+        self.assertEqual(self.titles(terms=["elections"], category="Business"), ["Markets rally"])
+        self.assertEqual(self.titles(terms=["elections"], since="2026-04-15 00:00:00"), ["Markets rally"])
+
+    def test_matches_carry_their_bm25_score(self):
+        scores = [row[-1] for row in search_articles(self.conn, terms=["elections"])]
+
+        self.assertEqual(scores, sorted(scores, reverse=True))
+        self.assertTrue(all(score > 0 for score in scores))
+        self.assertIsNone(search_articles(self.conn, limit=1)[0][-1])
+
+    def test_without_terms_newest_articles_come_first(self):
+        self.assertEqual(self.titles(limit=2), ["Weather update", "Markets rally"])
+
+    def test_index_follows_updates_and_deletes(self):
+        self.conn.execute("UPDATE articles SET title = 'Snow forecast' WHERE title = 'Weather update'")
+        self.conn.execute("DELETE FROM articles WHERE title = 'Markets rally'")
+        self.conn.execute("UPDATE articles SET predicted_category = 'Science'")
+        self.conn.commit()
+
+        self.assertEqual(self.titles(terms=["snow"]), ["Snow forecast"])
+        self.assertEqual(self.titles(terms=["weather"]), [])
+        self.assertEqual(self.titles(terms=["stocks"]), [])
+
+    def test_quotes_in_terms_are_escaped(self):
+        self.assertEqual(self.titles(terms=['ele"ctions']), [])
+
+    def test_filter_article_ids(self):
+        self.assertEqual(filter_article_ids(self.conn, category="Politics"), [2])
+        self.assertEqual(sorted(filter_article_ids(self.conn, since="2026-04-15 00:00:00")), [1, 3])
+        self.assertEqual(filter_article_ids(self.conn, category="Politics", since="2026-04-15 00:00:00"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
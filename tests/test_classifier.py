@@ -0,0 +1,337 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import joblib
+import numpy as np
+import torch
+from langchain_core.embeddings import Embeddings
+from tokenizers import Tokenizer, models, normalizers, pre_tokenizers, processors
+from transformers import BartConfig, BartForSequenceClassification, PreTrainedTokenizerFast
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import classifier  # noqa: E402
+from article_store import ArticleStore  # noqa: E402
+from classifier import (  # noqa: E402
+    CATEGORIES,
+    EMBEDDING_SOURCE,
+    ClassificationStats,
+    EmbeddingClassifier,
+    LabelCache,
+    ZeroShotClassifier,
+    classify_cached,
+    get_classifier,
+    length_batches,
+    load_head,
+    resolve_device,
+    resolve_precision,
+    train_head,
+    unclassified_chunks,
+)
+
+# One keyword per category, each found in its label description only
+KEYWORDS = ["election", "software", "match", "market", "vaccine", "film", "conflict", "space"]
+
+
+class KeywordEmbeddings(Embeddings):
+    def __init__(self):
+        self.embedded = []
+
+    def embed_query(self, text):
+        vector = np.array([text.lower().count(word) for word in KEYWORDS], dtype="float32") + 0.01
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    def embed_documents(self, texts):
+        self.embedded.extend(texts)
+        return [self.embed_query(text) for text in texts]
+
+
+def tiny_tokenizer(*_args, **_kwargs):
+    """Word-level tokenizer with BART's special tokens and pair template."""
+    vocab = {"<s>": 0, "<pad>": 1, "</s>": 2, "<unk>": 3}
+    for word in "this example is . the a vote match market film".split() + [label.lower() for label in CATEGORIES]:
+        vocab.setdefault(word, len(vocab))
+    tokenizer = Tokenizer(models.WordLevel(vocab, unk_token="<unk>"))
+    tokenizer.normalizer = normalizers.Lowercase()
+    tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+    tokenizer.post_processor = processors.TemplateProcessing(
+        single="<s> $A </s>",
+        pair="<s> $A </s> </s> $B </s>",
+        special_tokens=[("<s>", 0), ("</s>", 2)],
+    )
+    return PreTrainedTokenizerFast(
+        tokenizer_object=tokenizer, bos_token="<s>", eos_token="</s>", pad_token="<pad>", unk_token="<unk>"
+    )
+
+
+def tiny_bart(*_args, **_kwargs):
+    torch.manual_seed(0)
+    config = BartConfig(
+        vocab_size=64,
+        d_model=16,
+        encoder_layers=1,
+        decoder_layers=1,
+        encoder_attention_heads=2,
+        decoder_attention_heads=2,
+        encoder_ffn_dim=32,
+        decoder_ffn_dim=32,
+        max_position_embeddings=64,
+        num_labels=3,
+    )
+    return BartForSequenceClassification(config)
+
+
+class LengthBatchesTests(unittest.TestCase):
+    def test_similar_lengths_share_a_batch_within_the_budget(self):
+        # Longest first: 50 and 48 pad to 2 texts x 2 pairs x 50 = 200 tokens
+        self.assertEqual(length_batches([5, 50, 6, 48, 7], 2, 200), [[1, 3], [4, 2, 0]])
+
+    def test_text_over_the_budget_gets_its_own_batch(self):
+        self.assertEqual(length_batches([500, 3], 8, 100), [[0], [1]])
+        self.assertEqual(length_batches([], 8, 100), [])
+
+
+class ResolveTests(unittest.TestCase):
+    def test_auto_device_follows_cuda_availability(self):
+        with patch.object(torch.cuda, "is_available", return_value=False):
+            self.assertEqual(resolve_device("auto"), "cpu")
+            with self.assertRaises(ValueError):
+                resolve_device("cuda")
+        with patch.object(torch.cuda, "is_available", return_value=True):
+            self.assertEqual(resolve_device("auto"), "cuda")
+            self.assertEqual(resolve_device("cpu"), "cpu")
+        with self.assertRaises(ValueError):
+            resolve_device("tpu")
+
+    def test_auto_precision_is_int8_on_cpu_and_fp32_on_cuda(self):
+        self.assertEqual(resolve_precision("auto", "cpu"), "int8")
+        self.assertEqual(resolve_precision("auto", "cuda"), "fp32")
+        self.assertEqual(resolve_precision("fp32", "cpu"), "fp32")
+        self.assertEqual(resolve_precision("fp16", "cuda"), "fp16")
+
+    def test_precision_must_suit_the_device(self):
+        for precision, device in [("int8", "cuda"), ("fp16", "cpu"), ("bf8", "cpu")]:
+            with self.subTest(precision=precision, device=device):
+                with self.assertRaises(ValueError):
+                    resolve_precision(precision, device)
+
+
+class ZeroShotClassifierTests(unittest.TestCase):
+    def setUp(self):
+        patches = [
+            patch.object(classifier.AutoTokenizer, "from_pretrained", side_effect=tiny_tokenizer),
+            patch.object(classifier.AutoModelForSequenceClassification, "from_pretrained", side_effect=tiny_bart),
+            patch.object(torch.cuda, "is_available", return_value=False),
+        ]
+        for p in patches:
+            p.start()
+            self.addCleanup(p.stop)
+        get_classifier.cache_clear()
+        self.addCleanup(get_classifier.cache_clear)
+
+    @staticmethod
+    def linear_types(model):
+        linears = (torch.nn.Linear, torch.ao.nn.quantized.dynamic.Linear)
+        return {type(module) for module in model.modules() if type(module) in linears}
+
+    def test_cpu_default_is_dynamically_quantized(self):
+        backend = ZeroShotClassifier(device="auto", precision="auto")
+
+        self.assertEqual((backend.device, backend.precision), ("cpu", "int8"))
+        self.assertEqual(self.linear_types(backend.model), {torch.ao.nn.quantized.dynamic.Linear})
+        self.assertEqual(backend.token_budget, classifier.CPU_TOKEN_BUDGET)
+
+    def test_fp32_keeps_float_weights(self):
+        backend = ZeroShotClassifier(device="cpu", precision="fp32")
+
+        self.assertEqual(self.linear_types(backend.model), {torch.nn.Linear})
+        self.assertIn("cpu (fp32", str(backend))
+
+    def test_bucketed_batches_keep_the_input_order(self):
+        backend = ZeroShotClassifier(device="cpu", precision="fp32")
+        texts = [
+            "vote",
+            "the market the market the market the market the market",
+            "a film",
+            "the match the vote the film the market",
+            "General",
+        ]
+        alone = [backend.classify([text])[0] for text in texts]
+        self.assertGreater(len(set(alone)), 1)
+        stats = ClassificationStats()
+        done = []
+
+        labels = backend.classify(texts, token_budget=400, progress=done.append, stats=stats)
+
+        self.assertEqual(labels, alone)
+        self.assertEqual(sum(done), len(texts))
+        self.assertGreater(len(done), 1)
+        self.assertEqual(stats.articles, len(texts))
+        self.assertLess(stats.padding_efficiency, 1)
+        self.assertIn("padding efficiency", str(stats))
+
+    def test_model_is_loaded_once_on_first_use(self):
+        loader = classifier.AutoModelForSequenceClassification.from_pretrained
+        self.assertEqual(loader.call_count, 0)
+
+        self.assertIs(get_classifier(), get_classifier())
+        self.assertEqual(loader.call_count, 1)
+
+
+class EmbeddingClassifierTests(unittest.TestCase):
+    def setUp(self):
+        self.embeddings = KeywordEmbeddings()
+        self.backend = EmbeddingClassifier(self.embeddings)
+        self.embeddings.embedded.clear()
+
+    def test_articles_get_the_closest_label_description(self):
+        texts = ["Election night", "A software bug", "Match report", "Vaccine trial", "Space probe"]
+
+        labels = self.backend.classify(texts)
+
+        self.assertEqual(labels, ["Politics", "Technology", "Sports", "Health", "Science"])
+        self.assertEqual(self.embeddings.embedded, texts)
+
+    def test_cache_version_names_what_is_embedded(self):
+        self.assertIn(EMBEDDING_SOURCE, self.backend.cache_version)
+
+    def test_trained_head_replaces_cosine_scoring(self):
+        # Teach the head the opposite of the descriptions for two labels
+        texts = ["election", "election vote", "software", "software update"]
+        labels = ["Technology", "Technology", "Politics", "Politics"]
+        head = train_head(self.backend.article_vectors(texts), labels)
+
+        backend = EmbeddingClassifier(self.embeddings, head=head)
+        self.assertEqual(backend.classify(["election results", "new software"]), ["Technology", "Politics"])
+
+    def test_head_for_other_labels_is_ignored(self):
+        with tempfile.TemporaryDirectory() as tempdir:
+            path = os.path.join(tempdir, "head.joblib")
+            vectors = self.backend.article_vectors(["election", "software"])
+            joblib.dump(train_head(vectors, ["Politics", "Gardening"]), path)
+
+            self.assertIsNone(load_head(path, CATEGORIES))
+            self.assertIsNotNone(load_head(path, CATEGORIES + ["Gardening"]))
+            self.assertIsNone(load_head(os.path.join(tempdir, "missing.joblib")))
+
+
+class LabelCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tempdir.cleanup)
+        self.cache = LabelCache(os.path.join(self.tempdir.name, "labels.db"))
+        self.embeddings = KeywordEmbeddings()
+        self.backend = EmbeddingClassifier(self.embeddings)
+        self.embeddings.embedded.clear()
+
+    def test_duplicate_and_repeated_texts_are_classified_once(self):
+        texts = ["Election night", "Wire copy: market rally", "Wire copy: market rally"]
+        stats = ClassificationStats()
+        done = []
+
+        labels = classify_cached(self.backend, texts, self.cache, progress=done.append, stats=stats)
+
+        self.assertEqual(labels, ["Politics", "Business", "Business"])
+        self.assertEqual(self.embeddings.embedded, texts[:2])
+        self.assertEqual((stats.articles, stats.cached, sum(done)), (2, 1, 3))
+
+        self.embeddings.embedded.clear()
+        again = classify_cached(self.backend, ["Wire copy: market rally", "Election night"], self.cache)
+        self.assertEqual(again, ["Business", "Politics"])
+        self.assertEqual(self.embeddings.embedded, [])
+
+    def test_another_backend_version_misses_the_cache(self):
+        classify_cached(self.backend, ["election", "software"], cache=self.cache)
+        head = train_head(self.backend.article_vectors(["election", "software"]), ["Technology", "Politics"])
+        retrained = EmbeddingClassifier(self.embeddings, head=head)
+        self.embeddings.embedded.clear()
+
+        labels = classify_cached(retrained, ["election", "software"], cache=self.cache)
+
+        self.assertEqual(labels, ["Technology", "Politics"])
+        self.assertEqual(self.embeddings.embedded, ["election", "software"])
+
+
+class FailingAfter:
+    """Wraps a backend and raises once it has classified ``limit`` texts."""
+
+    def __init__(self, backend, limit):
+        self.backend = backend
+        self.limit = limit
+        self.cache_version = backend.cache_version
+
+    def classify(self, texts, **kwargs):
+        if self.limit < len(texts):
+            raise RuntimeError("out of memory")
+        self.limit -= len(texts)
+        return self.backend.classify(texts, **kwargs)
+
+
+class MainTests(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tempdir.cleanup)
+        db_path = os.path.join(self.tempdir.name, "news.db")
+        self.store = ArticleStore(db_path)
+        self.addCleanup(self.store.close)
+        self.conn = self.store.connection()
+        self.conn.executemany(
+            "INSERT INTO articles (title, teaser, predicted_category) VALUES (?, ?, ?)",
+            [
+                ("Election night", "", None),
+                ("Market rally", "", None),
+                ("Already labelled", "", "World"),
+                ("Vaccine trial", "", None),
+                ("Space probe", "", None),
+                ("Film festival", "", None),
+            ],
+        )
+        self.conn.commit()
+        self.backend = EmbeddingClassifier(KeywordEmbeddings())
+        for p in [
+            patch.object(classifier, "DB_PATH", db_path),
+            patch.object(classifier, "CLASSIFICATION_CACHE_FILE", os.path.join(self.tempdir.name, "labels.db")),
+        ]:
+            p.start()
+            self.addCleanup(p.stop)
+
+    def labels(self):
+        return dict(self.conn.execute("SELECT title, predicted_category FROM articles"))
+
+    def test_chunks_are_keyset_pages_of_unlabelled_rows(self):
+        chunks = [[row[0] for row in rows] for rows in unclassified_chunks(self.conn, chunk_size=2)]
+        self.assertEqual(chunks, [[1, 2], [4, 5], [6]])
+
+    def test_interrupted_run_keeps_committed_chunks_and_resumes(self):
+        with patch.object(classifier, "get_classifier", return_value=FailingAfter(self.backend, 2)):
+            with self.assertRaises(RuntimeError):
+                classifier.main(chunk_size=2)
+
+        self.assertEqual(
+            self.labels(),
+            {
+                "Election night": "Politics",
+                "Market rally": "Business",
+                "Already labelled": "World",
+                "Vaccine trial": None,
+                "Space probe": None,
+                "Film festival": None,
+            },
+        )
+
+        self.backend.embeddings.embedded.clear()
+        with patch.object(classifier, "get_classifier", return_value=self.backend):
+            classifier.main(chunk_size=2)
+
+        self.assertEqual(self.backend.embeddings.embedded, ["Vaccine trial", "Space probe", "Film festival"])
+        self.assertEqual(self.labels()["Space probe"], "Science")
+        self.assertNotIn(None, self.labels().values())
+
+
+if __name__ == "__main__":
+    unittest.main()
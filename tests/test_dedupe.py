@@ -0,0 +1,120 @@
+import os
+import sys
+import tempfile
+import unittest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import scrapper
+from article_store import ARTICLES_TABLE, connect, migrate
+from dedupe import NearDuplicateIndex, canonicalize_url, hamming_distance, simhash
+from link_index import LinkIndex
+
+STORY = (
+    "The central bank raised interest rates by a quarter point on Wednesday, "
+    "citing persistent inflation in housing and services. Officials said further "
+    "increases were possible if price growth does not slow over the coming months, "
+    "while several members argued for a pause to assess the impact of earlier moves "
+    "on lending, hiring and household spending across the country. Markets reacted "
+    "calmly, with government bond yields edging higher and the currency little changed "
+    "against the dollar by the close of trading. Economists had widely expected the "
+    "decision after a run of strong employment reports and a stubborn rise in rents "
+    "in major cities. The governor told reporters that the committee would watch wage "
+    "settlements closely and warned that energy prices remained a risk to the outlook. "
+    "Business groups said higher borrowing costs were already weighing on investment "
+    "plans, particularly among small manufacturers and construction firms, while "
+    "consumer advocates urged lenders to pass on savings rates to depositors quickly."
+)
+
+
+class CanonicalizeUrlTests(unittest.TestCase):
+    def test_tracking_parameters_and_fragments_are_removed(self):
+        self.assertEqual(
+            canonicalize_url("https://www.bbc.com/news/articles/c1?at_medium=RSS&at_campaign=rss#top"),
+            "https://www.bbc.com/news/articles/c1",
+        )
+        self.assertEqual(
+            canonicalize_url("https://example.com/story?utm_source=x&id=7&fbclid=abc"),
+            "https://example.com/story?id=7",
+        )
+
+    def test_amp_variants_map_to_the_regular_page(self):
+        canonical = "https://www.example.com/world/story-1"
+        self.assertEqual(canonicalize_url("https://www.example.com/world/story-1/amp"), canonical)
+        self.assertEqual(canonicalize_url("https://amp.example.com/world/story-1"), canonical)
+        self.assertEqual(canonicalize_url("https://www.example.com/amp/world/story-1"), canonical)
+        self.assertEqual(
+            canonicalize_url("https://timesofindia.indiatimes.com/india/x/amp_articleshow/1.cms"),
+            "https://timesofindia.indiatimes.com/india/x/articleshow/1.cms",
+        )
+
+    def test_host_case_trailing_slash_and_query_order_are_normalised(self):
+        self.assertEqual(
+            canonicalize_url("HTTPS://WWW.NPR.org/2026/05/01/story/?b=2&a=1"),
+            "https://www.npr.org/2026/05/01/story?a=1&b=2",
+        )
+
+
+class NearDuplicateTests(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.conn = connect(os.path.join(self.tempdir.name, "news.db"))
+        self.conn.execute(ARTICLES_TABLE)
+
+    def tearDown(self):
+        self.conn.close()
+        self.tempdir.cleanup()
+
+    def test_lightly_edited_copy_is_within_threshold(self):
+        edited = STORY + " Reporting by wire staff."
+
+        self.assertLessEqual(hamming_distance(simhash(STORY), simhash(edited)), 3)
+
+    def test_short_texts_are_not_fingerprinted(self):
+        self.assertIsNone(simhash("Breaking news"))
+
+    def test_unrelated_story_is_not_a_duplicate(self):
+        migrate(self.conn)
+        index = NearDuplicateIndex(self.conn)
+        index.add(1, simhash(STORY))
+        other = (
+            "The national football team won the championship final after extra time, "
+            "with the captain scoring twice as thousands of supporters celebrated in the "
+            "capital. Coaches praised the defence, which conceded only three goals in the "
+            "whole tournament, and the squad will return home on Sunday for a parade."
+        )
+
+        self.assertIsNone(index.find_duplicate(simhash(other)))
+        self.assertEqual(index.find_duplicate(simhash(STORY)), 1)
+
+    def test_save_articles_drops_syndicated_copy(self):
+        migrate(self.conn)
+        link_index = LinkIndex(self.conn)
+        duplicate_index = NearDuplicateIndex(self.conn)
+        articles = [
+            ("BBC", "General", "Rates rise", "https://bbc.example/a", "", None, STORY),
+            ("NPR", "General", "Rates rise again", "https://npr.example/b", "", None, STORY + " Reuters"),
+        ]
+
+        saved = scrapper.save_articles(self.conn.cursor(), articles, link_index, duplicate_index)
+
+        self.assertEqual(saved, 1)
+        self.assertEqual(self.conn.execute("SELECT link FROM articles").fetchall(), [("https://bbc.example/a",)])
+        self.assertEqual(link_index.filter_new(["https://npr.example/b"]), [])
+
+    def test_migration_fingerprints_recent_articles(self):
+        self.conn.execute(
+            "INSERT INTO articles (link, full_text) VALUES (?, ?)", ("https://bbc.example/a", STORY)
+        )
+        self.conn.commit()
+
+        migrate(self.conn)
+        index = NearDuplicateIndex(self.conn)
+
+        self.assertIsNotNone(index.find_duplicate(simhash(STORY)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -584,16 +584,12 @@ class AnalyticsDocumentedTests(ApiTestCase):
         self.tempdir = tempfile.TemporaryDirectory()
         self.articles_db_path = os.path.join(self.tempdir.name, "articles.db")
         create_articles_db(self.articles_db_path)
-        self.original_sqlite_connect = sqlite3.connect
 
-        def redirect_connect(_path):
-            return self.original_sqlite_connect(self.articles_db_path)
-
-        self.sqlite_connect_patcher = patch.object(app_server.sqlite3, "connect", side_effect=redirect_connect)
-        self.sqlite_connect_patcher.start()
+        self.articles_db_patcher = patch.object(app_server, "ARTICLES_DB_PATH", self.articles_db_path)
+        self.articles_db_patcher.start()
 
     def tearDown(self):
-        self.sqlite_connect_patcher.stop()
+        self.articles_db_patcher.stop()
         self.tempdir.cleanup()
         super().tearDown()
 
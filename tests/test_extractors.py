@@ -0,0 +1,135 @@
+import os
+import sys
+import unittest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import scrapper
+from extractors import OG_IMAGE, ParsePool, extract_article, extract_links, html_to_text, parse_feed
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures", "html")
+
+
+def fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding="utf-8") as fh:
+        return fh.read()
+
+
+class ExtractArticleTests(unittest.TestCase):
+    def test_site_rules_extract_fixture_pages(self):
+        cases = {
+            "bbc": "bbc_article.html",
+            "npr": "npr_article.html",
+            "india": "india_article.html",
+            "aljazeera": "aljazeera_article.html",
+            "ekantipur": "ekantipur_article.html",
+        }
+        for key, name in cases.items():
+            with self.subTest(site=key):
+                site = scrapper.SITES[key]
+                page = extract_article(site, fixture(name))
+                self.assertIsNotNone(page)
+                self.assertTrue(page["full_text"])
+                self.assertLessEqual(len(page["full_text"]), site["max_chars"])
+                self.assertTrue(page["full_text"].startswith(page["teaser"]))
+                if site["image"]:
+                    self.assertTrue(page["image_url"].startswith("https://"))
+                else:
+                    self.assertIsNone(page["image_url"])
+
+    def test_india_rule_stops_at_max_chars(self):
+        page = extract_article(scrapper.SITES["india"], fixture("india_article.html"))
+        self.assertEqual(len(page["full_text"]), 2000)
+
+    def test_fallback_body_rules_are_tried_in_order(self):
+        site = {"body": ["//article//p", "//div[@id='storytext']//p"], "max_chars": 100}
+        page = extract_article(site, "<div id='storytext'><p>Fallback  body.</p></div><p>Other</p>")
+        self.assertEqual(page["full_text"], "Fallback body.")
+
+    def test_missing_title_or_required_body_skips_the_page(self):
+        site = scrapper.SITES["ekantipur"]
+        self.assertIsNone(extract_article(site, "<html><body><p>No title</p></body></html>"))
+        self.assertIsNone(extract_article(site, "<html><body><h1>Title</h1></body></html>"))
+
+    def test_empty_og_title_falls_back_to_heading(self):
+        html = '<html><head><meta property="og:title" content=""></head><body><h1>Heading</h1><p>Text</p></body></html>'
+        page = extract_article(scrapper.SITES["ekantipur"], html)
+        self.assertEqual(page["title"], "Heading")
+
+    def test_str_input_with_xml_declaration_is_parsed(self):
+        html = '<?xml version="1.0" encoding="utf-8"?><html><body><article><p>Body</p></article></body></html>'
+        page = extract_article({"body": ["//article//p"], "image": OG_IMAGE, "max_chars": 100}, html)
+        self.assertEqual(page["full_text"], "Body")
+
+
+class LinkDiscoveryTests(unittest.TestCase):
+    def test_section_links_match_pattern_and_anchor_length(self):
+        site = scrapper.SITES["npr"]
+        links = extract_links(
+            fixture("npr_section.html"), site["link_pattern"], site["link_base"], site["min_link_text"]
+        )
+        self.assertEqual(len(links), 30)
+        self.assertTrue(all(link.startswith("https://www.npr.org/2026/") for link, _text in links))
+
+    def test_relative_links_are_resolved(self):
+        links = extract_links('<a href="/news/2026/1/a">A</a>', "/20", "https://example.com/")
+        self.assertEqual(links, [("https://example.com/news/2026/1/a", "A")])
+
+    def test_parse_feed_reads_items_and_html_descriptions(self):
+        feed = b"""<?xml version="1.0" encoding="utf-8"?>
+        <rss xmlns:media="http://search.yahoo.com/mrss/"><channel>
+        <item><title>One</title><link> https://example.com/1 </link>
+        <description><![CDATA[<img src="x.png"/><p>Teaser &amp; more</p>]]></description></item>
+        <item><title>No link</title></item>
+        </channel></rss>"""
+        items = parse_feed(feed)
+        self.assertEqual(len(items), 1)
+        link, title, description = items[0]
+        self.assertEqual((link, title), ("https://example.com/1", "One"))
+        self.assertEqual(html_to_text(description), "Teaser & more")
+
+
+class ParsePoolTests(unittest.TestCase):
+    def pages(self, count):
+        return [
+            (index, f"<html><body><article><p>Body {index}</p></article></body></html>")
+            for index in range(count)
+        ]
+
+    def test_worker_processes_return_every_page(self):
+        pool = ParsePool(workers=2, max_pending=3)
+        self.addCleanup(pool.close)
+        site = scrapper.SITES["bbc"]
+
+        results = dict(pool.extract_many(site, iter(self.pages(10))))
+
+        self.assertEqual(sorted(results), list(range(10)))
+        self.assertEqual(results[7]["full_text"], "Body 7")
+
+    def test_pending_pages_are_bounded(self):
+        pool = ParsePool(workers=1, max_pending=2)
+        self.addCleanup(pool.close)
+        consumed = []
+
+        def pages():
+            for key, content in self.pages(6):
+                consumed.append(key)
+                yield key, content
+
+        results = pool.extract_many(scrapper.SITES["bbc"], pages())
+        next(results)
+
+        self.assertLessEqual(len(consumed), 3)
+        self.assertEqual(len(list(results)), 5)
+
+    def test_inline_mode_parses_in_process(self):
+        pool = ParsePool(workers=0)
+        results = list(pool.extract_many(scrapper.SITES["bbc"], self.pages(2)))
+        self.assertEqual([key for key, _page in results], [0, 1])
+        self.assertIsNone(pool._executor)
+
+
+if __name__ == "__main__":
+    unittest.main()
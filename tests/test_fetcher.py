@@ -0,0 +1,347 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import scrapper
+from article_store import ArticleStore
+from fetcher import CircuitBreaker, FetchEngine, RequestStats, RetryPolicy, parse_retry_after
+from http_cache import HttpCache
+from link_index import LinkIndex
+
+
+class StubNewsServer:
+    """Local HTTP server serving canned feeds and article pages."""
+
+    def __init__(self, routes, delay=0.0, etags=None, errors=None):
+        self.routes = routes
+        self.delay = delay
+        self.etags = etags or {}
+        # path -> [(status, headers), ...] answered before the real page
+        self.errors = {path: list(replies) for path, replies in (errors or {}).items()}
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+        self.requests = []
+
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                with stub.lock:
+                    stub.active += 1
+                    stub.max_active = max(stub.max_active, stub.active)
+                    stub.requests.append(self.path)
+                try:
+                    time.sleep(stub.delay)
+                    with stub.lock:
+                        replies = stub.errors.get(self.path)
+                        error = replies.pop(0) if replies else None
+                    if error:
+                        status, headers = error
+                        self.send_response(status)
+                        for name, value in headers.items():
+                            self.send_header(name, value)
+                        self.end_headers()
+                        return
+                    body = stub.routes.get(self.path)
+                    if body is None:
+                        self.send_response(404)
+                        self.end_headers()
+                        return
+                    etag = stub.etags.get(self.path)
+                    if etag and self.headers.get("If-None-Match") == etag:
+                        self.send_response(304)
+                        self.end_headers()
+                        return
+                    content_type = "application/rss+xml" if self.path.endswith(".xml") else "text/html"
+                    payload = body.format(base=stub.base_url).encode("utf-8")
+                    self.send_response(200)
+                    if etag:
+                        self.send_header("ETag", etag)
+                    self.send_header("Content-Type", content_type)
+                    self.send_header("Content-Length", str(len(payload)))
+                    self.end_headers()
+                    self.wfile.write(payload)
+                finally:
+                    with stub.lock:
+                        stub.active -= 1
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def urllib_fetch(url):
+    with urllib.request.urlopen(url, timeout=5) as response:
+        return response.read()
+
+
+ARTICLE_HTML = """
+<html><head><meta property="og:image" content="{base}/img/{{name}}.png"></head>
+<body><article><p>First paragraph of {{name}}.</p><p>Second paragraph.</p></article></body></html>
+"""
+
+BBC_FEED = """<?xml version="1.0"?>
+<rss><channel>
+<item><title>Story one</title><link>{base}/news/one</link><description>Teaser one</description></item>
+<item><title>Story two</title><link>{base}/news/two</link><description>Teaser two</description></item>
+<item><title>Story three</title><link>{base}/news/three</link><description>Teaser three</description></item>
+</channel></rss>
+"""
+
+
+def article_routes(names):
+    return {f"/news/{name}": ARTICLE_HTML.replace("{{name}}", name) for name in names}
+
+
+class FetchEngineTests(unittest.TestCase):
+    def test_per_host_limit_caps_concurrent_requests(self):
+        names = [f"a{index}" for index in range(8)]
+        with StubNewsServer(article_routes(names), delay=0.05) as stub:
+            engine = FetchEngine(urllib_fetch, max_concurrency=8, per_host=2, host_delay=0)
+            pages = engine.fetch_all(f"{stub.base_url}/news/{name}" for name in names)
+
+        self.assertEqual(len(pages), 8)
+        self.assertTrue(all(pages.values()))
+        self.assertLessEqual(stub.max_active, 2)
+
+    def test_pages_are_fetched_concurrently(self):
+        names = [f"b{index}" for index in range(8)]
+        with StubNewsServer(article_routes(names), delay=0.2) as stub:
+            engine = FetchEngine(urllib_fetch, max_concurrency=8, per_host=8, host_delay=0)
+            start = time.monotonic()
+            pages = engine.fetch_all(f"{stub.base_url}/news/{name}" for name in names)
+            elapsed = time.monotonic() - start
+
+        self.assertEqual(len(pages), 8)
+        self.assertLess(elapsed, 0.2 * len(names) / 2)
+
+    def test_host_delay_spaces_out_request_starts(self):
+        names = ["c1", "c2", "c3"]
+        with StubNewsServer(article_routes(names)) as stub:
+            engine = FetchEngine(urllib_fetch, max_concurrency=4, per_host=4, host_delay=0.1)
+            start = time.monotonic()
+            engine.fetch_all(f"{stub.base_url}/news/{name}" for name in names)
+            elapsed = time.monotonic() - start
+
+        self.assertGreaterEqual(elapsed, 0.2)
+
+    def test_failed_downloads_are_reported_as_none(self):
+        def failing_fetch(url):
+            raise ConnectionError(url)
+
+        engine = FetchEngine(failing_fetch, host_delay=0)
+        pages = engine.fetch_all(["http://unreachable.invalid/a"])
+
+        self.assertEqual(pages, {"http://unreachable.invalid/a": None})
+
+    def test_stopping_iteration_early_does_not_hang(self):
+        names = [f"d{index}" for index in range(20)]
+        with StubNewsServer(article_routes(names), delay=0.01) as stub:
+            engine = FetchEngine(urllib_fetch, max_concurrency=4, per_host=4, host_delay=0)
+            for _url, _page in engine.iter_fetch(
+                (f"{stub.base_url}/news/{name}" for name in names), buffer_size=1
+            ):
+                break
+
+        self.assertLess(len(stub.requests), len(names))
+
+
+class ScraperFetchTests(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.http_cache = HttpCache(os.path.join(self.tempdir.name, "http_cache.db"))
+        self.conn = ArticleStore(os.path.join(self.tempdir.name, "news.db")).connect()
+        self.link_index = LinkIndex(self.conn)
+        self.patchers = [
+            patch.object(scrapper, "http_cache", self.http_cache),
+            patch.object(scrapper.fetch_engine, "host_delay", 0),
+        ]
+        for patcher in self.patchers:
+            patcher.start()
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+        scrapper.parse_pool.close()
+        self.conn.close()
+        self.tempdir.cleanup()
+
+    def bbc_routes(self):
+        routes = {"/bbc.xml": BBC_FEED}
+        routes.update(article_routes(["one", "two", "three"]))
+        return routes
+
+    def test_scrape_bbc_reads_feed_and_articles_from_stub_server(self):
+        with StubNewsServer(self.bbc_routes()) as stub:
+            with patch.dict(scrapper.SITES["bbc"], feeds=[f"{stub.base_url}/bbc.xml"]):
+                self.link_index.add([f"{stub.base_url}/news/two"])
+                articles = list(scrapper.scrape_bbc(self.link_index))
+
+        by_title = {article[2]: article for article in articles}
+        self.assertEqual(set(by_title), {"Story one", "Story three"})
+        source, category, _title, link, teaser, image_url, full_text = by_title["Story one"]
+        self.assertEqual((source, category), ("BBC", "General"))
+        self.assertEqual(link, f"{stub.base_url}/news/one")
+        self.assertEqual(teaser, "Teaser one")
+        self.assertEqual(image_url, f"{stub.base_url}/img/one.png")
+        self.assertEqual(full_text, "First paragraph of one. Second paragraph.")
+        self.assertNotIn("/news/two", stub.requests)
+
+    def test_unchanged_feed_short_circuits_the_source_after_flush(self):
+        with StubNewsServer(self.bbc_routes(), etags={"/bbc.xml": '"v1"'}) as stub:
+            with patch.dict(scrapper.SITES["bbc"], feeds=[f"{stub.base_url}/bbc.xml"]):
+                first_run = list(scrapper.scrape_bbc(self.link_index))
+                self.http_cache.flush()
+                stub.requests.clear()
+                second_run = list(scrapper.scrape_bbc(self.link_index))
+
+        self.assertEqual(len(first_run), 3)
+        self.assertEqual(second_run, [])
+        self.assertEqual(stub.requests, ["/bbc.xml"])
+
+    def test_feed_with_failed_downloads_is_read_again(self):
+        routes = self.bbc_routes()
+        missing = routes.pop("/news/three")
+        with StubNewsServer(routes, etags={"/bbc.xml": '"v1"'}) as stub:
+            with patch.dict(scrapper.SITES["bbc"], feeds=[f"{stub.base_url}/bbc.xml"]):
+                first_run = list(scrapper.scrape_bbc(self.link_index))
+                self.link_index.add(article[3] for article in first_run)
+                self.http_cache.flush()
+                stub.routes["/news/three"] = missing
+                second_run = list(scrapper.scrape_bbc(self.link_index))
+
+        self.assertEqual(len(first_run), 2)
+        self.assertEqual([article[2] for article in second_run], ["Story three"])
+
+    def test_feed_cut_by_max_articles_keeps_no_validators(self):
+        with StubNewsServer(self.bbc_routes(), etags={"/bbc.xml": '"v1"'}) as stub:
+            feed = f"{stub.base_url}/bbc.xml"
+            with patch.dict(scrapper.SITES["bbc"], feeds=[feed]):
+                first_run = list(scrapper.scrape_bbc(self.link_index, max_articles=2))
+                self.http_cache.flush()
+                self.assertEqual(self.http_cache.conditional_headers(feed), {})
+
+                list(scrapper.scrape_bbc(self.link_index))
+                self.http_cache.flush()
+
+        self.assertEqual(len(first_run), 2)
+        self.assertEqual(self.http_cache.conditional_headers(feed), {"If-None-Match": '"v1"'})
+
+    def test_feed_cut_only_at_indexed_links_keeps_validators(self):
+        with StubNewsServer(self.bbc_routes(), etags={"/bbc.xml": '"v1"'}) as stub:
+            feed = f"{stub.base_url}/bbc.xml"
+            self.link_index.add([f"{stub.base_url}/news/three"])
+            with patch.dict(scrapper.SITES["bbc"], feeds=[feed]):
+                # "three" was saved on an earlier run; the cut skips nothing new
+                articles = list(scrapper.scrape_bbc(self.link_index, max_articles=2))
+                self.http_cache.flush()
+
+        self.assertEqual(len(articles), 2)
+        self.assertEqual(self.http_cache.conditional_headers(feed), {"If-None-Match": '"v1"'})
+
+    def test_validators_are_not_used_before_flush(self):
+        with StubNewsServer(self.bbc_routes(), etags={"/bbc.xml": '"v1"'}) as stub:
+            with patch.dict(scrapper.SITES["bbc"], feeds=[f"{stub.base_url}/bbc.xml"]):
+                list(scrapper.scrape_bbc(self.link_index))
+                second_run = list(scrapper.scrape_bbc(self.link_index))
+
+        self.assertEqual(len(second_run), 3)
+
+
+class RetryPolicyTests(unittest.TestCase):
+    def test_backoff_grows_exponentially_with_jitter_and_cap(self):
+        policy = RetryPolicy(base_delay=1, max_delay=5)
+        for attempt, ceiling in [(0, 1), (1, 2), (2, 4), (5, 5)]:
+            delay = policy.delay(attempt)
+            self.assertGreaterEqual(delay, ceiling / 2)
+            self.assertLessEqual(delay, ceiling)
+
+    def test_retry_after_replaces_backoff_unless_too_long(self):
+        policy = RetryPolicy(max_delay=10)
+        self.assertEqual(policy.delay(0, retry_after=7), 7)
+        self.assertIsNone(policy.delay(0, retry_after=60))
+
+    def test_parse_retry_after_accepts_seconds_and_dates(self):
+        self.assertEqual(parse_retry_after("3"), 3.0)
+        self.assertEqual(parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0.0)
+        self.assertIsNone(parse_retry_after("soon"))
+        self.assertIsNone(parse_retry_after(None))
+
+    def test_circuit_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker(threshold=2)
+        breaker.record_failure("a.test")
+        breaker.record_success("a.test")
+        self.assertFalse(breaker.record_failure("a.test"))
+        self.assertTrue(breaker.record_failure("a.test"))
+        self.assertFalse(breaker.allow("a.test"))
+        self.assertTrue(breaker.allow("b.test"))
+        self.assertEqual(breaker.open_hosts, ["a.test"])
+
+
+class SafeRequestRetryTests(unittest.TestCase):
+    def setUp(self):
+        self.sleeps = []
+        self.patchers = [
+            patch.object(scrapper, "retry_policy", RetryPolicy(sleep=self.sleeps.append)),
+            patch.object(scrapper, "circuit_breaker", CircuitBreaker(threshold=2)),
+            patch.object(scrapper, "request_stats", RequestStats()),
+        ]
+        for patcher in self.patchers:
+            patcher.start()
+
+    def tearDown(self):
+        for patcher in self.patchers:
+            patcher.stop()
+
+    def test_503_with_retry_after_is_retried_after_the_given_wait(self):
+        errors = {"/news/one": [(503, {"Retry-After": "2"})]}
+        with StubNewsServer(article_routes(["one"]), errors=errors) as stub:
+            r = scrapper.safe_request(f"{stub.base_url}/news/one")
+
+        self.assertEqual(r.status_code, 200)
+        self.assertEqual(self.sleeps, [2.0])
+        self.assertEqual(scrapper.request_stats.snapshot(), {"ok": 1, "retried": 1})
+
+    def test_missing_page_is_not_retried(self):
+        with StubNewsServer({}) as stub:
+            self.assertIsNone(scrapper.safe_request(f"{stub.base_url}/news/gone"))
+
+        self.assertEqual(stub.requests, ["/news/gone"])
+        self.assertEqual(self.sleeps, [])
+        self.assertTrue(scrapper.circuit_breaker.allow(f"127.0.0.1:{stub.server.server_port}"))
+
+    def test_failing_host_is_skipped_once_the_circuit_opens(self):
+        errors = {f"/news/{name}": [(500, {})] * 3 for name in ["a", "b", "c"]}
+        with StubNewsServer(article_routes(["a", "b", "c"]), errors=errors) as stub:
+            results = [scrapper.safe_request(f"{stub.base_url}/news/{name}") for name in ["a", "b", "c"]]
+
+        self.assertEqual(results, [None, None, None])
+        self.assertEqual(len(stub.requests), 6)
+        self.assertNotIn("/news/c", stub.requests)
+        self.assertEqual(scrapper.request_stats.snapshot()["circuit_open"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
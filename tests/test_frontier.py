@@ -0,0 +1,100 @@
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import scrapper
+from article_store import ArticleStore
+from frontier import CrawlFrontier, section_of
+from link_index import LinkIndex
+from test_fetcher import StubNewsServer
+
+
+def is_article(url):
+    return "/20" in url
+
+
+class CrawlFrontierTests(unittest.TestCase):
+    def test_urls_are_queued_once(self):
+        frontier = CrawlFrontier()
+        self.assertTrue(frontier.add("https://site.test/news"))
+        self.assertFalse(frontier.add("https://site.test/news", depth=1))
+        self.assertEqual(frontier.pop_batch(10), [("https://site.test/news", 0)])
+        self.assertFalse(frontier.add("https://site.test/news"))
+        self.assertEqual(len(frontier), 0)
+
+    def test_depth_and_section_budget_limit_the_frontier(self):
+        frontier = CrawlFrontier(max_depth=1, section_budget=2)
+        self.assertFalse(frontier.add("https://site.test/news/a", depth=2))
+        self.assertTrue(frontier.add("https://site.test/news/b", depth=1))
+        self.assertTrue(frontier.add("https://site.test/news/c", depth=1))
+        self.assertFalse(frontier.add("https://site.test/news/d", depth=1))
+        self.assertTrue(frontier.add("https://site.test/sports/e", depth=1))
+        self.assertEqual(len(frontier), 3)
+
+    def test_article_urls_are_popped_first(self):
+        frontier = CrawlFrontier(is_priority=is_article)
+        frontier.add("https://site.test/news")
+        frontier.add("https://site.test/economy")
+        frontier.add("https://site.test/news/2026/1/1/story")
+        batch = frontier.pop_batch(2)
+        self.assertEqual(
+            [url for url, _depth in batch],
+            ["https://site.test/news/2026/1/1/story", "https://site.test/news"],
+        )
+
+    def test_section_of(self):
+        self.assertEqual(section_of("https://site.test/news/2026/story"), "news")
+        self.assertEqual(section_of("https://site.test/"), "")
+
+
+SECTION_HTML = """<html><body>
+<a href="/news/2026/10/1/story-{name}-1">One</a>
+<a href="/news/2026/10/1/story-{name}-2#comments">Two</a>
+<a href="/news/more-{name}">More</a>
+<a href="/about">About</a>
+<a href="https://elsewhere.test/news/2026/x">Elsewhere</a>
+</body></html>"""
+
+ARTICLE_HTML = """<html><body><h1>Story</h1><div class="wysiwyg"><p>Body.</p></div>
+<a href="/news/2026/10/1/related">Related</a></body></html>"""
+
+
+class AlJazeeraCrawlTests(unittest.TestCase):
+    def test_crawl_collects_article_links_once(self):
+        routes = {
+            "/news": SECTION_HTML.replace("{name}", "news"),
+            "/news/more-news": SECTION_HTML.replace("{name}", "more"),
+            "/news/2026/10/1/story-news-1": ARTICLE_HTML,
+            "/news/2026/10/1/story-news-2": ARTICLE_HTML,
+            "/news/2026/10/1/story-more-1": ARTICLE_HTML,
+            "/news/2026/10/1/story-more-2": ARTICLE_HTML,
+            "/news/2026/10/1/related": ARTICLE_HTML,
+        }
+        with tempfile.TemporaryDirectory() as tempdir, StubNewsServer(routes) as stub:
+            conn = ArticleStore(os.path.join(tempdir, "news.db")).connect()
+            site = {"home": stub.base_url, "crawl_sections": ["news"]}
+            with patch.dict(scrapper.SITES["aljazeera"], site), \
+                    patch.object(scrapper.fetch_engine, "host_delay", 0):
+                articles = list(scrapper.scrape_aljazeera(LinkIndex(conn), max_articles=20))
+            scrapper.parse_pool.close()
+            conn.close()
+
+        links = sorted(article[3] for article in articles)
+        self.assertEqual(len(links), 5)
+        self.assertIn(f"{stub.base_url}/news/2026/10/1/related", links)
+        # Section pages are crawled once; article pages are crawled once and
+        # fetched again for extraction
+        self.assertEqual(stub.requests.count("/news"), 1)
+        self.assertEqual(stub.requests.count("/news/more-news"), 1)
+        self.assertTrue(all(stub.requests.count(path) <= 2 for path in routes))
+        self.assertNotIn("/about", stub.requests)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+import os
+import sys
+import tempfile
+import unittest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from article_store import ARTICLES_TABLE, connect, migrate
+from link_index import LinkIndex, link_hash
+
+
+class LinkIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        # Articles saved before the link index existed
+        self.conn = connect(os.path.join(self.tempdir.name, "news.db"))
+        self.conn.execute(ARTICLES_TABLE)
+        self.conn.executemany(
+            "INSERT INTO articles (link) VALUES (?)",
+            [("https://example.com/a",), ("https://example.com/b",)],
+        )
+        self.conn.commit()
+        migrate(self.conn)
+
+    def tearDown(self):
+        self.conn.close()
+        self.tempdir.cleanup()
+
+    def test_existing_articles_are_backfilled_by_the_migration(self):
+        index = LinkIndex(self.conn)
+
+        self.assertEqual(
+            index.filter_new(["https://example.com/a", "https://example.com/c", "https://example.com/b"]),
+            ["https://example.com/c"],
+        )
+
+    def test_links_saved_with_tracking_parameters_are_backfilled_canonically(self):
+        path = os.path.join(self.tempdir.name, "old.db")
+        conn = connect(path)
+        self.addCleanup(conn.close)
+        conn.execute(ARTICLES_TABLE)
+        conn.execute("INSERT INTO articles (link) VALUES (?)", ("https://www.bbc.co.uk/news/x?at_medium=RSS",))
+        conn.commit()
+        migrate(conn)
+
+        self.assertEqual(LinkIndex(conn).filter_new(["https://www.bbc.co.uk/news/x"]), [])
+
+    def test_filter_new_keeps_order_and_drops_duplicates(self):
+        index = LinkIndex(self.conn)
+        links = [f"https://example.com/new/{n}" for n in range(1200)]
+
+        self.assertEqual(index.filter_new(links + links[:10]), links)
+
+    def test_added_links_persist_across_instances(self):
+        LinkIndex(self.conn).add(["https://example.com/c"])
+        self.conn.commit()
+
+        self.assertEqual(LinkIndex(self.conn).filter_new(["https://example.com/c"]), [])
+
+    def test_lookups_issue_no_ddl(self):
+        statements = []
+        self.conn.set_trace_callback(statements.append)
+
+        LinkIndex(self.conn).filter_new(["https://example.com/c"])
+
+        self.assertFalse([sql for sql in statements if "CREATE" in sql])
+
+    def test_link_hash_is_stable_signed_64_bit(self):
+        value = link_hash("https://example.com/a")
+
+        self.assertEqual(value, link_hash("https://example.com/a"))
+        self.assertNotEqual(value, link_hash("https://example.com/b"))
+        self.assertTrue(-(2 ** 63) <= value < 2 ** 63)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,6 +5,7 @@ import unittest
 from unittest.mock import patch
 
 import rag_with_sambanova as rag
+from langchain_core.documents import Document
 
 
 def create_articles_db(path):
@@ -56,7 +57,7 @@ def create_articles_db(path):
     conn.close()
 
 
-class RagOfflineTests(unittest.TestCase):
+class RagTestCase(unittest.TestCase):
     def setUp(self):
         self.tempdir = tempfile.TemporaryDirectory()
         self.db_path = os.path.join(self.tempdir.name, "test_news.db")
@@ -85,6 +86,8 @@ class RagOfflineTests(unittest.TestCase):
         rag.chat_history = self.original_chat_history
         self.tempdir.cleanup()
 
+
+class RagOfflineTests(RagTestCase):
     def test_query_rag_returns_local_summary_without_remote_services(self):
         result = rag.query_rag("What's the latest technology news?", top_k=5)
 
@@ -141,5 +144,53 @@ class RagOfflineTests(unittest.TestCase):
         self.assertIn("Answer requirements:", messages[-1]["content"])
 
 
+def make_doc(article_id, title, **scores):
+    return Document(
+        page_content=title,
+        metadata={
+            "id": article_id, "title": title, "category": "Technology", "date": "2026-05-01 08:00:00",
+            "scores": scores,
+        },
+    )
+
+
+class StubVectorStore:
+    def __init__(self, docs):
+        self.docs = docs
+        self.calls = []
+
+    def similarity_search_with_score(self, query, k):
+        self.calls.append((query, k))
+        return [(doc, 0.5) for doc in self.docs[:k]]
+
+
+class HybridRetrievalTests(RagTestCase):
+    def test_rrf_rewards_documents_found_by_both_retrievers(self):
+        fused = rag.reciprocal_rank_fusion(
+            {
+                "dense": [make_doc(1, "a", cosine=0.9), make_doc(2, "b", cosine=0.8)],
+                "lexical": [make_doc(2, "b", bm25=7.5), make_doc(3, "c", bm25=3.0)],
+            },
+            top_k=2,
+        )
+
+        self.assertEqual([doc.metadata["id"] for doc in fused], [2, 1])
+        scores = fused[0].metadata["scores"]
+        self.assertEqual(scores["dense"], {"cosine": 0.8, "rrf": 1 / 62})
+        self.assertEqual(scores["lexical"], {"bm25": 7.5, "rrf": 1 / 61})
+        self.assertAlmostEqual(scores["rrf"], 1 / 62 + 1 / 61)
+        self.assertNotIn("lexical", fused[1].metadata["scores"])
+
+    def test_keyword_hits_are_merged_with_vector_hits(self):
+        rag.vectorstore = StubVectorStore([make_doc(99, "Unrelated vector hit")])
+
+        docs = rag.retrieve_documents("championship", top_k=5)
+
+        by_title = {doc.metadata["title"]: doc.metadata["scores"] for doc in docs}
+        self.assertGreater(by_title["Sports team wins championship"]["lexical"]["bm25"], 0)
+        self.assertEqual(by_title["Unrelated vector hit"]["dense"]["cosine"], 0.5)
+        self.assertEqual(rag.vectorstore.calls, [("championship", 5 * rag.HYBRID_DEPTH)])
+
+
 if __name__ == "__main__":
     unittest.main()
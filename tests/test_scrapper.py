@@ -0,0 +1,85 @@
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+import unittest
+from unittest.mock import patch
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import scrapper
+from http_cache import HttpCache
+
+
+def make_article(index, source="BBC"):
+    return (source, "General", f"Story {index}", f"https://example.com/{source}/{index}", "", None, f"Body {index}")
+
+
+class ArticleWriterTests(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.db_file = os.path.join(self.tempdir.name, "news.db")
+        self.original_db_file = scrapper.DB_FILE
+        scrapper.DB_FILE = self.db_file
+        conn, _cursor = scrapper.init_db()
+        conn.close()
+
+    def tearDown(self):
+        scrapper.DB_FILE = self.original_db_file
+        self.tempdir.cleanup()
+
+    def count_rows(self):
+        conn = sqlite3.connect(self.db_file)
+        try:
+            return conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+        finally:
+            conn.close()
+
+    def test_full_batches_are_committed_before_close(self):
+        writer = scrapper.ArticleWriter(self.db_file, batch_size=5)
+        writer.start()
+        for index in range(7):
+            writer.put(make_article(index))
+
+        deadline = time.monotonic() + 5
+        while self.count_rows() < 5 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        committed_before_close = self.count_rows()
+        saved = writer.close()
+
+        self.assertEqual(committed_before_close, 5)
+        self.assertEqual(saved, 7)
+        self.assertEqual(self.count_rows(), 7)
+
+    def test_crashing_scraper_keeps_articles_already_scraped(self):
+        def scrape_ok(_link_index):
+            for index in range(3):
+                yield make_article(index)
+
+        def scrape_crash(_link_index):
+            yield make_article(99, source="eKantipur")
+            raise RuntimeError("translator down")
+
+        def scrape_nothing(_link_index):
+            return iter(())
+
+        http_cache = HttpCache(os.path.join(self.tempdir.name, "http_cache.db"))
+        with patch.object(scrapper, "http_cache", http_cache), \
+                patch.object(scrapper, "scrape_bbc", scrape_ok), \
+                patch.object(scrapper, "scrape_npr", scrape_nothing), \
+                patch.object(scrapper, "scrape_aljazeera", scrape_nothing), \
+                patch.object(scrapper, "scrape_india", scrape_nothing), \
+                patch.object(scrapper, "scrape_ekantipur", scrape_crash), \
+                patch.object(http_cache, "flush") as flush:
+            with self.assertRaises(RuntimeError):
+                scrapper.main()
+
+        self.assertEqual(self.count_rows(), 4)
+        flush.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,78 @@
+import os
+import sys
+import tempfile
+import unittest
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+from translation import BatchTranslator, GoogleBackend, StubBackend, TranslationCache
+
+
+class FakeGoogleTranslator:
+    def __init__(self, merge_lines=False):
+        self.merge_lines = merge_lines
+        self.calls = []
+
+    def translate(self, text):
+        self.calls.append(text)
+        if self.merge_lines:
+            return text.replace("\n", " ").upper()
+        return text.upper()
+
+
+class BatchTranslatorTests(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.cache = TranslationCache(os.path.join(self.tempdir.name, "translations.db"))
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def test_short_strings_are_grouped_into_one_request(self):
+        backend = StubBackend()
+        translator = BatchTranslator(backend, self.cache)
+
+        result = translator.translate_many(["शीर्षक", "", "सार", "शीर्षक"])
+
+        self.assertEqual(result, ["[en] शीर्षक", "", "[en] सार", "[en] शीर्षक"])
+        self.assertEqual(backend.requests, [["शीर्षक", "सार"]])
+
+    def test_requests_respect_the_size_limit(self):
+        backend = StubBackend()
+        translator = BatchTranslator(backend, self.cache, max_chars=25)
+
+        translator.translate_many(["a" * 10, "b" * 10, "c" * 10, "d" * 30])
+
+        self.assertEqual([len(batch) for batch in backend.requests], [2, 1, 1])
+
+    def test_cached_strings_are_not_translated_again(self):
+        first = StubBackend()
+        BatchTranslator(first, self.cache).translate_many(["समाचार", "नेपाल"])
+
+        second = StubBackend()
+        translator = BatchTranslator(second, self.cache)
+        result = translator.translate_many(["नेपाल", "नयाँ"])
+
+        self.assertEqual(result, ["[en] नेपाल", "[en] नयाँ"])
+        self.assertEqual(second.requests, [["नयाँ"]])
+        self.assertEqual(translator.stats, {"cached": 1, "translated": 1, "requests": 1})
+
+    def test_google_backend_falls_back_when_lines_are_merged(self):
+        fake = FakeGoogleTranslator(merge_lines=True)
+        backend = GoogleBackend(fake, delay=0)
+
+        self.assertEqual(backend.translate_batch(["one", "two"]), ["ONE", "TWO"])
+        self.assertEqual(fake.calls, ["one\ntwo", "one", "two"])
+
+    def test_google_backend_splits_one_reply_per_line(self):
+        fake = FakeGoogleTranslator()
+        backend = GoogleBackend(fake, delay=0)
+
+        self.assertEqual(backend.translate_batch(["one", "two"]), ["ONE", "TWO"])
+        self.assertEqual(fake.calls, ["one\ntwo"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,364 @@
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+
+import faiss
+import rag_with_sambanova as rag
+import test_rag_offline
+from vector_index import (
+    CHUNK_BITS,
+    MANIFEST_FILE,
+    ArticleIndex,
+    build_index,
+    chunk_id,
+    compact,
+    index_kind,
+    read_manifest,
+    read_segment,
+    pool_hits,
+    search,
+    segment_ids,
+    sentence_windows,
+    write_segment,
+)
+
+WORDS = ["sports", "final", "match", "politics", "vote", "market", "stocks", "rain"]
+
+
+class WordEmbeddings(Embeddings):
+    """One dimension per known word, so similarity is word overlap."""
+
+    def embed_query(self, text):
+        vector = np.array([text.lower().count(word) for word in WORDS], dtype="float32") + 0.01
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+
+class SearchTests(unittest.TestCase):
+    def test_only_allowed_ids_are_scored(self):
+        vectors = np.eye(4, dtype="float32")
+        index = faiss.IndexIDMap(faiss.IndexFlatIP(4))
+        index.add_with_ids(vectors, np.array([10, 11, 12, 13], dtype="int64"))
+
+        _scores, ids = search(index, vectors[0], 2, allowed_ids=[12, 13])
+        self.assertEqual(sorted(ids), [12, 13])
+
+        _scores, ids = search(index, vectors[0], 1)
+        self.assertEqual(ids, [10])
+
+        self.assertEqual(search(index, vectors[0], 3, allowed_ids=[]), ([], []))
+
+    def test_excluded_ids_are_skipped(self):
+        vectors = np.eye(4, dtype="float32")
+        index = faiss.IndexIDMap(faiss.IndexFlatIP(4))
+        index.add_with_ids(vectors, np.array([10, 11, 12, 13], dtype="int64"))
+
+        _scores, ids = search(index, vectors[0], 1, excluded_ids={10})
+        self.assertNotEqual(ids, [10])
+
+        _scores, ids = search(index, vectors[0], 4, allowed_ids=[10, 11], excluded_ids={10})
+        self.assertEqual(ids, [11])
+
+
+def clustered_vectors(count, dim=16, seed=0):
+    rng = np.random.default_rng(seed)
+    centres = rng.standard_normal((32, dim), dtype="float32")
+    vectors = centres[rng.integers(32, size=count)] + 0.1 * rng.standard_normal((count, dim), dtype="float32")
+    faiss.normalize_L2(vectors)
+    return vectors
+
+
+class ChunkTests(unittest.TestCase):
+    def test_sentence_windows_overlap_by_a_sentence(self):
+        text = "Aa. Bb. Cc. Dd."
+
+        self.assertEqual(sentence_windows(text, max_chars=7), ["Aa. Bb.", "Bb. Cc.", "Cc. Dd."])
+        self.assertEqual(sentence_windows(text, max_chars=11), ["Aa. Bb. Cc.", "Cc. Dd."])
+        self.assertEqual(sentence_windows(text, max_chars=200), [text])
+        self.assertEqual(sentence_windows("A sentence far too long.", max_chars=5), ["A sentence far too long."])
+
+    def test_pooling_combines_chunk_scores_per_article(self):
+        hits = [(0.9, chunk_id(1, 0)), (0.8, chunk_id(2, 0)), (0.7, chunk_id(2, 3))]
+
+        self.assertEqual(pool_hits(hits, 2), [(0.9, 1), (0.8, 2)])
+        self.assertEqual([article for _score, article in pool_hits(hits, 2, pooling="sum")], [2, 1])
+
+
+class AnnIndexTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.vectors = clustered_vectors(10000)
+        cls.ids = np.arange(10000, dtype="int64") * 3
+
+    def test_index_types(self):
+        for index_type in ("flat", "hnsw", "ivfpq"):
+            with self.subTest(index_type):
+                index = build_index(self.ids, self.vectors, index_type)
+                self.assertEqual((index_kind(index), index.ntotal), (index_type, 10000))
+
+                # Filtered searches are exhaustive, even for far-away ids
+                _scores, ids = search(index, self.vectors[7], 5, allowed_ids=[21, 30, 33])
+                self.assertEqual(sorted(ids), [21, 30, 33])
+                if index_type != "ivfpq":
+                    _scores, ids = search(index, self.vectors[7], 5)
+                    self.assertEqual(ids[0], 21)
+
+    def test_small_ivfpq_index_stays_flat(self):
+        self.assertEqual(index_kind(build_index(self.ids[:500], self.vectors[:500], "ivfpq")), "flat")
+
+    def test_unknown_index_type_is_rejected(self):
+        with self.assertRaises(ValueError):
+            build_index(self.ids[:5], self.vectors[:5], "lsh")
+
+    def test_compaction_builds_and_extends_an_ivfpq_segment(self):
+        # One chunk per article 0, 3, 6, ...
+        chunk_ids = self.ids << CHUNK_BITS
+        with tempfile.TemporaryDirectory() as path:
+            write_segment(path, chunk_ids, self.vectors)
+            compact(path, "ivfpq")
+            trained = read_manifest(path)["segments"]
+
+            # Article 15 is embedded again as two chunks and article 1 is new
+            write_segment(path, [chunk_id(15, 0), chunk_id(15, 1), chunk_id(1, 0)], self.vectors[100:103])
+            compact(path, "ivfpq")
+
+            segments = read_manifest(path)["segments"]
+            self.assertEqual(len(segments), 1)
+            self.assertNotEqual(segments, trained)
+            index = read_segment(path, segments[0])
+            self.assertEqual((index_kind(index), index.ntotal), ("ivfpq", 10002))
+            ids = segment_ids(index).tolist()
+            self.assertEqual([ids.count(chunk_id(15, n)) for n in range(2)], [1, 1])
+            self.assertIn(chunk_id(1, 0), ids)
+
+    def test_compaction_into_hnsw_keeps_the_newest_chunks(self):
+        chunk_ids = self.ids[:200] << CHUNK_BITS
+        with tempfile.TemporaryDirectory() as path:
+            write_segment(path, chunk_ids, self.vectors[:200])
+            write_segment(path, [chunk_id(0, 0)], self.vectors[[150]])
+
+            compact(path, "hnsw")
+
+            index = read_segment(path, read_manifest(path)["segments"][0])
+            self.assertEqual((index_kind(index), index.ntotal), ("hnsw", 200))
+            _scores, ids = search(index, self.vectors[150], 2)
+            self.assertEqual(sorted(ids), [chunk_id(0, 0), chunk_id(450, 0)])
+
+
+class SameEmbeddings(Embeddings):
+    """The same vector for every text."""
+
+    def embed_query(self, text):
+        return [1.0] + [0.0] * (len(WORDS) - 1)
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+
+def word_doc(article_id, text):
+    return Document(page_content=text, metadata={"id": article_id})
+
+
+class ArticleIndexTests(test_rag_offline.RagTestCase):
+    def setUp(self):
+        super().setUp()
+        self.index_dir = os.path.join(self.tempdir.name, "faiss")
+        # Many politics vectors crowd the global top k; articles 1 and 2 come
+        # from the fixture database (Technology and Sports)
+        self.index = ArticleIndex(self.index_dir, WordEmbeddings(), db_path=self.db_path)
+        self.index.add_documents([word_doc(100 + n, f"politics vote politics {n}") for n in range(20)])
+        self.index.add_documents([word_doc(2, "sports final"), word_doc(1, "market stocks")])
+        rag.vectorstore = self.index
+
+    def reader(self):
+        return ArticleIndex(self.index_dir, WordEmbeddings(), db_path=self.db_path)
+
+    def ids(self, index, query, k):
+        return [doc.metadata["id"] for doc in index.similarity_search(query, k=k)]
+
+    def test_documents_are_read_from_the_article_store(self):
+        docs = self.index.similarity_search("market stocks", k=1)
+
+        self.assertEqual(docs[0].metadata["title"], "Technology companies launch new AI tools")
+        self.assertIn("Category: Technology", docs[0].page_content)
+
+    def test_documents_come_with_their_cosine_score(self):
+        (doc, score), = self.index.similarity_search_with_score("market stocks", k=1)
+
+        self.assertEqual(doc.metadata["title"], "Technology companies launch new AI tools")
+        self.assertTrue(0 < score <= 1)
+
+    def test_vectors_without_an_article_are_skipped(self):
+        self.assertEqual(self.index.similarity_search("politics vote", k=5), [])
+
+    def test_each_batch_is_written_as_a_segment(self):
+        manifest = read_manifest(self.index_dir)
+        self.assertEqual(manifest["version"], 2)
+        self.assertEqual(len(manifest["segments"]), 2)
+        self.assertEqual(sorted(os.listdir(self.index_dir)), sorted([MANIFEST_FILE, *manifest["segments"]]))
+
+        reader = self.reader()
+        self.assertEqual((reader.ntotal, reader.segment_count), (22, 2))
+        self.assertEqual(self.ids(reader, "sports final", 1), [2])
+
+    def test_index_in_an_older_format_is_replaced_on_the_next_write(self):
+        old_dir = os.path.join(self.tempdir.name, "old")
+        os.makedirs(old_dir)
+        old = faiss.IndexIDMap(faiss.IndexFlatIP(len(WORDS)))
+        old.add_with_ids(np.eye(len(WORDS), dtype="float32")[:2], np.array([1, 2], dtype="int64"))
+        faiss.write_index(old, os.path.join(old_dir, "segment-000001.faiss"))
+        with open(os.path.join(old_dir, MANIFEST_FILE), "w", encoding="utf-8") as handle:
+            # Manifest written before chunk ids, without a format number
+            json.dump({"version": 3, "dim": len(WORDS), "next_segment": 2, "segments": ["segment-000001.faiss"]}, handle)
+
+        index = ArticleIndex(old_dir, WordEmbeddings(), db_path=self.db_path)
+        self.assertFalse(index.exists())
+        self.assertEqual((index.ntotal, index.similarity_search("sports final", k=1)), (0, []))
+
+        index.add_documents([word_doc(2, "sports final")])
+
+        manifest = read_manifest(old_dir)
+        self.assertEqual(manifest["segments"], ["segment-000002.faiss"])
+        self.assertEqual(sorted(os.listdir(old_dir)), [MANIFEST_FILE, "segment-000002.faiss"])
+        self.assertEqual(self.ids(index, "sports final", 1), [2])
+
+    def test_readers_pick_up_new_segments(self):
+        reader = self.reader()
+        self.assertFalse(reader.refresh())
+
+        self.index.add_documents([word_doc(3, "rain")])
+
+        self.assertTrue(reader.refresh())
+        self.assertEqual((reader.version, reader.ntotal), (3, 23))
+
+    def test_newest_vector_of_an_article_wins(self):
+        self.index.add_documents([word_doc(2, "market stocks")])
+
+        self.assertEqual(self.index.ntotal, 22)
+        self.assertEqual(sorted(self.ids(self.index, "market stocks", 2)), [1, 2])
+        scores = {
+            article_id: score
+            for score, article_id in self.index.search_ids(WordEmbeddings().embed_query("sports final"), 30)
+        }
+        self.assertEqual(len(scores), 22)
+        self.assertAlmostEqual(scores[2], scores[1])
+
+    def test_compaction_merges_segments_for_running_readers(self):
+        self.index.add_documents([word_doc(2, "market stocks")])
+        reader = self.reader()
+
+        self.index.compact()
+
+        manifest = read_manifest(self.index_dir)
+        self.assertEqual(len(manifest["segments"]), 1)
+        self.assertEqual(sorted(os.listdir(self.index_dir)), sorted([MANIFEST_FILE, *manifest["segments"]]))
+        # The reader still maps the removed files until it refreshes
+        self.assertEqual(reader.ntotal, 22)
+        self.assertTrue(reader.refresh())
+        self.assertEqual((reader.ntotal, reader.segment_count), (22, 1))
+        self.assertEqual(sorted(self.ids(reader, "market stocks", 2)), [1, 2])
+
+    def test_the_end_of_a_long_article_is_searchable(self):
+        filler = " ".join(f"Politics vote number {n}." for n in range(200))
+        self.index.add_documents([
+            Document(page_content=f"{filler} Heavy rain expected.", metadata={"id": 1, "title": "Long read"})
+        ])
+
+        self.assertGreater(self.index.ntotal, 22)
+        self.assertEqual(self.ids(self.index, "rain", 1), [1])
+
+    def test_articles_with_near_identical_chunks_do_not_crowd_out_others(self):
+        # Every chunk of every article embeds the same, so the best chunk
+        # hits all tie and the first articles' chunks fill the chunk budget
+        index = ArticleIndex(os.path.join(self.tempdir.name, "repeated"), SameEmbeddings(), db_path=self.db_path)
+        filler = " ".join(f"Market stocks rally number {n}." for n in range(400))
+        index.add_documents([word_doc(article_id, filler) for article_id in range(1, 31)])
+        query = SameEmbeddings().embed_query("market stocks")
+
+        self.assertEqual(len(index.search_ids(query, 10)), 10)
+        self.assertEqual(len(index.search_ids(query, 10, article_ids=range(5, 17))), 10)
+
+    def test_chunks_of_a_shorter_version_supersede_all_older_chunks(self):
+        filler = " ".join(f"Politics vote number {n}." for n in range(200))
+        self.index.add_documents([word_doc(1, f"{filler} Heavy rain expected.")])
+
+        self.index.add_documents([word_doc(1, "market stocks")])
+
+        self.assertEqual(self.index.ntotal, 22)
+        self.assertLess(self.index.search_ids(WordEmbeddings().embed_query("rain"), 1)[0][0], 0.5)
+
+    def test_category_filter_returns_matches_outside_the_global_top_k(self):
+        hits = self.index.search_ids(WordEmbeddings().embed_query("politics vote"), 5)
+        self.assertNotIn(2, [article_id for _score, article_id in hits])
+
+        docs = rag.dense_search("politics vote", category="Sports", top_k=5)
+
+        self.assertEqual([doc.metadata["id"] for doc in docs], [2])
+
+    def test_date_filter_is_pushed_into_the_vector_search(self):
+        docs = rag.dense_search("market", days_filter=1, top_k=5)
+        self.assertEqual(docs, [])
+
+
+class IndexReloadTests(test_rag_offline.RagTestCase):
+    def setUp(self):
+        super().setUp()
+        index_dir = os.path.join(self.tempdir.name, "faiss")
+        self.writer = ArticleIndex(index_dir, WordEmbeddings(), db_path=self.db_path)
+        for name, value in {"embeddings": WordEmbeddings(), "index_path": index_dir}.items():
+            patcher = patch.object(rag, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_index_published_after_startup_is_loaded(self):
+        self.assertFalse(rag.reload_vector_index())
+
+        self.writer.add_documents([word_doc(2, "sports final")])
+
+        self.assertTrue(rag.reload_vector_index())
+        self.assertEqual(rag.retrieval_mode, "faiss")
+        self.assertEqual([doc.metadata["id"] for doc in rag.dense_search("sports final", top_k=1)], [2])
+
+    def test_new_versions_are_swapped_in_place(self):
+        self.writer.add_documents([word_doc(2, "sports final")])
+        rag.reload_vector_index()
+        loaded = rag.vectorstore
+
+        self.writer.add_documents([word_doc(1, "market stocks")])
+
+        self.assertTrue(rag.reload_vector_index())
+        self.assertIs(rag.vectorstore, loaded)
+        self.assertEqual((loaded.version, loaded.ntotal), (2, 2))
+        self.assertFalse(rag.reload_vector_index())
+
+    def test_watcher_reloads_in_the_background(self):
+        stop = rag.start_index_watcher(interval=0.01)
+        self.writer.add_documents([word_doc(2, "sports final")])
+
+        deadline = time.monotonic() + 5
+        while rag.vectorstore is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        stop.set()
+        for thread in threading.enumerate():
+            if thread.name == "index-watcher":
+                thread.join()
+        self.assertIsNotNone(rag.vectorstore)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,175 @@
+"""
+Cached, batched translation for non-English sources.
+
+``BatchTranslator.translate_many`` looks every string up in a SQLite cache
+keyed by a hash of its content, so repeated headlines and boilerplate are
+translated once, and sends the remaining strings to the backend packed into as
+few requests as the backend's size limit allows.
+
+A backend is any object with ``translate_batch(texts) -> list`` returning one
+translation per input. ``GoogleBackend`` wraps deep_translator; ``StubBackend``
+is a local stand-in for tests.
+"""
+
+import hashlib
+import sqlite3
+import threading
+import time
+
+TRANSLATION_CACHE_FILE = "translation_cache.db"
+MAX_REQUEST_CHARS = 4500  # Google rejects requests over 5000 characters
+REQUEST_DELAY = 0.8  # seconds between backend requests
+SEPARATOR = "\n"
+
+
+# ---------------- BACKENDS ----------------
+class GoogleBackend:
+    """
+    Translates a batch by joining it into one request, one string per line.
+    Falls back to one request per string if the reply does not split back
+    into the same number of lines.
+    """
+
+    name = "google"
+
+    def __init__(self, translator, delay=REQUEST_DELAY):
+        self.translator = translator
+        self.delay = delay
+
+    def translate_batch(self, texts):
+        joined = SEPARATOR.join(texts)
+        translated = self.translator.translate(joined) or ""
+        time.sleep(self.delay)
+
+        parts = translated.split(SEPARATOR)
+        if len(parts) == len(texts):
+            return [part.strip() for part in parts]
+
+        results = []
+        for text in texts:
+            results.append(self.translator.translate(text))
+            time.sleep(self.delay)
+        return results
+
+
+class StubBackend:
+    """Deterministic local backend that records each request it receives."""
+
+    name = "stub"
+
+    def __init__(self, prefix="[en] "):
+        self.prefix = prefix
+        self.requests = []
+
+    def translate_batch(self, texts):
+        self.requests.append(list(texts))
+        return [f"{self.prefix}{text}" for text in texts]
+
+
+# ---------------- CACHE ----------------
+def content_hash(text, namespace=""):
+    return hashlib.sha256(f"{namespace}\x00{text}".encode("utf-8")).hexdigest()
+
+
+class TranslationCache:
+    def __init__(self, path=TRANSLATION_CACHE_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS translations (
+                content_hash TEXT PRIMARY KEY,
+                translation TEXT NOT NULL
+            )
+        """)
+        return conn
+
+    def get_many(self, hashes):
+        found = {}
+        hashes = list(hashes)
+        with self._lock:
+            conn = self._connect()
+            try:
+                for start in range(0, len(hashes), 500):
+                    batch = hashes[start:start + 500]
+                    placeholders = ",".join("?" * len(batch))
+                    rows = conn.execute(
+                        f"SELECT content_hash, translation FROM translations "
+                        f"WHERE content_hash IN ({placeholders})",
+                        batch,
+                    ).fetchall()
+                    found.update(rows)
+            finally:
+                conn.close()
+        return found
+
+    def put_many(self, items):
+        items = list(items)
+        if not items:
+            return
+        with self._lock:
+            conn = self._connect()
+            try:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO translations (content_hash, translation) VALUES (?, ?)",
+                    items,
+                )
+                conn.commit()
+            finally:
+                conn.close()
+
+
+# ---------------- TRANSLATOR ----------------
+class BatchTranslator:
+    def __init__(self, backend, cache=None, max_chars=MAX_REQUEST_CHARS):
+        self.backend = backend
+        self.cache = cache
+        self.max_chars = max_chars
+        self.stats = {"cached": 0, "translated": 0, "requests": 0}
+        self._stats_lock = threading.Lock()
+
+    def translate_many(self, texts):
+        """Translate ``texts`` and return the translations in the same order."""
+        texts = [" ".join((text or "").split()) for text in texts]
+        namespace = getattr(self.backend, "name", "")
+        keys = {text: content_hash(text, namespace) for text in texts if text}
+
+        cached = self.cache.get_many(set(keys.values())) if self.cache else {}
+        translations = {text: cached[key] for text, key in keys.items() if key in cached}
+        missing = [text for text in keys if text not in translations]
+        cached_count = len(translations)
+
+        new_items = []
+        requests = 0
+        for batch in self._batches(missing):
+            requests += 1
+            for text, translated in zip(batch, self.backend.translate_batch(batch)):
+                translations[text] = translated
+                new_items.append((keys[text], translated))
+
+        if self.cache:
+            self.cache.put_many(new_items)
+
+        with self._stats_lock:
+            self.stats["cached"] += cached_count
+            self.stats["translated"] += len(new_items)
+            self.stats["requests"] += requests
+
+        return [translations.get(text, "") if text else "" for text in texts]
+
+    def _batches(self, texts):
+        batch = []
+        size = 0
+        for text in texts:
+            extra = len(text) + (len(SEPARATOR) if batch else 0)
+            if batch and size + extra > self.max_chars:
+                yield batch
+                batch = []
+                size = 0
+                extra = len(text)
+            batch.append(text)
+            size += extra
+        if batch:
+            yield batch
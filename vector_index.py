@@ -0,0 +1,608 @@
+"""
+On-disk FAISS index of article embeddings.
+
+Articles are embedded as overlapping sentence windows short enough for the
+embedding model to read whole, so the end of a long article is searchable
+too. Each chunk vector is keyed by ``chunk_id(article id, chunk number)``. A
+search fetches the best chunks and pools their scores per parent article.
+
+The index directory holds immutable segment files plus ``manifest.json``,
+which lists the live segments and a version number. Each segment is a raw
+FAISS file of chunk vectors keyed by their ids. There is no pickled docstore:
+a search returns article ids and the matching documents are read from the
+article store on demand.
+
+An embedding run writes its new vectors as one more segment and then
+replaces the manifest atomically, so adding 50 articles writes only their
+chunks rather than the whole index. When an article is embedded again, its
+chunks in the newest segment win and the older ones are masked out of
+searches.
+``compact`` merges the segments into one once there are more than
+``MAX_SEGMENTS``. It publishes the merged segment the same way, so readers
+keep serving the previous segments while it runs.
+
+New batches are always flat (exact) segments. Compaction can instead build
+an approximate index: HNSW (a graph searched with ``efSearch`` candidates)
+or IVF-PQ (trained on a sample; ``nprobe`` of its inverted lists are
+scanned, and vectors are stored as 8-bit product-quantizer codes). Run
+``scripts/benchmark_ann.py`` to trade recall against latency and memory.
+
+Readers open segments memory-mapped and read-only, so loading does not copy
+vectors into the heap and every uvicorn worker on the host shares the same
+page cache. ``ArticleIndex.refresh`` re-reads a changed manifest, opening
+only the segments it has not mapped yet, and then swaps the new segment list
+in with one assignment; searches running meanwhile finish on the old list.
+
+Category and date filters are applied inside the FAISS search: the article
+store returns the ids of eligible articles (an index seek on
+predicted_category / scraped_at), and FAISS scores only their chunks through
+an ``IDSelectorBatch``. A narrow query therefore still gets its ``k`` nearest
+eligible articles, where post-filtering the global top ``k`` often left none.
+"""
+
+import heapq
+import json
+import os
+import re
+import threading
+
+import faiss
+import numpy as np
+from langchain_core.documents import Document
+
+from article_store import DB_FILE, get_store
+
+MANIFEST_FILE = "manifest.json"
+MANIFEST_FORMAT = 2  # 2: vectors are chunks keyed by chunk_id(article, chunk)
+SEGMENT_FILE = "segment-{:06d}.faiss"
+SEGMENT_NAME = re.compile(r"^segment-(\d{6})\.faiss$")
+MAX_SEGMENTS = 8  # compact once a manifest lists more segments than this
+FLAT_SEGMENT_LIMIT = 20000  # flat vectors tolerated before compacting into an ANN index
+
+INDEX_TYPES = ("flat", "hnsw", "ivfpq")
+HNSW_M = 32  # graph neighbours per node
+HNSW_EF_CONSTRUCTION = 200
+HNSW_EF_SEARCH = 64
+IVF_MIN_VECTORS = 10000  # below this IVF-PQ cannot be trained well; stay flat
+IVF_TRAIN_PER_LIST = 64  # training points per inverted list
+IVF_NPROBE = 16
+PQ_SUBVECTOR_DIMS = 8  # dimensions per 8-bit PQ code, so 384-d vectors take 48 bytes
+# Map the flat vector codes from the file instead of reading them into memory
+MMAP_FLAGS = faiss.IO_FLAG_MMAP_IFC | faiss.IO_FLAG_READ_ONLY
+
+# bge-small reads at most 512 tokens; windows of about 300 tokens leave room
+# for the title line repeated in every chunk
+CHUNK_CHARS = 1200
+CHUNK_OVERLAP_SENTENCES = 1
+CHUNK_BITS = 10  # chunk number bits in a vector id
+MAX_CHUNKS = 1 << CHUNK_BITS
+CHUNK_FANOUT = 4  # chunk hits fetched per requested article
+POOLING = "max"  # how chunk scores combine into an article score: "max" or "sum"
+
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+
+ARTICLE_COLUMNS = "id, title, teaser, full_text, scraped_at, predicted_category, image_url"
+
+
+def article_document(row):
+    """The Document embedded and returned for an ``ARTICLE_COLUMNS`` row."""
+    article_id, title, teaser, full_text, scraped_at, predicted_category, image_url = row
+    content = (
+        f"Title: {title or ''}\n"
+        f"Category: {predicted_category or 'General'}\n"
+        f"Date: {scraped_at or '—'}\n\n"
+        f"{full_text or ''}"
+    )
+    metadata = {
+        "id": article_id,
+        "title": title or "",
+        "teaser": teaser[:180] if teaser else "",
+        "category": predicted_category or "General",
+        "date": scraped_at or "unknown",
+        "image_url": image_url or "",
+    }
+    return Document(page_content=content, metadata=metadata)
+
+
+def load_documents(conn, article_ids):
+    """Documents for ``article_ids`` in the given order; deleted articles are skipped."""
+    if not article_ids:
+        return []
+    placeholders = ", ".join("?" for _ in article_ids)
+    rows = conn.execute(f"SELECT {ARTICLE_COLUMNS} FROM articles WHERE id IN ({placeholders})", article_ids)
+    by_id = {row[0]: row for row in rows}
+    return [article_document(by_id[article_id]) for article_id in article_ids if article_id in by_id]
+
+
+# ---------------- CHUNKS ----------------
+def chunk_id(article_id, chunk):
+    return (article_id << CHUNK_BITS) | chunk
+
+
+def article_ids_of(ids):
+    """Parent article ids of an int64 array of vector ids."""
+    return np.asarray(ids, dtype="int64") >> CHUNK_BITS
+
+
+def sentence_windows(text, max_chars=CHUNK_CHARS, overlap=CHUNK_OVERLAP_SENTENCES):
+    """
+    Split ``text`` into windows of whole sentences up to ``max_chars`` long,
+    each starting with the last ``overlap`` sentences of the previous one.
+    A single sentence longer than ``max_chars`` becomes a window of its own.
+    """
+    sentences = [sentence for sentence in SENTENCE_END.split(text.strip()) if sentence]
+    windows = []
+    start = 0
+    while start < len(sentences):
+        end = start + 1
+        size = len(sentences[start])
+        while end < len(sentences) and size + 1 + len(sentences[end]) <= max_chars:
+            size += 1 + len(sentences[end])
+            end += 1
+        windows.append(" ".join(sentences[start:end]))
+        if end == len(sentences):
+            break
+        start = max(end - overlap, start + 1)
+    return windows
+
+
+def document_chunks(doc):
+    """
+    Texts embedded for ``doc``: sentence windows of its content, each after
+    the first prefixed with the article title so it is not read out of context.
+    """
+    windows = sentence_windows(doc.page_content)[:MAX_CHUNKS] or [doc.page_content]
+    title = doc.metadata.get("title")
+    if title:
+        windows[1:] = [f"Title: {title}\n{window}" for window in windows[1:]]
+    return windows
+
+
+def pool_hits(hits, k, pooling=POOLING):
+    """Best ``k`` (score, article id) pairs from (score, chunk id) hits."""
+    scores = {}
+    for score, vector_id in hits:
+        article_id = vector_id >> CHUNK_BITS
+        if pooling == "sum":
+            scores[article_id] = scores.get(article_id, 0.0) + score
+        else:
+            scores[article_id] = max(scores.get(article_id, score), score)
+    return heapq.nlargest(k, ((score, article_id) for article_id, score in scores.items()))
+
+
+# ---------------- SEARCH ----------------
+def id_selector(ids):
+    return faiss.IDSelectorBatch(np.asarray(list(ids), dtype="int64"))
+
+
+def _inner(index):
+    return faiss.downcast_index(index.index) if isinstance(index, faiss.IndexIDMap) else index
+
+
+def index_kind(index):
+    """"flat", "hnsw" or "ivfpq" for a segment index."""
+    inner = _inner(index)
+    if isinstance(inner, faiss.IndexHNSW):
+        return "hnsw"
+    if isinstance(inner, faiss.IndexIVF):
+        return "ivfpq"
+    return "flat"
+
+
+def search_parameters(index, k, selector=None, ef_search=HNSW_EF_SEARCH, nprobe=IVF_NPROBE):
+    """Per-query search parameters matching the type of ``index``."""
+    kind = index_kind(index)
+    if kind == "hnsw":
+        params = faiss.SearchParametersHNSW(efSearch=max(ef_search, k))
+    elif kind == "ivfpq":
+        params = faiss.SearchParametersIVF(nprobe=nprobe)
+    elif selector is None:
+        return None
+    else:
+        params = faiss.SearchParameters()
+    if selector is not None:
+        params.sel = selector
+    return params
+
+
+def search(index, vector, k, allowed_ids=None, excluded_ids=None, ef_search=HNSW_EF_SEARCH, nprobe=IVF_NPROBE):
+    """
+    Return (scores, ids) of the ``k`` nearest vectors to ``vector``, only
+    considering ``allowed_ids`` when given and skipping ``excluded_ids``.
+    Missing results are dropped. Filtered searches scan every vector of an
+    HNSW or IVF-PQ index, so they stay exhaustive.
+    """
+    query = np.asarray(vector, dtype="float32").reshape(1, -1)
+    # SWIG selectors do not own the selectors they wrap; keep them alive here
+    selectors = []
+    if allowed_ids is not None:
+        if not allowed_ids:
+            return [], []
+        k = min(k, len(allowed_ids))
+        selectors.append(id_selector(allowed_ids))
+    if excluded_ids:
+        selectors.append(id_selector(excluded_ids))
+        selectors.append(faiss.IDSelectorNot(selectors[-1]))
+        if allowed_ids is not None:
+            selectors.append(faiss.IDSelectorAnd(selectors[0], selectors[-1]))
+
+    kind = index_kind(index)
+    if allowed_ids is not None and kind == "hnsw":
+        # A filtered graph walk misses allowed vectors far from the query's
+        # neighbourhood, so scan the graph's flat storage instead
+        id_map = faiss.rev_swig_ptr(index.id_map.data(), index.id_map.size())
+        selectors.append(faiss.IDSelectorTranslated(index.id_map, selectors[-1]))
+        storage = faiss.downcast_index(_inner(index).storage)
+        scores, positions = storage.search(query, k, params=faiss.SearchParameters(sel=selectors[-1]))
+        ids = np.where(positions == -1, -1, id_map[positions])
+    else:
+        if allowed_ids is not None and kind == "ivfpq":
+            # Allowed vectors may sit in lists far from the query; probe them all
+            nprobe = faiss.extract_index_ivf(index).nlist
+        params = search_parameters(index, k, selectors[-1] if selectors else None, ef_search, nprobe)
+        if params is None:
+            scores, ids = index.search(query, k)
+        else:
+            scores, ids = index.search(query, k, params=params)
+    found = ids[0] != -1
+    return scores[0][found].tolist(), ids[0][found].tolist()
+
+
+def ivf_lists(count):
+    """Inverted lists for ``count`` vectors: about 4 * sqrt(count), a power of two."""
+    return 1 << max(int(np.log2(4 * np.sqrt(count))), 4)
+
+
+def build_index(ids, vectors, index_type="flat"):
+    """
+    An inner-product index of ``index_type`` over ``vectors`` keyed by
+    ``ids``. IVF-PQ is trained on a sample; with fewer than IVF_MIN_VECTORS
+    vectors a flat index is built instead.
+    """
+    if index_type not in INDEX_TYPES:
+        raise ValueError(f"unknown index type {index_type!r}, expected one of {INDEX_TYPES}")
+    vectors = np.asarray(vectors, dtype="float32")
+    ids = np.asarray(ids, dtype="int64")
+    dim = vectors.shape[1]
+
+    if index_type == "hnsw":
+        index = faiss.index_factory(dim, f"IDMap,HNSW{HNSW_M}", faiss.METRIC_INNER_PRODUCT)
+        _inner(index).hnsw.efConstruction = HNSW_EF_CONSTRUCTION
+    elif index_type == "ivfpq" and len(vectors) >= IVF_MIN_VECTORS:
+        nlist = ivf_lists(len(vectors))
+        index = faiss.index_factory(
+            dim, f"IVF{nlist},PQ{dim // PQ_SUBVECTOR_DIMS}", faiss.METRIC_INNER_PRODUCT
+        )
+        sample = max(nlist * IVF_TRAIN_PER_LIST, IVF_MIN_VECTORS)
+        rows = np.random.default_rng(0).permutation(len(vectors))[:sample]
+        index.train(vectors[np.sort(rows)])
+    else:
+        index = faiss.IndexIDMap(faiss.IndexFlatIP(dim))
+    index.add_with_ids(vectors, ids)
+    return index
+
+
+# ---------------- SEGMENTS ----------------
+def manifest_file(path):
+    return os.path.join(path, MANIFEST_FILE)
+
+
+def read_manifest(path):
+    """
+    The manifest under ``path``, or None before the first segment is written
+    and for an index in an older format, which has to be rebuilt.
+    """
+    try:
+        with open(manifest_file(path), encoding="utf-8") as handle:
+            manifest = json.load(handle)
+    except FileNotFoundError:
+        return None
+    return manifest if manifest.get("format") == MANIFEST_FORMAT else None
+
+
+def _replace(target, write):
+    partial = target + ".tmp"
+    write(partial)
+    os.replace(partial, target)
+
+
+def write_manifest(path, manifest):
+    def write(partial):
+        with open(partial, "w", encoding="utf-8") as handle:
+            json.dump(manifest, handle, indent=2)
+    _replace(manifest_file(path), write)
+
+
+def segment_files(path):
+    """Segment file names under ``path``, listed in a manifest or not."""
+    try:
+        names = os.listdir(path)
+    except FileNotFoundError:
+        return []
+    return sorted(name for name in names if SEGMENT_NAME.match(name))
+
+
+def new_manifest(path, dim):
+    """
+    An empty manifest for ``path``. Numbering continues after any segment
+    files already there (an index in an older format), so none is overwritten.
+    """
+    numbers = [int(SEGMENT_NAME.match(name).group(1)) for name in segment_files(path)]
+    return {
+        "format": MANIFEST_FORMAT, "version": 0, "dim": dim, "next_segment": max(numbers, default=0) + 1,
+        "segments": [],
+    }
+
+
+def publish_segment(path, index, replace_segments=()):
+    """
+    Write ``index`` as a new segment and publish it in the manifest, in place
+    of ``replace_segments``. The first segment published over an index in an
+    older format deletes that format's segment files. Returns the new manifest.
+    """
+    os.makedirs(path, exist_ok=True)
+    manifest = read_manifest(path)
+    orphans = []
+    if manifest is None:
+        orphans = segment_files(path)
+        manifest = new_manifest(path, index.d)
+    if index.d != manifest["dim"]:
+        raise ValueError(f"vectors have {index.d} dimensions, the index has {manifest['dim']}")
+
+    name = SEGMENT_FILE.format(manifest["next_segment"])
+    _replace(os.path.join(path, name), lambda partial: faiss.write_index(index, partial))
+
+    # A merged segment takes the place of the segments it replaces, so any
+    # segment appended meanwhile still overrides it
+    segments = []
+    position = None
+    for segment in manifest["segments"]:
+        if segment not in replace_segments:
+            segments.append(segment)
+        elif position is None:
+            position = len(segments)
+    segments.insert(len(segments) if position is None else position, name)
+    manifest = {
+        **manifest,
+        "version": manifest["version"] + 1,
+        "next_segment": manifest["next_segment"] + 1,
+        "segments": segments,
+    }
+    write_manifest(path, manifest)
+    for name in orphans:
+        os.remove(os.path.join(path, name))
+    return manifest
+
+
+def write_segment(path, ids, vectors):
+    """Publish ``vectors`` keyed by ``ids`` as a new flat segment."""
+    return publish_segment(path, build_index(ids, vectors))
+
+
+def read_segment(path, name, mmap=True):
+    return faiss.read_index(os.path.join(path, name), MMAP_FLAGS if mmap else 0)
+
+
+def segment_ids(index):
+    if isinstance(index, faiss.IndexIDMap):
+        return faiss.vector_to_array(index.id_map)
+    invlists = faiss.extract_index_ivf(index).invlists
+    return np.concatenate([np.empty(0, dtype="int64")] + [
+        faiss.rev_swig_ptr(invlists.get_ids(lst), invlists.list_size(lst)).copy()
+        for lst in range(invlists.nlist)
+        if invlists.list_size(lst)
+    ])
+
+
+def segment_vectors(index, positions, ids):
+    """Vectors at ``positions`` (flat, HNSW) or of ``ids`` (IVF-PQ, approximate)."""
+    if isinstance(index, faiss.IndexIDMap):
+        return index.index.reconstruct_batch(np.asarray(positions, dtype="int64"))
+    index.set_direct_map_type(faiss.DirectMap.Hashtable)
+    return index.reconstruct_batch(np.asarray(ids, dtype="int64"))
+
+
+def compact(path, index_type="flat"):
+    """
+    Merge every segment listed in the manifest into one ``index_type``
+    segment, keeping the newest chunks of each article, and delete the merged
+    files. An existing IVF-PQ segment is extended rather than retrained, as
+    its vectors can only be reconstructed approximately. Returns the manifest.
+    """
+    manifest = read_manifest(path)
+    if not manifest or not manifest["segments"]:
+        return manifest
+    merged = manifest["segments"]
+    if len(merged) == 1 and index_kind(read_segment(path, merged[0])) == index_type:
+        return manifest
+
+    # Articles with vectors in a newer segment; their older chunks are dropped
+    seen = np.empty(0, dtype="int64")
+    base = None
+    ids, vectors = [], []
+    for name in reversed(merged):
+        index = read_segment(path, name, mmap=False)
+        segment = segment_ids(index)
+        stale = np.isin(article_ids_of(segment), seen)
+        seen = np.union1d(seen, article_ids_of(segment))
+        if base is None and index_type == "ivfpq" and index_kind(index) == "ivfpq":
+            if stale.any():
+                index.remove_ids(id_selector(segment[stale]))
+            base = index
+            continue
+        positions = np.flatnonzero(~stale)
+        if len(positions):
+            ids.extend(segment[positions].tolist())
+            vectors.append(segment_vectors(index, positions, segment[positions]))
+
+    if base is None:
+        index = build_index(ids, np.vstack(vectors), index_type)
+    else:
+        index = base
+        if ids:
+            index.add_with_ids(np.vstack(vectors), np.asarray(ids, dtype="int64"))
+    manifest = publish_segment(path, index, replace_segments=merged)
+    for name in merged:
+        # Readers that already mapped a segment keep their mapping
+        os.remove(os.path.join(path, name))
+    return manifest
+
+
+class _Snapshot:
+    """Open segments of one manifest version, newest last, with masked ids."""
+
+    def __init__(self, version, segments):
+        self.version = version
+        self.segments = segments  # [(name, index, superseded ids, live ids)]
+        self.ntotal = sum(len(live) for _name, _index, _superseded, live in segments)
+
+    def chunk_ids(self, article_ids):
+        """Live vector ids of the chunks of ``article_ids``."""
+        wanted = np.asarray(list(article_ids), dtype="int64")
+        return [
+            vector_id
+            for _name, _index, _superseded, live in self.segments
+            for vector_id in live[np.isin(article_ids_of(live), wanted)].tolist()
+        ]
+
+
+class ArticleIndex:
+    """
+    Segmented inner-product FAISS index of article chunks under ``path``.
+    Embeddings are expected to be normalized, so scores are cosine
+    similarities.
+    """
+
+    def __init__(self, path, embeddings, db_path=DB_FILE, ef_search=HNSW_EF_SEARCH, nprobe=IVF_NPROBE):
+        self.path = path
+        self.embeddings = embeddings
+        self.db_path = db_path
+        self.ef_search = ef_search
+        self.nprobe = nprobe
+        self._lock = threading.Lock()
+        self._manifest_stat = None
+        self._snapshot = _Snapshot(0, [])
+        self.refresh()
+
+    @property
+    def version(self):
+        return self._snapshot.version
+
+    @property
+    def ntotal(self):
+        return self._snapshot.ntotal
+
+    @property
+    def segment_count(self):
+        return len(self._snapshot.segments)
+
+    def exists(self):
+        return read_manifest(self.path) is not None
+
+    def refresh(self):
+        """Pick up a changed manifest; returns True when a new version was loaded."""
+        with self._lock:
+            try:
+                stat = os.stat(manifest_file(self.path))
+            except FileNotFoundError:
+                return False
+            if (stat.st_mtime_ns, stat.st_size) == self._manifest_stat:
+                return False
+            for _attempt in range(3):
+                manifest = read_manifest(self.path)
+                if manifest is None:
+                    # An index in an older format: serve nothing until the
+                    # embedder publishes a rebuilt one
+                    self._manifest_stat = (stat.st_mtime_ns, stat.st_size)
+                    self._snapshot = _Snapshot(0, [])
+                    return False
+                try:
+                    snapshot = self._open(manifest)
+                    break
+                except RuntimeError:
+                    # A compaction removed a segment between the two reads
+                    continue
+            else:
+                return False
+            self._manifest_stat = (stat.st_mtime_ns, stat.st_size)
+            changed = snapshot.version != self._snapshot.version
+            self._snapshot = snapshot
+            return changed
+
+    def _open(self, manifest):
+        opened = {name: index for name, index, _superseded, _live in self._snapshot.segments}
+        segments = []
+        seen = np.empty(0, dtype="int64")
+        for name in reversed(manifest["segments"]):
+            index = opened.get(name)
+            if index is None:
+                index = read_segment(self.path, name)
+            ids = segment_ids(index)
+            # A re-embedded article may have fewer chunks, so mask by article
+            stale = np.isin(article_ids_of(ids), seen)
+            seen = np.union1d(seen, article_ids_of(ids))
+            segments.append((name, index, set(ids[stale].tolist()), ids[~stale]))
+        return _Snapshot(manifest["version"], segments[::-1])
+
+    def add_documents(self, documents):
+        """
+        Embed the chunks of ``documents`` under their ``metadata["id"]`` as a
+        new segment, superseding older chunks of the same articles. All chunks
+        go to the model in one call, so it batches them together.
+        """
+        if not documents:
+            return
+        ids, texts = [], []
+        for doc in documents:
+            for number, text in enumerate(document_chunks(doc)):
+                ids.append(chunk_id(doc.metadata["id"], number))
+                texts.append(text)
+        write_segment(self.path, ids, self.embeddings.embed_documents(texts))
+        self.refresh()
+
+    def needs_compaction(self, index_type="flat"):
+        """Too many segments, or too many flat vectors for an ANN ``index_type``."""
+        segments = self._snapshot.segments
+        if len(segments) > MAX_SEGMENTS:
+            return True
+        flat = sum(index.ntotal for _name, index, _superseded, _live in segments if index_kind(index) == "flat")
+        return index_type != "flat" and flat > FLAT_SEGMENT_LIMIT
+
+    def compact(self, index_type="flat"):
+        compact(self.path, index_type)
+        self.refresh()
+
+    def search_ids(self, vector, k, article_ids=None):
+        """
+        (score, article id) pairs of the ``k`` best articles across segments,
+        each scored by pooling its best chunk hits.
+        """
+        snapshot = self._snapshot
+        allowed = None if article_ids is None else snapshot.chunk_ids(article_ids)
+        hits = []
+        for _name, index, superseded, live in snapshot.segments:
+            # Close chunks of a few articles can fill the chunk budget, so
+            # widen it until k articles are pooled or the segment runs out
+            available = len(live) if allowed is None else len(allowed)
+            chunk_k = k * CHUNK_FANOUT
+            while True:
+                scores, ids = search(index, vector, chunk_k, allowed, superseded, self.ef_search, self.nprobe)
+                if chunk_k >= available or len(set(article_ids_of(ids).tolist())) >= k:
+                    break
+                chunk_k *= 2
+            hits.extend(zip(scores, ids))
+        return pool_hits(hits, k)
+
+    def similarity_search(self, query, k=4, article_ids=None):
+        """
+        Documents most similar to ``query``, restricted to ``article_ids``
+        when given; their text is read from the article store.
+        """
+        return [doc for doc, _score in self.similarity_search_with_score(query, k, article_ids)]
+
+    def similarity_search_with_score(self, query, k=4, article_ids=None):
+        """(document, pooled cosine score) pairs, as for ``similarity_search``."""
+        hits = self.search_ids(self.embeddings.embed_query(query), k, article_ids)
+        scores = {article_id: score for score, article_id in hits}
+        docs = load_documents(get_store(self.db_path).connection(), [article_id for _score, article_id in hits])
+        return [(doc, scores[doc.metadata["id"]]) for doc in docs]